@@ -0,0 +1,237 @@
+import threading
+from typing import Callable, NamedTuple, Optional
+from kubernetes import watch
+from Modules.Constants import constants
+from Modules.Logs import logger
+
+
+class DeploymentState(NamedTuple):
+    """
+    Replica counts of a deployment as last seen on the Kubernetes API server.
+    """
+
+    replicas: int
+    ready_replicas: int
+    resource_version: str
+
+
+class DeploymentStateCache:
+    """
+    Informer style cache of the managed deployments. Every namespace is listed once and then watched from the
+    resource version of the list, so the scaling decisions read the replica counts locally instead of sending a GET
+    every tick. Expired watches (410 Gone) and dropped connections are recovered by listing again.
+
+    Parameters
+    ----------
+    api
+        AppsV1Api object of gcloud, or a stand-in offering list_namespaced_deployment.
+    targets
+        Configurations of the target deployments to be tracked.
+    watch_factory
+        Callable creating the watch used to stream the events, e.g. kubernetes.watch.Watch.
+    watch_timeout
+        Number of seconds a single watch request is kept open before it is renewed.
+    relist_backoff
+        Number of seconds to wait before listing again after an error.
+    """
+
+    def __init__(
+            self,
+            api,
+            targets: list,
+            watch_factory: Callable = watch.Watch,
+            watch_timeout: int = constants.DEFAULT_KUBERNETES_WATCH_TIMEOUT,
+            relist_backoff: float = constants.KUBERNETES_WATCH_RELIST_BACKOFF
+    ):
+        self.api = api
+        self.watch_factory = watch_factory
+        self.watch_timeout = watch_timeout
+        self.relist_backoff = relist_backoff
+        self.relists = 0
+        self.events = 0
+
+        self._managed = {}
+        for target_configs in targets:
+            self._managed.setdefault(target_configs[constants.NAMESPACE], set()).add(
+                target_configs[constants.DEPLOYMENT_NAME]
+            )
+
+        self._states = {}
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._synced = {namespace: threading.Event() for namespace in self._managed}
+        self._watches = {}
+        self._threads = []
+
+    def start(self):
+        """
+        Start one list and watch thread per namespace.
+        """
+
+        for namespace in self._managed:
+            thread = threading.Thread(
+                target=self._run, args=(namespace,), name="deployment-watch-" + namespace, daemon=True
+            )
+            thread.start()
+            self._threads.append(thread)
+
+    def wait_for_sync(self, timeout: Optional[float] = None) -> bool:
+        """
+        Wait until every namespace has been listed once.
+
+        Parameters
+        ----------
+        timeout
+            Maximum number of seconds to wait, None to wait without limit.
+
+        Returns
+        -------
+        bool
+            True if every namespace was listed within the timeout.
+        """
+
+        return all(synced.wait(timeout) for synced in self._synced.values())
+
+    def stop(self):
+        """
+        Stop watching. The cached states remain readable.
+        """
+
+        self._stop_event.set()
+        for namespace_watch in list(self._watches.values()):
+            namespace_watch.stop()
+
+    def get(self, namespace: str, name: str) -> Optional[DeploymentState]:
+        """
+        Read the cached state of a deployment.
+
+        Parameters
+        ----------
+        namespace
+            Namespace of the deployment.
+        name
+            Name of the deployment.
+
+        Returns
+        -------
+        DeploymentState
+            Cached replica counts, None if the deployment is not known yet.
+        """
+
+        with self._lock:
+            return self._states.get((namespace, name))
+
+    def record_replicas(self, namespace: str, name: str, replicas: int):
+        """
+        Write a replica count the autoscaler just requested through to the cache, so the next tick does not act on
+        the previous count if the watch event has not arrived yet.
+
+        Parameters
+        ----------
+        namespace
+            Namespace of the deployment.
+        name
+            Name of the deployment.
+        replicas
+            Requested replica count.
+        """
+
+        with self._lock:
+            state = self._states.get((namespace, name))
+            if state is not None:
+                self._states[(namespace, name)] = state._replace(replicas=replicas)
+
+    def _apply(self, namespace: str, deployment, event_type: str = "ADDED"):
+        """
+        Update the cache with a listed or watched deployment.
+
+        Parameters
+        ----------
+        namespace
+            Namespace of the deployment.
+        deployment
+            Deployment object with metadata, spec and status.
+        event_type
+            Type of the watch event, ADDED, MODIFIED or DELETED.
+        """
+
+        name = deployment.metadata.name
+        if name not in self._managed[namespace]:
+            return
+
+        with self._lock:
+            if event_type == "DELETED":
+                self._states.pop((namespace, name), None)
+            else:
+                self._states[(namespace, name)] = DeploymentState(
+                    deployment.spec.replicas,
+                    deployment.status.ready_replicas or 0,
+                    deployment.metadata.resource_version
+                )
+
+    def _list(self, namespace: str) -> str:
+        """
+        List the deployments of a namespace and replace their cached states.
+
+        Parameters
+        ----------
+        namespace
+            Namespace to be listed.
+
+        Returns
+        -------
+        str
+            Resource version of the list to start watching from.
+        """
+
+        deployment_list = self.api.list_namespaced_deployment(namespace=namespace)
+
+        listed = {deployment.metadata.name for deployment in deployment_list.items}
+        with self._lock:
+            for name in self._managed[namespace] - listed:
+                self._states.pop((namespace, name), None)
+        for deployment in deployment_list.items:
+            self._apply(namespace, deployment)
+
+        self.relists += 1
+        self._synced[namespace].set()
+        return deployment_list.metadata.resource_version
+
+    def _run(self, namespace: str):
+        """
+        List and watch a namespace until the cache is stopped.
+
+        Parameters
+        ----------
+        namespace
+            Namespace to be tracked.
+        """
+
+        while not self._stop_event.is_set():
+            try:
+                resource_version = self._list(namespace)
+
+                while not self._stop_event.is_set():
+                    namespace_watch = self.watch_factory()
+                    self._watches[namespace] = namespace_watch
+
+                    for event in namespace_watch.stream(
+                            self.api.list_namespaced_deployment,
+                            namespace=namespace,
+                            resource_version=resource_version,
+                            timeout_seconds=self.watch_timeout
+                    ):
+                        self.events += 1
+                        self._apply(namespace, event["object"], event["type"])
+                        resource_version = event["object"].metadata.resource_version
+
+            except Exception as exception:
+                if self._stop_event.is_set():
+                    return
+                logger.log_action(
+                    "warning",
+                    "Watch of the deployments in namespace " + namespace + " interrupted (" +
+                    " ".join(str(exception).split()) + "). Listing again...",
+                    cloud_log_bool=False
+                )
+                self._stop_event.wait(self.relist_backoff)
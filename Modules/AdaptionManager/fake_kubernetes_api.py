@@ -0,0 +1,190 @@
+import copy
+import threading
+import time
+from types import SimpleNamespace
+from typing import Optional
+from kubernetes.client.rest import ApiException
+
+
+class FakeAppsV1Api:
+    """
+    In-memory stand-in of the parts of the Kubernetes AppsV1Api used by the autoscaler: reading and patching the
+    scale subresource, listing and watching deployments. Every change bumps a resource version and is recorded as a
+    watch event. Used to exercise the resource adaptor and the deployment state cache without a cluster.
+    """
+
+    def __init__(self):
+        self.calls = {}
+        self._deployments = {}
+        self._events = []
+        self._resource_version = 0
+        self._expired_before = 0
+        self._condition = threading.Condition()
+
+    def _count(self, method: str):
+        self.calls[method] = self.calls.get(method, 0) + 1
+
+    def _deployment(self, namespace: str, name: str) -> SimpleNamespace:
+        deployment = self._deployments.get((namespace, name))
+        if deployment is None:
+            raise ApiException(status=404, reason="deployments.apps \"" + name + "\" not found")
+        return deployment
+
+    def _record(self, event_type: str, deployment: SimpleNamespace):
+        """
+        Bump the resource version of a changed deployment and publish the change to the watchers.
+        """
+
+        self._resource_version += 1
+        deployment.metadata.resource_version = str(self._resource_version)
+        self._events.append((self._resource_version, event_type, copy.deepcopy(deployment)))
+        self._condition.notify_all()
+
+    def create_deployment(self, namespace: str, name: str, replicas: int, ready_replicas: Optional[int] = None):
+        """
+        Add a deployment to the fake cluster.
+
+        Parameters
+        ----------
+        namespace
+            Namespace of the deployment.
+        name
+            Name of the deployment.
+        replicas
+            Desired replica count.
+        ready_replicas
+            Ready replica count, the desired count if not given.
+        """
+
+        deployment = SimpleNamespace(
+            metadata=SimpleNamespace(name=name, namespace=namespace, resource_version=None),
+            spec=SimpleNamespace(replicas=replicas),
+            status=SimpleNamespace(
+                replicas=replicas, ready_replicas=replicas if ready_replicas is None else ready_replicas
+            )
+        )
+        with self._condition:
+            self._deployments[(namespace, name)] = deployment
+            self._record("ADDED", deployment)
+
+    def set_ready_replicas(self, namespace: str, name: str, ready_replicas: int):
+        """
+        Change the ready replica count of a deployment, as the deployment controller would.
+
+        Parameters
+        ----------
+        namespace
+            Namespace of the deployment.
+        name
+            Name of the deployment.
+        ready_replicas
+            New ready replica count.
+        """
+
+        with self._condition:
+            deployment = self._deployment(namespace, name)
+            deployment.status.ready_replicas = ready_replicas
+            deployment.status.replicas = max(deployment.spec.replicas, ready_replicas)
+            self._record("MODIFIED", deployment)
+
+    def expire_watches(self):
+        """
+        Let every open watch fail with 410 Gone, as the API server does once the resource version of a watch has
+        been compacted.
+        """
+
+        with self._condition:
+            self._resource_version += 1
+            self._expired_before = self._resource_version
+            self._condition.notify_all()
+
+    def read_namespaced_deployment(self, name: str, namespace: str) -> SimpleNamespace:
+        with self._condition:
+            self._count("read_namespaced_deployment")
+            return copy.deepcopy(self._deployment(namespace, name))
+
+    def read_namespaced_deployment_scale(self, name: str, namespace: str) -> SimpleNamespace:
+        with self._condition:
+            self._count("read_namespaced_deployment_scale")
+            deployment = self._deployment(namespace, name)
+            return SimpleNamespace(
+                spec=SimpleNamespace(replicas=deployment.spec.replicas),
+                status=SimpleNamespace(replicas=deployment.status.replicas)
+            )
+
+    def patch_namespaced_deployment_scale(self, name: str, namespace: str, body: dict) -> SimpleNamespace:
+        with self._condition:
+            self._count("patch_namespaced_deployment_scale")
+            deployment = self._deployment(namespace, name)
+            deployment.spec.replicas = body["spec"]["replicas"]
+            self._record("MODIFIED", deployment)
+            return SimpleNamespace(
+                spec=SimpleNamespace(replicas=deployment.spec.replicas),
+                status=SimpleNamespace(replicas=deployment.status.replicas)
+            )
+
+    def list_namespaced_deployment(self, namespace: str, **kwargs) -> SimpleNamespace:
+        with self._condition:
+            self._count("list_namespaced_deployment")
+            return SimpleNamespace(
+                metadata=SimpleNamespace(resource_version=str(self._resource_version)),
+                items=[
+                    copy.deepcopy(deployment)
+                    for (deployment_namespace, _), deployment in self._deployments.items()
+                    if deployment_namespace == namespace
+                ]
+            )
+
+    def watch(self) -> "FakeWatch":
+        """
+        Create a watch streaming the events of this fake API, a stand-in for kubernetes.watch.Watch.
+        """
+
+        return FakeWatch(self)
+
+
+class FakeWatch:
+    """
+    Stand-in of kubernetes.watch.Watch streaming the recorded events of a FakeAppsV1Api.
+
+    Parameters
+    ----------
+    api
+        Fake API whose events are streamed.
+    """
+
+    def __init__(self, api: FakeAppsV1Api):
+        self.api = api
+        self._stop = False
+
+    def stop(self):
+        self._stop = True
+        with self.api._condition:
+            self.api._condition.notify_all()
+
+    def stream(self, func, namespace: str, resource_version: str = "0", timeout_seconds: int = 300, **kwargs):
+        """
+        Yield the events of a namespace newer than the given resource version until the timeout elapses.
+        """
+
+        api = self.api
+        last_version = int(resource_version or 0)
+        deadline = time.monotonic() + timeout_seconds
+
+        while not self._stop:
+            with api._condition:
+                if last_version < api._expired_before:
+                    raise ApiException(status=410, reason="Expired: too old resource version")
+
+                pending = [event for event in api._events if event[0] > last_version]
+                if not pending:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        return
+                    api._condition.wait(remaining)
+                    continue
+
+            for version, event_type, deployment in pending:
+                last_version = version
+                if deployment.metadata.namespace == namespace:
+                    yield {"type": event_type, "object": copy.deepcopy(deployment)}
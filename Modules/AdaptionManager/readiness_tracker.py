@@ -0,0 +1,230 @@
+import math
+import threading
+import time
+from collections import deque
+from typing import Callable, Optional
+import numpy as np
+from Modules.Constants import constants
+from Modules.Logs import logger
+from Modules.MetricsManagers import local_metrics
+
+
+class _ScaleEvent:
+    """
+    Scale action followed by the readiness tracker.
+
+    Parameters
+    ----------
+    namespace
+        Namespace of the deployment.
+    name
+        Name of the deployment.
+    from_replicas
+        Replica count before the scale action.
+    to_replicas
+        Requested replica count.
+    deadline
+        Number of seconds after which the rollout is given up on.
+    """
+
+    def __init__(self, namespace: str, name: str, from_replicas: int, to_replicas: int, deadline: float):
+        self.namespace = namespace
+        self.name = name
+        self.from_replicas = from_replicas
+        self.to_replicas = to_replicas
+        self.started = time.monotonic()
+        self.deadline = self.started + deadline
+
+
+class ReadinessTracker:
+    """
+    Background tracker following every scale action until the ready replicas of the deployment converge to the
+    requested count or a deadline passes. Scale actions return immediately, the time-to-ready is reported
+    asynchronously and kept per deployment, so the scaling logic can look ahead by the measured pod startup time.
+
+    Parameters
+    ----------
+    ready_replicas_reader
+        Callable returning the ready replica count of a deployment from its namespace and name.
+    deadline
+        Number of seconds after which a rollout is reported as not converged.
+    poll_interval
+        Number of seconds between two readiness checks.
+    """
+
+    def __init__(
+            self,
+            ready_replicas_reader: Callable[[str, str], Optional[int]],
+            deadline: float = constants.DEFAULT_READINESS_DEADLINE,
+            poll_interval: float = constants.READINESS_POLL_INTERVAL
+    ):
+        self.ready_replicas_reader = ready_replicas_reader
+        self.deadline = deadline
+        self.poll_interval = poll_interval
+        self.converged = 0
+        self.timeouts = 0
+        self._pending = {}
+        self._startup_latencies = {}
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="readiness-tracker", daemon=True)
+
+    def start(self):
+        """
+        Start following the scale actions in the background.
+        """
+
+        self._thread.start()
+
+    def stop(self):
+        """
+        Stop following the scale actions.
+        """
+
+        self._stop_event.set()
+
+    def track(self, namespace: str, name: str, from_replicas: int, to_replicas: int):
+        """
+        Follow a scale action until its rollout converges. A pending action of the same deployment is superseded. A
+        scale up extending a pending scale up keeps its start, so the time-to-ready is measured from the first scale
+        up which had not converged yet rather than from the latest one.
+
+        Parameters
+        ----------
+        namespace
+            Namespace of the deployment.
+        name
+            Name of the deployment.
+        from_replicas
+            Replica count before the scale action.
+        to_replicas
+            Requested replica count.
+        """
+
+        scale_event = _ScaleEvent(namespace, name, from_replicas, to_replicas, self.deadline)
+
+        with self._lock:
+            pending = self._pending.get((namespace, name))
+            if pending is not None and pending.from_replicas < pending.to_replicas < to_replicas:
+                scale_event.from_replicas = pending.from_replicas
+                scale_event.started = pending.started
+                scale_event.deadline = pending.deadline
+            self._pending[(namespace, name)] = scale_event
+
+    def startup_latency(self, namespace: str, name: str) -> Optional[float]:
+        """
+        Measured time for new pods of a deployment to become ready.
+
+        Parameters
+        ----------
+        namespace
+            Namespace of the deployment.
+        name
+            Name of the deployment.
+
+        Returns
+        -------
+        float
+            High percentile of the recent times-to-ready of scale ups in seconds, None if none was measured yet.
+        """
+
+        with self._lock:
+            latencies = list(self._startup_latencies.get((namespace, name), ()))
+
+        if not latencies:
+            return None
+        return float(np.percentile(latencies, constants.STARTUP_LATENCY_PERCENTILE))
+
+    def lead_time_steps(self, namespace: str, name: str, configured_steps: int, step_seconds: float) -> int:
+        """
+        Number of steps the scaling decision of a deployment has to look ahead: the configured pod startup lead
+        time, extended to the measured startup latency.
+
+        Parameters
+        ----------
+        namespace
+            Namespace of the deployment.
+        name
+            Name of the deployment.
+        configured_steps
+            Configured pod startup lead time in steps.
+        step_seconds
+            Length of a step in seconds.
+
+        Returns
+        -------
+        int
+            Pod startup lead time in steps.
+        """
+
+        startup_latency = self.startup_latency(namespace, name)
+        if startup_latency is None:
+            return configured_steps
+        return max(configured_steps, int(math.ceil(startup_latency / step_seconds)))
+
+    def _check(self, scale_event: _ScaleEvent):
+        """
+        Check the readiness of a followed scale action and report it once it converged or its deadline passed.
+
+        Parameters
+        ----------
+        scale_event
+            Followed scale action.
+        """
+
+        ready_replicas = self.ready_replicas_reader(scale_event.namespace, scale_event.name) or 0
+        scaling_up = scale_event.to_replicas > scale_event.from_replicas
+        now = time.monotonic()
+
+        if (scaling_up and ready_replicas >= scale_event.to_replicas) or \
+                (not scaling_up and ready_replicas <= scale_event.to_replicas):
+
+            time_to_ready = now - scale_event.started
+            with self._lock:
+                if self._pending.get((scale_event.namespace, scale_event.name)) is scale_event:
+                    del self._pending[(scale_event.namespace, scale_event.name)]
+                if scaling_up:
+                    self._startup_latencies.setdefault(
+                        (scale_event.namespace, scale_event.name), deque(maxlen=constants.STARTUP_LATENCY_SAMPLES)
+                    ).append(time_to_ready)
+                self.converged += 1
+
+            local_metrics.time_to_ready.observe(time_to_ready, scale_event.namespace, scale_event.name)
+            logger.log_action(
+                "info",
+                "Pod count of " + scale_event.name + " converged from " + str(scale_event.from_replicas) + " to " +
+                str(ready_replicas) + " ready replica(s) in " + str(round(time_to_ready, 1)) + " seconds"
+            )
+
+        elif now >= scale_event.deadline:
+
+            with self._lock:
+                if self._pending.get((scale_event.namespace, scale_event.name)) is scale_event:
+                    del self._pending[(scale_event.namespace, scale_event.name)]
+                self.timeouts += 1
+
+            local_metrics.readiness_timeouts.inc(1, scale_event.namespace, scale_event.name)
+            logger.log_action(
+                "warning",
+                "Pod count of " + scale_event.name + " did not converge to " + str(scale_event.to_replicas) +
+                " ready replica(s) within " + str(self.deadline) + " seconds (" + str(ready_replicas) + " ready)"
+            )
+
+    def _run(self):
+        """
+        Check the pending scale actions until the tracker is stopped.
+        """
+
+        while not self._stop_event.wait(self.poll_interval):
+            with self._lock:
+                pending = list(self._pending.values())
+
+            for scale_event in pending:
+                try:
+                    self._check(scale_event)
+                except Exception as exception:
+                    logger.log_action(
+                        "warning",
+                        "Failed to check the readiness of " + scale_event.name + ": " + str(exception),
+                        cloud_log_bool=False
+                    )
@@ -1,12 +1,88 @@
 import math
-from kubernetes import client, config
+import threading
+from typing import Optional, Sequence, Union
+from kubernetes import client, config, watch
 from Modules.Constants import constants
 from Modules.Logs import logger
+from Modules.MetricsManagers import local_metrics
+from Modules.AdaptionManager.deployment_state_cache import DeploymentStateCache
+from Modules.AdaptionManager.readiness_tracker import ReadinessTracker
+from Modules.Scheduler.tick_scheduler import get_tick_interval
 
+_apps_api = None
+_apps_api_lock = threading.Lock()
+_deployment_state_cache = None
+_readiness_tracker = None
 
-def _get_deployment(api: client.AppsV1Api, configurations: dict) -> client.models.v1_deployment.V1Deployment:
+
+def _load_kube_config() -> str:
+    """
+    Method to load the configuration of the Kubernetes cluster. The service account of the pod is used when running
+    inside the cluster, the local kube config otherwise.
+
+    Returns
+    -------
+    str
+        Source of the loaded configuration.
+    """
+
+    try:
+        config.load_incluster_config()
+        return "in-cluster service account"
+    except config.ConfigException:
+        config.load_kube_config()
+        return "kube config"
+
+
+def _get_apps_api() -> client.AppsV1Api:
+    """
+    Method to receive the AppsV1Api object shared by all targets. The kube config and the ApiClient, with its
+    connection pool, are created on the first call only.
+
+    Returns
+    -------
+    AppsV1Api
+        AppsV1Api object of gcloud
+    """
+
+    global _apps_api
+
+    with _apps_api_lock:
+        if _apps_api is None:
+            config_source = _load_kube_config()
+            _apps_api = client.AppsV1Api(client.ApiClient())
+            logger.log_action("info", "Kubernetes client created from the " + config_source, cloud_log_bool=False)
+        return _apps_api
+
+
+def use_apps_api(api) -> Optional[client.AppsV1Api]:
     """
-    Method to receive kubernetes deployment object model
+    Method to make the scaling decisions talk to the given AppsV1Api object instead of the cluster of the kube config,
+    e.g. to the in-memory stand-in of the replay simulator
+
+    Parameters
+    ----------
+    api
+        AppsV1Api object, or a stand-in offering the scale subresource. None to create the shared one again on the
+        next call.
+
+    Returns
+    -------
+    AppsV1Api
+        The AppsV1Api object used so far, to be restored afterwards.
+    """
+
+    global _apps_api
+
+    with _apps_api_lock:
+        previous_api = _apps_api
+        _apps_api = api
+    return previous_api
+
+
+def _get_scale(api: client.AppsV1Api, configurations: dict) -> client.V1Scale:
+    """
+    Method to receive the scale subresource of the kubernetes deployment
 
     Parameters
     ----------
@@ -14,91 +90,291 @@ def _get_deployment(api: client.AppsV1Api, configurations: dict) -> client.model
         AppsV1Api object of gcloud
     configurations
         Configuration passed for the custom HPA programme
+
+    Returns
+    -------
+    V1Scale
+        Desired and current replica count of the deployment.
+    """
+
+    with local_metrics.stage_timer(constants.LOCAL_METRICS_STAGE_KUBERNETES_READ):
+        scale = api.read_namespaced_deployment_scale(
+            namespace=configurations[constants.NAMESPACE],
+            name=configurations[constants.DEPLOYMENT_NAME]
+        )
+    return scale
+
+
+def start_deployment_state_cache(targets: list, api=None, watch_factory=None) -> DeploymentStateCache:
+    """
+    Method to start watching the target deployments, so the scaling decisions read their replica counts from a local
+    cache instead of the API server
+
+    Parameters
+    ----------
+    targets
+        Configurations of the target deployments.
+    api
+        AppsV1Api object to list and watch with, the shared one if not given.
+    watch_factory
+        Callable creating the watches, kubernetes.watch.Watch if not given.
+
+    Returns
+    -------
+    DeploymentStateCache
+        The started deployment state cache.
+    """
+
+    global _apps_api, _deployment_state_cache
+
+    if api is not None:
+        _apps_api = api
+
+    if _deployment_state_cache is not None:
+        _deployment_state_cache.stop()
+
+    _deployment_state_cache = DeploymentStateCache(_get_apps_api(), targets, watch_factory or watch.Watch)
+    _deployment_state_cache.start()
+    return _deployment_state_cache
+
+
+def _ready_replicas(namespace: str, name: str) -> Optional[int]:
+    """
+    Method to receive the ready replica count of a deployment, from the deployment state cache when it tracks the
+    deployment, from the API server otherwise
+
+    Parameters
+    ----------
+    namespace
+        Namespace of the deployment.
+    name
+        Name of the deployment.
+
+    Returns
+    -------
+    int
+        Ready replica count of the deployment.
+    """
+
+    if _deployment_state_cache is not None:
+        state = _deployment_state_cache.get(namespace, name)
+        if state is not None:
+            return state.ready_replicas
+
+    return _get_apps_api().read_namespaced_deployment(name=name, namespace=namespace).status.ready_replicas
+
+
+def start_readiness_tracker(deadline: float = constants.DEFAULT_READINESS_DEADLINE) -> ReadinessTracker:
+    """
+    Method to start following the rollouts of the scaling commands in the background
+
+    Parameters
+    ----------
+    deadline
+        Number of seconds after which a rollout is reported as not converged.
+
+    Returns
+    -------
+    ReadinessTracker
+        The started readiness tracker.
+    """
+
+    global _readiness_tracker
+
+    if _readiness_tracker is not None:
+        _readiness_tracker.stop()
+
+    _readiness_tracker = ReadinessTracker(_ready_replicas, deadline)
+    _readiness_tracker.start()
+    return _readiness_tracker
+
+
+def with_measured_lead_time(configurations: dict) -> dict:
     """
+    Method to extend the configured pod startup lead time of a target to the startup latency measured by the
+    readiness tracker, so the workload is forecasted and scaled for far enough ahead
 
-    deployment = api.read_namespaced_deployment(
-        namespace=configurations[constants.NAMESPACE],
-        name=configurations[constants.DEPLOYMENT_NAME]
+    Parameters
+    ----------
+    configurations
+        Configuration of the target deployment.
+
+    Returns
+    -------
+    dict
+        Configuration of the target deployment with the effective pod startup lead time.
+    """
+
+    if _readiness_tracker is None:
+        return configurations
+
+    configured_steps = max(1, int(configurations.get(constants.POD_STARTUP_LEAD_TIME,
+                                                     constants.DEFAULT_POD_STARTUP_LEAD_TIME)))
+    lead_time_steps = _readiness_tracker.lead_time_steps(
+        configurations[constants.NAMESPACE],
+        configurations[constants.DEPLOYMENT_NAME],
+        configured_steps,
+        get_tick_interval(configurations)
     )
-    return deployment
 
+    if lead_time_steps == configured_steps:
+        return configurations
+    return dict(configurations, **{constants.POD_STARTUP_LEAD_TIME: lead_time_steps})
+
+
+def _current_replicas(api: client.AppsV1Api, configurations: dict) -> int:
+    """
+    Method to receive the current replica count of the deployment, from the deployment state cache when it tracks the
+    deployment, from the scale subresource otherwise
+
+    Parameters
+    ----------
+    api
+        AppsV1Api object of gcloud
+    configurations
+        Configuration passed for the custom HPA programme
+
+    Returns
+    -------
+    int
+        Desired replica count of the deployment.
+    """
 
-def _scaling_command(
-        api: client.AppsV1Api,
-        deployment: client.models.v1_deployment.V1Deployment,
-        number_of_pods: int,
-        configurations: dict
-) -> int:
+    if _deployment_state_cache is not None:
+        state = _deployment_state_cache.get(
+            configurations[constants.NAMESPACE], configurations[constants.DEPLOYMENT_NAME]
+        )
+        if state is not None:
+            return state.replicas
+
+    return _get_scale(api, configurations).spec.replicas
+
+
+def _scaling_command(api: client.AppsV1Api, current_pods_count: int, number_of_pods: int, configurations: dict) -> int:
     """
-    Method to execute scaling commands to the Kubernetes Deployment
+    Method to execute scaling commands to the Kubernetes Deployment. Only the replica count is sent, through the scale
+    subresource, so the pod template is neither transferred nor overwritten. The command does not wait for the new
+    pods, their readiness is followed by the readiness tracker in the background.
 
     Parameters
     ----------
     api
         AppsV1Api object of gcloud
-    deployment
-        Kubernetes deployment object
+    current_pods_count
+        Replica count of the deployment before the scaling command
     number_of_pods
-        Determined pod replicas count for the next minute
+        Determined pod replicas count for the next tick
     configurations
         Configuration passed for the custom HPA programme
 
     Returns
     -------
-    PrometheusConnect
-        A PrometheusConnect object with connection details.
+    int
+        Replica count requested from the deployment.
     """
 
-    deployment.spec.replicas = number_of_pods
-    request = api.patch_namespaced_deployment(
-        name=deployment.metadata.name,
-        namespace=deployment.metadata.namespace,
-        body=deployment
-    )
-    updated_deployment = _get_deployment(api, configurations)
-    ready_replicas = updated_deployment.status.ready_replicas
-    return ready_replicas
+    namespace = configurations[constants.NAMESPACE]
+    deployment_name = configurations[constants.DEPLOYMENT_NAME]
 
+    with local_metrics.stage_timer(constants.LOCAL_METRICS_STAGE_KUBERNETES_PATCH):
+        scale = api.patch_namespaced_deployment_scale(
+            name=deployment_name,
+            namespace=namespace,
+            body={"spec": {"replicas": number_of_pods}}
+        )
 
-def scaling_decisions(predicted_workload: int, configurations: dict):
+    if _deployment_state_cache is not None:
+        _deployment_state_cache.record_replicas(namespace, deployment_name, number_of_pods)
+    if _readiness_tracker is not None:
+        _readiness_tracker.track(namespace, deployment_name, current_pods_count, number_of_pods)
+
+    return scale.spec.replicas
+
+
+def _peak_workload(predicted_workload: Union[int, Sequence[int]], configurations: dict) -> int:
+    """
+    Method to determine the workload the pods have to be scaled for. New pods only serve traffic once they are ready,
+    so the peak of the forecasted workload across the pod startup lead time is used.
+
+    Parameters
+    ----------
+    predicted_workload
+        Predicted requests per minute for the next tick, or for each of the next ticks.
+    configurations
+        Configuration passed for the custom HPA programme
+
+    Returns
+    -------
+    int
+        Workload to be scaled for.
+    """
+
+    if isinstance(predicted_workload, int):
+        return predicted_workload
+
+    lead_time_steps = max(1, int(configurations.get(constants.POD_STARTUP_LEAD_TIME,
+                                                    constants.DEFAULT_POD_STARTUP_LEAD_TIME)))
+    return max(predicted_workload[:lead_time_steps])
+
+
+def _record_decision(configurations: dict, outcome: str, pod_count: Optional[int]) -> Optional[int]:
+    """
+    Method to record the outcome of a scaling decision on the local metrics endpoint
+
+    Parameters
+    ----------
+    configurations
+        Configuration passed for the custom HPA programme
+    outcome
+        Outcome of the decision, one of the SCALING_OUTCOME_* constants.
+    pod_count
+        Pod replica count resulting from the decision.
+
+    Returns
+    -------
+    int
+        The given pod replica count.
+    """
+
+    namespace = configurations[constants.NAMESPACE]
+    deployment_name = configurations[constants.DEPLOYMENT_NAME]
+    local_metrics.scaling_decision_outcomes.inc(1, namespace, deployment_name, outcome)
+    if pod_count is not None:
+        local_metrics.pod_replicas.set(pod_count, namespace, deployment_name)
+    return pod_count
+
+
+def scaling_decisions(predicted_workload: Union[int, Sequence[int]], configurations: dict):
     """
     Method to determine the pod count needed and communicate scaling decisions with the Kubernetes cluster
 
     Parameters
     ----------
     predicted_workload
-        TimeSeries object with the predicted workload for the next minute.
+        Predicted requests per minute for the next tick, or for each of the next ticks.
     configurations
         Configuration passed for the custom HPA programme
     """
 
-    config.load_kube_config()
-    api = client.AppsV1Api()
+    predicted_workload = _peak_workload(predicted_workload, configurations)
+
+    api = _get_apps_api()
 
-    deployment = _get_deployment(api, configurations)
-    current_pods_count = deployment.spec.replicas
+    current_pods_count = _current_replicas(api, configurations)
 
     number_of_pods_for_next_interval = \
         int(math.ceil(predicted_workload / configurations[constants.INCOMING_REQUEST_THRESHOLD_VALUE]))
 
     if number_of_pods_for_next_interval > current_pods_count:
 
-        pod_count_after_scaling = _scaling_command(api, deployment, number_of_pods_for_next_interval, configurations)
-
-        if pod_count_after_scaling == number_of_pods_for_next_interval:
-            logger.log_action(
-                "info",
-                "Pod count is increased from " + str(current_pods_count) + " to " + str(pod_count_after_scaling)
-            )
-            return pod_count_after_scaling
-
+        pod_count_after_scaling = _scaling_command(api, current_pods_count, number_of_pods_for_next_interval,
+                                                   configurations)
         logger.log_action(
             "info",
-            "Pod count will be increased from " + str(current_pods_count) + " to " +
-            str(number_of_pods_for_next_interval)
+            "Pod count of " + configurations[constants.DEPLOYMENT_NAME] + " is being increased from " +
+            str(current_pods_count) + " to " + str(pod_count_after_scaling)
         )
-
-        return pod_count_after_scaling
+        return _record_decision(configurations, constants.SCALING_OUTCOME_SCALE_UP, pod_count_after_scaling)
 
     elif number_of_pods_for_next_interval < current_pods_count:
 
@@ -110,30 +386,23 @@ def scaling_decisions(predicted_workload: int, configurations: dict):
 
         if surplus_pods == 0:
             logger.log_action("info",
-                              "Pod replica count of " + str(number_of_pods_for_next_interval) + " to be maintained")
+                              "Pod replica count of " + str(current_pods_count) +
+                              " to be maintained for " + configurations[constants.DEPLOYMENT_NAME])
 
-            return number_of_pods_for_next_interval
+            return _record_decision(configurations, constants.SCALING_OUTCOME_MAINTAIN, current_pods_count)
         else:
             number_of_pods_for_next_interval = current_pods_count - surplus_pods
-            pod_count_after_scaling = _scaling_command(api, deployment, number_of_pods_for_next_interval,
+            pod_count_after_scaling = _scaling_command(api, current_pods_count, number_of_pods_for_next_interval,
                                                        configurations)
-
-            if pod_count_after_scaling == number_of_pods_for_next_interval:
-                logger.log_action(
-                    "info",
-                    "Pod count is decreased from " + str(current_pods_count) + " to " + str(pod_count_after_scaling)
-                )
-                return pod_count_after_scaling
-
             logger.log_action(
                 "info",
-                "Pod count will be decreased from " + str(current_pods_count) + " to " + str(
-                    number_of_pods_for_next_interval)
+                "Pod count of " + configurations[constants.DEPLOYMENT_NAME] + " is being decreased from " +
+                str(current_pods_count) + " to " + str(pod_count_after_scaling)
             )
-
-            return pod_count_after_scaling
+            return _record_decision(configurations, constants.SCALING_OUTCOME_SCALE_DOWN, pod_count_after_scaling)
 
     else:
 
-        logger.log_action("info", "Pod replica count of " + str(number_of_pods_for_next_interval) + " to be maintained")
-        return number_of_pods_for_next_interval
+        logger.log_action("info", "Pod replica count of " + str(number_of_pods_for_next_interval) +
+                          " to be maintained for " + configurations[constants.DEPLOYMENT_NAME])
+        return _record_decision(configurations, constants.SCALING_OUTCOME_MAINTAIN, number_of_pods_for_next_interval)
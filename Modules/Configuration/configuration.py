@@ -1,12 +1,26 @@
 import yaml
 import os
+import time
 import main
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable
 from yaml.loader import SafeLoader
 from requests.exceptions import ConnectionError
 from Modules.Constants import constants
-from Modules.Logs import logger
+from Modules.Logs import logger, cloud_logging
 from Modules.MetricsManagers.prometheus_monitor import check_prometheus_server_endpoint
-from Modules.Forecasters.workload_forecaster import load_forecasting_model
+from Modules.MetricsManagers import local_metrics
+from Modules.AdaptionManager.resource_adaptor import start_deployment_state_cache, start_readiness_tracker
+from Modules.Forecasters.workload_forecaster import load_forecasting_model, load_scaler_parameters, \
+    verify_inference_engine, get_model_version
+from Modules.Forecasters.forecast_cache import ForecastCache
+from Modules.Forecasters.forecast_store import ForecastStore
+from Modules.Forecasters.fallback_forecasters import create_fallback_forecasters
+from Modules.Forecasters.tiered_forecaster import TieredForecaster
+from Modules.Forecasters.model_reloader import ModelReloader, watched_model_path
+from Modules.Scheduler.tick_scheduler import get_tick_interval, is_valid_tick_interval
+
+startup_durations = {}
 
 
 def _load_config() -> dict:
@@ -71,9 +85,18 @@ def _check_configuration_file_availability():
         logger.log_action("info", "Configuration file found in the directory!", cloud_log_bool=False)
         main.configs = _load_config()
 
-        _check_service_account_file_availability()
-
         if type(main.configs) == dict:
+            if main.configs[constants.ENABLE_CLOUD_LOGGING] or main.configs[constants.ENABLE_CLOUD_METRIC_PUBLISHING]:
+                _check_service_account_file_availability()
+            else:
+                logger.log_action("info", "Cloud features disabled. Service account not loaded", cloud_log_bool=False)
+
+            if main.configs[constants.ENABLE_CLOUD_LOGGING]:
+                cloud_logging.start_log_shipper(
+                    main.configs.get(constants.CLOUD_LOG_QUEUE_SIZE, constants.DEFAULT_CLOUD_LOG_QUEUE_SIZE),
+                    main.configs.get(constants.CLOUD_LOG_BATCH_SIZE, constants.DEFAULT_CLOUD_LOG_BATCH_SIZE),
+                    main.configs.get(constants.CLOUD_LOG_FLUSH_INTERVAL, constants.DEFAULT_CLOUD_LOG_FLUSH_INTERVAL)
+                )
             logger.log_action("info", "Autoscaler configuration file loaded successfully!")
         else:
             logger.log_action("error", "Failed to load the configuration file")
@@ -83,11 +106,184 @@ def _check_configuration_file_availability():
         main.stop_program(cloud_log_bool=False)
 
 
+def get_target_configurations(configurations: dict) -> list:
+    """
+    Expand the loaded configurations into one configuration dictionary per target deployment. Every entry of the
+    'targets' list overrides the top level values, so thresholds and replica limits can be tuned per deployment.
+    Without a 'targets' list the top level deployment is the only target. The tick interval is shared by all targets,
+    as they are scaled on the same ticks, so it can only be set at the top level.
+
+    Parameters
+    ----------
+    configurations
+        Configuration passed for the custom HPA programme
+
+    Returns
+    ----------
+    list
+        A list of configuration dictionaries, one per target deployment.
+    """
+
+    targets = configurations.get(constants.TARGETS)
+
+    if not targets:
+        return [configurations]
+
+    for target in targets:
+        if constants.TICK_INTERVAL in target:
+            raise ValueError("Tick interval of target " + str(target.get(constants.DEPLOYMENT_NAME)) +
+                             " can only be set at the top level, all targets are scaled on the same ticks")
+
+    base_configurations = {key: value for key, value in configurations.items() if key != constants.TARGETS}
+    return [{**base_configurations, **target} for target in targets]
+
+
+def _check_targets():
+    """
+    Resolve the target deployments to be autoscaled by this process.
+    """
+
+    try:
+        main.targets = get_target_configurations(main.configs)
+    except ValueError as error:
+        logger.log_action("error", str(error) + "!")
+        main.stop_program()
+
+    logger.log_action(
+        "info",
+        "Autoscaling " + str(len(main.targets)) + " deployment(s): " +
+        ", ".join(target[constants.NAMESPACE] + "/" + target[constants.DEPLOYMENT_NAME] for target in main.targets)
+    )
+
+
+def _check_tick_interval():
+    """
+    Validate the configured tick interval, which has to divide an hour so the ticks line up with every hour.
+    """
+
+    tick_interval = get_tick_interval(main.configs)
+
+    if not is_valid_tick_interval(tick_interval):
+        logger.log_action("error", "Tick interval of " + str(tick_interval) + " seconds does not divide an hour!")
+        main.stop_program()
+
+    logger.log_action("info", "Autoscaling every " + str(tick_interval) + " seconds")
+
+
+def _check_scaler_parameters_availability():
+    """
+    Load the scaling parameters persisted alongside the forecasting model, if any.
+    """
+
+    main.scaler_parameters = load_scaler_parameters()
+
+    if main.scaler_parameters is not None:
+        logger.log_action("info", "Scaling parameters of the forecasting model loaded successfully!")
+    else:
+        logger.log_action("warning", "Scaling parameters of the forecasting model not found! Every window will be "
+                                     "scaled on its own")
+
+
+def _check_inference_engine():
+    """
+    Create and warm up the configured inference engine of the forecasting model. An engine bypassing TCNModel.predict
+    has to reproduce its predictions on canary windows, otherwise the darts engine is used.
+    """
+
+    from Modules.Forecasters.inference_engine import create_inference_engine, DartsInferenceEngine
+
+    main.inference_engine = create_inference_engine(main.forecasting_model, main.configs)
+
+    if isinstance(main.inference_engine, DartsInferenceEngine):
+        logger.log_action("info", "Inference engine '" + main.inference_engine.name + "' ready!")
+        return
+
+    difference = verify_inference_engine(main.inference_engine, main.forecasting_model)
+
+    if difference <= constants.INFERENCE_PARITY_TOLERANCE:
+        logger.log_action("info", "Inference engine '" + main.inference_engine.name + "' ready! Maximum difference to "
+                                  "the darts predictions is " + str(difference))
+    else:
+        logger.log_action("error", "Inference engine '" + main.inference_engine.name + "' differs from the darts "
+                                   "predictions by " + str(difference) + ". Falling back to the darts engine")
+        main.inference_engine = DartsInferenceEngine(main.forecasting_model)
+
+
+def _check_forecast_cache(model_path: str):
+    """
+    Create the forecast cache for the loaded forecasting model, unless it is disabled with a size of 0, and the store
+    reusing multi-step forecasts across ticks, unless it is disabled with a tolerance of 0.
+
+    Parameters
+    ----------
+    model_path
+        Path to the model file in use.
+    """
+
+    cache_size = main.configs.get(constants.FORECAST_CACHE_SIZE, constants.DEFAULT_FORECAST_CACHE_SIZE)
+
+    if cache_size > 0:
+        main.forecast_cache = ForecastCache(cache_size, get_model_version(model_path))
+        logger.log_action("info", "Forecast cache enabled for up to " + str(cache_size) + " windows")
+    else:
+        main.forecast_cache = None
+        logger.log_action("info", "Forecast cache disabled")
+
+    tolerance = main.configs.get(constants.FORECAST_REUSE_TOLERANCE, constants.DEFAULT_FORECAST_REUSE_TOLERANCE)
+
+    if tolerance > 0:
+        main.forecast_store = ForecastStore(tolerance)
+        logger.log_action("info", "Forecasts reused across ticks within a tolerance of " + str(tolerance))
+    else:
+        main.forecast_store = None
+
+
+def _check_onnx_model_availability():
+    """
+    Check availability of the exported ONNX forecasting model and load it into an ONNX Runtime inference engine. The
+    darts model, and with it torch, is not loaded at all with this backend. With int8 model quantization enabled, the
+    quantized variant of the model is produced (or taken from its cache) and used instead.
+    """
+
+    from Modules.Forecasters.onnx_inference_engine import OnnxInferenceEngine
+
+    if os.path.exists(constants.PATH_TO_ONNX_MODEL):
+
+        logger.log_action("info", "ONNX forecasting model found in the directory!")
+
+        model_path = constants.PATH_TO_ONNX_MODEL
+        if main.configs.get(constants.MODEL_QUANTIZATION) == constants.MODEL_QUANTIZATION_INT8:
+            from Modules.Forecasters.model_quantization import load_quantized_model_path
+
+            model_path = load_quantized_model_path()
+            logger.log_action("info", "Using the int8 quantized forecasting model " + model_path)
+
+        main.inference_engine = OnnxInferenceEngine(model_path)
+        main.inference_engine.warm_up()
+        _check_scaler_parameters_availability()
+        _check_forecast_cache(model_path)
+        logger.log_action("info", "Inference engine '" + main.inference_engine.name + "' ready!")
+
+    else:
+        logger.log_action("error", "ONNX forecasting model not found in the directory! Export it with "
+                                   "Tools/export_onnx_model.py")
+        main.stop_program()
+
+
 def _check_forecasting_model_availability():
     """
     Check availability of forecasting model file and load.
     """
 
+    if main.configs.get(constants.INFERENCE_BACKEND) == constants.INFERENCE_BACKEND_ONNX:
+        _check_onnx_model_availability()
+        return
+
+    if main.configs.get(constants.MODEL_QUANTIZATION, constants.MODEL_QUANTIZATION_NONE) != \
+            constants.MODEL_QUANTIZATION_NONE:
+        logger.log_action("warning", "Model quantization is only supported by the 'onnx' inference backend and "
+                                     "is ignored")
+
     if os.path.exists(constants.PATH_TO_DEEP_LEARNING_MODEL):
 
         logger.log_action("info", "Deep learning model found in the directory!")
@@ -95,6 +291,9 @@ def _check_forecasting_model_availability():
 
         if main.forecasting_model.model_created:
             logger.log_action("info", "Forecasting model loaded successfully!")
+            _check_scaler_parameters_availability()
+            _check_inference_engine()
+            _check_forecast_cache(constants.PATH_TO_DEEP_LEARNING_MODEL)
         else:
             logger.log_action("error", "Failed to load the forecasting model")
             main.stop_program()
@@ -104,6 +303,41 @@ def _check_forecasting_model_availability():
         main.stop_program()
 
 
+def _check_fallback_forecasters():
+    """
+    Create the tiered forecaster, falling back to the configured fallback forecasters whenever the forecasting model
+    misses the forecasting deadline or fails.
+    """
+
+    try:
+        fallback_forecasters = create_fallback_forecasters(main.configs)
+    except ValueError as error:
+        logger.log_action("error", str(error) + "!")
+        main.stop_program()
+
+    main.tiered_forecaster = TieredForecaster(fallback_forecasters)
+    logger.log_action("info", "Fallback forecasters: " + ", ".join(tier for tier, _ in fallback_forecasters))
+
+
+def _check_model_reloader():
+    """
+    Start watching the forecasting model file, so a retrained model is swapped in without a restart, unless it is
+    disabled with a reload interval of 0.
+    """
+
+    reload_interval = main.configs.get(constants.MODEL_RELOAD_INTERVAL, constants.DEFAULT_MODEL_RELOAD_INTERVAL)
+
+    if reload_interval > 0:
+        model_path = watched_model_path(main.configs)
+        main.model_reloader = ModelReloader(main.configs, get_model_version(model_path), reload_interval)
+        main.model_reloader.start()
+        logger.log_action("info", "Forecasting model " + model_path + " checked for changes every " +
+                          str(reload_interval) + " seconds")
+    else:
+        main.model_reloader = None
+        logger.log_action("info", "Forecasting model reload disabled")
+
+
 def _check_prometheus_availability():
     """
     Initial method to check the availability of the prometheus metric server.
@@ -130,19 +364,139 @@ def _check_cloud_monitoring_dashboard_status():
         logger.log_action("info", "Cloud logging enabled")
 
     if not main.configs[constants.ENABLE_CLOUD_METRIC_PUBLISHING]:
+        main.metric_publisher = None
         logger.log_action("info", "Cloud metric publishing disabled", cloud_log_bool=False)
     else:
-        logger.log_action("info", "Cloud metric publishing enabled")
+        try:
+            from Modules.MetricsManagers.cloud_metric_publisher import CloudMetricPublisher
 
+            main.metric_publisher = CloudMetricPublisher(main.configs)
+            logger.log_action("info", "Cloud metric publishing enabled")
+        except Exception:
+            main.metric_publisher = None
+            logger.log_action("error", "Failed to resolve the cloud metric descriptors. Cloud metric publishing "
+                                       "disabled")
 
-def load_fundamentals():
+
+def _check_local_metrics_endpoint():
+    """
+    Start the local /metrics endpoint scraped by prometheus, if a port is configured.
+    """
+
+    port = main.configs.get(constants.LOCAL_METRICS_PORT)
+
+    if port is None:
+        logger.log_action("info", "Local metrics endpoint disabled", cloud_log_bool=False)
+        return
+
+    try:
+        local_metrics.start_metrics_server(port)
+        logger.log_action("info", "Local metrics served on port " + str(port) + " at /metrics")
+    except OSError:
+        logger.log_action("error", "Failed to start the local metrics endpoint on port " + str(port))
+
+
+def _check_deployment_state_cache():
     """
-    Method to cross validate the existence of all needful files.
+    Start watching the target deployments, unless disabled in the configuration.
+    """
+
+    if not main.configs.get(constants.KUBERNETES_WATCH, True):
+        logger.log_action("info", "Deployment watch disabled. Replica counts are read every tick", cloud_log_bool=False)
+        return
+
+    try:
+        deployment_state_cache = start_deployment_state_cache(main.targets)
+    except Exception:
+        logger.log_action("error", "Failed to start the deployment watch. Replica counts are read every tick")
+        return
+
+    if deployment_state_cache.wait_for_sync(constants.KUBERNETES_WATCH_SYNC_TIMEOUT):
+        logger.log_action("info", "Deployment state cache synced for " + str(len(main.targets)) + " target(s)")
+    else:
+        logger.log_action("warning", "Deployment state cache not synced yet. Replica counts are read until it is")
+
+
+def _check_readiness_tracker():
+    """
+    Start following the rollouts of the scaling commands in the background.
+    """
+
+    deadline = main.configs.get(constants.READINESS_DEADLINE, constants.DEFAULT_READINESS_DEADLINE)
+    start_readiness_tracker(deadline)
+    logger.log_action("info", "Readiness of scaled deployments tracked for up to " + str(deadline) + " seconds",
+                      cloud_log_bool=False)
+
+
+def _check_forecasting():
+    """
+    Load the forecasting model, then start watching it for changes.
     """
 
-    _check_configuration_file_availability()
     _check_forecasting_model_availability()
-    _check_prometheus_availability()
-    _check_cloud_monitoring_dashboard_status()
+    _check_model_reloader()
+
+
+def _check_kubernetes():
+    """
+    Start watching the target deployments, then start following the rollouts of the scaling commands.
+    """
+
+    _check_deployment_state_cache()
+    _check_readiness_tracker()
+
+
+def _timed_check(check: Callable):
+    """
+    Run a startup check and record its duration in seconds under its name.
+
+    Parameters
+    ----------
+    check
+        Startup check to be run.
+    """
+
+    start = time.perf_counter()
+    try:
+        check()
+    finally:
+        startup_durations[check.__name__.lstrip("_")] = time.perf_counter() - start
+
+
+def load_fundamentals():
+    """
+    Method to cross validate the existence of all needful files. Once the configuration is loaded, the independent
+    checks (model load, prometheus and kubernetes connectivity, cloud monitoring and the local metrics endpoint) run
+    concurrently, so startup takes as long as the slowest of them instead of their sum.
+    """
 
-    logger.log_action("info", "Waiting for a fresh minute...")
+    start = time.perf_counter()
+
+    _timed_check(_check_configuration_file_availability)
+    _timed_check(_check_tick_interval)
+    _timed_check(_check_targets)
+    _timed_check(_check_fallback_forecasters)
+
+    independent_checks = (
+        _check_forecasting,
+        _check_prometheus_availability,
+        _check_kubernetes,
+        _check_cloud_monitoring_dashboard_status,
+        _check_local_metrics_endpoint
+    )
+    with ThreadPoolExecutor(max_workers=len(independent_checks), thread_name_prefix="startup-check") as executor:
+        check_jobs = [executor.submit(_timed_check, check) for check in independent_checks]
+
+    # re-raises the exit of a check which stopped the programme
+    for check_job in check_jobs:
+        check_job.result()
+
+    startup_durations["load_fundamentals"] = time.perf_counter() - start
+    check_names = [check.__name__.lstrip("_") for check in independent_checks]
+    logger.log_action(
+        "info",
+        "Startup checks completed in " + str(round(startup_durations["load_fundamentals"], 2)) + " seconds (" +
+        ", ".join(name + ": " + str(round(startup_durations[name], 2)) + "s" for name in check_names) + ")",
+        cloud_log_bool=False
+    )
+    logger.log_action("info", "Waiting for the next tick...")
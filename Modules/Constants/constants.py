@@ -11,11 +11,46 @@ PROMETHEUS_SERVER_ADDRESS = 'prometheus_server_address'
 PREDICTION_ERROR_MITIGATION_VALUE = 'prediction_error_mitigation_value'
 ENABLE_CLOUD_METRIC_PUBLISHING = 'enable_cloud_metric_publishing'
 ENABLE_CLOUD_LOGGING = 'enable_cloud_logging'
+TARGETS = 'targets'
+MAX_CONCURRENT_TARGETS = 'max_concurrent_targets'
+PROMETHEUS_BACKEND = 'prometheus_backend'
+REQUEST_COUNT_BUFFER_SIZE = 'request_count_buffer_size'
+PROMETHEUS_CONNECT_TIMEOUT = 'prometheus_connect_timeout'
+PROMETHEUS_READ_TIMEOUT = 'prometheus_read_timeout'
+PROMETHEUS_MAX_RETRIES = 'prometheus_max_retries'
+PROMETHEUS_RETRY_BACKOFF_FACTOR = 'prometheus_retry_backoff_factor'
+INFERENCE_BACKEND = 'inference_backend'
+MODEL_QUANTIZATION = 'model_quantization'
+FORECAST_CACHE_SIZE = 'forecast_cache_size'
+FORECAST_HORIZON = 'forecast_horizon'
+POD_STARTUP_LEAD_TIME = 'pod_startup_lead_time'
+FORECAST_REUSE_TOLERANCE = 'forecast_reuse_tolerance'
+CLOUD_LOG_QUEUE_SIZE = 'cloud_log_queue_size'
+CLOUD_LOG_BATCH_SIZE = 'cloud_log_batch_size'
+CLOUD_LOG_FLUSH_INTERVAL = 'cloud_log_flush_interval'
+LOCAL_METRICS_PORT = 'local_metrics_port'
+KUBERNETES_WATCH = 'kubernetes_watch'
+READINESS_DEADLINE = 'readiness_deadline'
+INGESTION_BUDGET = 'ingestion_budget'
+FORECASTING_BUDGET = 'forecasting_budget'
+SCALING_BUDGET = 'scaling_budget'
+MAX_STALE_DATA_AGE = 'max_stale_data_age'
+SIMULATION_STARTUP_DELAY = 'simulation_startup_delay'
+SIMULATION_SLA_TOLERANCE = 'simulation_sla_tolerance'
+SIMULATION_POD_CAPACITY = 'simulation_pod_capacity'
+TICK_INTERVAL = 'tick_interval_seconds'
+FALLBACK_FORECASTERS = 'fallback_forecasters'
+FALLBACK_SMOOTHING_LEVEL = 'fallback_smoothing_level'
+FALLBACK_SMOOTHING_TREND = 'fallback_smoothing_trend'
+MODEL_RELOAD_INTERVAL = 'model_reload_interval'
 
 # paths
 PATH_TO_SCALER_CONFIG_FILE = 'Dropins/scaler_config.yaml'
 PATH_TO_SERVICE_ACCOUNT_CONFIG = 'Dropins/ServiceAccount/'
 PATH_TO_DEEP_LEARNING_MODEL = 'Dropins/Model/model.pth.tar'
+PATH_TO_SCALER_PARAMETERS = 'Dropins/Model/scaler.json'
+PATH_TO_ONNX_MODEL = 'Dropins/Model/model.onnx'
+PATH_TO_QUANTIZED_ONNX_MODEL = 'Dropins/Model/model.int8.onnx'
 
 # datetime
 DATE_TIME_FORMAT_STRING = '%Y-%m-%d %H:%M'
@@ -26,9 +61,48 @@ MONITORING_METRIC_TYPE = 'loadbalancing.googleapis.com/https/request_count'
 # time series config
 TIME_SERIES_TIME_COLUMN = "time"
 TIME_SERIES_VALUE_COLUMN = "count"
+TIME_SERIES_WINDOW_SIZE = 10
+
+# forecasting
+MINUTES_PER_HOUR = 60
+MINUTE_COVARIATE_COLUMNS = ["minute_" + str(minute) for minute in range(MINUTES_PER_HOUR)]
+INFERENCE_BACKEND_DARTS = 'darts'
+INFERENCE_BACKEND_TORCH = 'torch'
+INFERENCE_BACKEND_ONNX = 'onnx'
+MODEL_QUANTIZATION_NONE = 'none'
+MODEL_QUANTIZATION_INT8 = 'int8'
+INFERENCE_PARITY_TOLERANCE = 1e-6
+ONNX_PARITY_TOLERANCE = 1e-4
+DEFAULT_FORECAST_CACHE_SIZE = 1024
+DEFAULT_FORECAST_HORIZON = 1
+DEFAULT_POD_STARTUP_LEAD_TIME = 1
+DEFAULT_FORECAST_REUSE_TOLERANCE = 0
+ONNX_METADATA_INPUT_CHUNK_LENGTH = 'input_chunk_length'
+ONNX_METADATA_OUTPUT_CHUNK_LENGTH = 'output_chunk_length'
+SCALER_PARAMETER_MIN = 'min'
+SCALER_PARAMETER_MAX = 'max'
+
+# fallback forecasting
+FORECAST_TIER_MODEL = 'model'
+FORECAST_TIER_HOLT = 'holt'
+FORECAST_TIER_EWMA = 'ewma'
+FORECAST_TIER_LAST_VALUE_SLOPE = 'last_value_slope'
+FORECAST_TIER_LAST_VALUE = 'last_value'
+DEFAULT_FALLBACK_FORECASTERS = [FORECAST_TIER_HOLT, FORECAST_TIER_EWMA, FORECAST_TIER_LAST_VALUE_SLOPE]
+DEFAULT_FALLBACK_SMOOTHING_LEVEL = 0.5
+DEFAULT_FALLBACK_SMOOTHING_TREND = 0.3
+
+# model reload
+DEFAULT_MODEL_RELOAD_INTERVAL = 30
+MODEL_RELOAD_OUTCOME_SWAPPED = 'swapped'
+MODEL_RELOAD_OUTCOME_REJECTED = 'rejected'
 
 # cloud logging
 CLOUD_LOGGER_NAME = "my-test-log"
+DEFAULT_CLOUD_LOG_QUEUE_SIZE = 1000
+DEFAULT_CLOUD_LOG_BATCH_SIZE = 50
+DEFAULT_CLOUD_LOG_FLUSH_INTERVAL = 2.0
+CLOUD_LOG_SHUTDOWN_TIMEOUT = 10.0
 
 # metrics
 PREDICTED_REQUEST_COUNT_METRIC_DESCRIPTOR_TYPE = 'custom.googleapis.com/global/predicted_request_count'
@@ -38,10 +112,67 @@ PROMETHEUS_SERVER_METRIC_FOR_REQUEST_COUNT_METRIC_DESCRIPTOR_TYPE = \
 PREDICTED_REQUEST_COUNT = "predicted request count"
 POD_REPLICA_COUNT_BY_DEPLOYMENT = "pod replica count by deployment"
 PROMETHEUS_SERVER_METRIC_FOR_REQUEST_COUNT = "prometheus server metric for request count"
+MAX_TIME_SERIES_PER_REQUEST = 200
+
+# local metrics
+LOCAL_METRICS_LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+LOCAL_METRICS_STAGE_PROMETHEUS_FETCH = 'prometheus_fetch'
+LOCAL_METRICS_STAGE_SERIES_CONSTRUCTION = 'series_construction'
+LOCAL_METRICS_STAGE_PREPROCESSING = 'preprocessing'
+LOCAL_METRICS_STAGE_INFERENCE = 'inference'
+LOCAL_METRICS_STAGE_KUBERNETES_READ = 'kubernetes_read'
+LOCAL_METRICS_STAGE_KUBERNETES_PATCH = 'kubernetes_patch'
+LOCAL_METRICS_STAGE_PUBLISHING = 'publishing'
+LOCAL_METRICS_READINESS_BUCKETS = (5, 10, 15, 30, 45, 60, 90, 120, 180, 240, 300, 600)
+SCALING_OUTCOME_SCALE_UP = 'scale_up'
+SCALING_OUTCOME_SCALE_DOWN = 'scale_down'
+SCALING_OUTCOME_MAINTAIN = 'maintain'
+SCALING_OUTCOME_ERROR = 'error'
 
 # Prometheus
-PROMQL_HAPROXY_REQUEST_COUNT = 'sum by (backend) (increase(haproxy_backend_http_responses_total[1m]))'
-PROMQL_RESPONSE_METRIC = {'backend': 'allservers'}
+# requests per minute over the window of a tick, equal to increase(...[1m]) for a one minute tick
+PROMQL_HAPROXY_REQUEST_COUNT = 'sum by (backend) (rate(haproxy_backend_http_responses_total[{window}s])) * 60'
+PROMQL_RESPONSE_METRIC_LABEL = 'backend'
+DEFAULT_PROMETHEUS_BACKEND = 'allservers'
+DEFAULT_REQUEST_COUNT_BUFFER_SIZE = 60
+DEFAULT_PROMETHEUS_CONNECT_TIMEOUT = 2
+DEFAULT_PROMETHEUS_READ_TIMEOUT = 10
+DEFAULT_PROMETHEUS_MAX_RETRIES = 2
+DEFAULT_PROMETHEUS_RETRY_BACKOFF_FACTOR = 0.5
+PROMETHEUS_RETRY_ON_STATUS = [429, 500, 502, 503, 504]
+
+# kubernetes
+DEFAULT_KUBERNETES_WATCH_TIMEOUT = 300
+KUBERNETES_WATCH_RELIST_BACKOFF = 1.0
+KUBERNETES_WATCH_SYNC_TIMEOUT = 10
+DEFAULT_READINESS_DEADLINE = 600
+READINESS_POLL_INTERVAL = 1.0
+STARTUP_LATENCY_SAMPLES = 20
+STARTUP_LATENCY_PERCENTILE = 90
+
+# tick
+DEFAULT_TICK_INTERVAL = 60
+SECONDS_PER_HOUR = 3600
+
+# tick budget
+TICK_STAGE_INGESTION = 'ingestion'
+TICK_STAGE_FORECASTING = 'forecasting'
+TICK_STAGE_SCALING = 'scaling'
+DEFAULT_INGESTION_BUDGET_FRACTION = 1 / 3
+DEFAULT_FORECASTING_BUDGET_FRACTION = 1 / 6
+DEFAULT_SCALING_BUDGET_FRACTION = 1 / 4
+DEFAULT_MAX_STALE_DATA_AGE = 180
+
+# replay simulation
+DEFAULT_SIMULATION_STARTUP_DELAY = 60
+DEFAULT_SIMULATION_SLA_TOLERANCE = 0.05
+DEFAULT_SIMULATION_POD_CAPACITY = 400
+SIMULATION_NAMESPACE = 'simulation'
+SIMULATION_DEPLOYMENT_NAME = 'replayed-application'
+SIMULATION_TICK_INTERVAL = 60
+
+# multi target
+DEFAULT_MAX_CONCURRENT_TARGETS = 8
 
 # logging
 LOG_MESSAGE_FORMAT = '%(asctime)s - %(levelname)s - %(message)s'
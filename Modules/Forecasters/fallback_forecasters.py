@@ -0,0 +1,180 @@
+from functools import partial
+from typing import Tuple
+import numpy as np
+from Modules.Constants import constants
+
+
+def ewma_forecast(windows: np.ndarray, horizon: int, smoothing_level: float) -> np.ndarray:
+    """
+    Exponentially weighted moving average of every window, held flat over the horizon.
+
+    Parameters
+    ----------
+    windows
+        Array of shape (number of windows, window length) with the requests per minute.
+    horizon
+        Number of steps to be forecasted.
+    smoothing_level
+        Weight of the latest step, between 0 and 1.
+
+    Returns
+    -------
+    np.ndarray
+        Array of shape (number of windows, horizon) with the forecasted requests per minute.
+    """
+
+    level = windows[:, 0].astype(float)
+    for step in range(1, windows.shape[1]):
+        level = smoothing_level * windows[:, step] + (1 - smoothing_level) * level
+
+    return np.repeat(level[:, None], horizon, axis=1)
+
+
+def holt_forecast(windows: np.ndarray, horizon: int, smoothing_level: float, smoothing_trend: float) -> np.ndarray:
+    """
+    Holt's linear trend method on every window, extrapolating the smoothed level along the smoothed trend.
+
+    Parameters
+    ----------
+    windows
+        Array of shape (number of windows, window length) with the requests per minute.
+    horizon
+        Number of steps to be forecasted.
+    smoothing_level
+        Weight of the latest step in the level, between 0 and 1.
+    smoothing_trend
+        Weight of the latest level change in the trend, between 0 and 1.
+
+    Returns
+    -------
+    np.ndarray
+        Array of shape (number of windows, horizon) with the forecasted requests per minute.
+    """
+
+    level = windows[:, 0].astype(float)
+    trend = (windows[:, 1] - windows[:, 0]).astype(float)
+    for step in range(1, windows.shape[1]):
+        previous_level = level
+        level = smoothing_level * windows[:, step] + (1 - smoothing_level) * (level + trend)
+        trend = smoothing_trend * (level - previous_level) + (1 - smoothing_trend) * trend
+
+    return level[:, None] + trend[:, None] * np.arange(1, horizon + 1)
+
+
+def last_value_slope_forecast(windows: np.ndarray, horizon: int) -> np.ndarray:
+    """
+    Latest step of every window, extrapolated along the average slope of the window.
+
+    Parameters
+    ----------
+    windows
+        Array of shape (number of windows, window length) with the requests per minute.
+    horizon
+        Number of steps to be forecasted.
+
+    Returns
+    -------
+    np.ndarray
+        Array of shape (number of windows, horizon) with the forecasted requests per minute.
+    """
+
+    slope = (windows[:, -1] - windows[:, 0]) / max(1, windows.shape[1] - 1)
+    return windows[:, -1:] + slope[:, None] * np.arange(1, horizon + 1)
+
+
+def last_value_forecast(windows: np.ndarray, horizon: int) -> np.ndarray:
+    """
+    Latest step of every window, held flat over the horizon. Missing values count as no requests.
+
+    Parameters
+    ----------
+    windows
+        Array of shape (number of windows, window length) with the requests per minute.
+    horizon
+        Number of steps to be forecasted.
+
+    Returns
+    -------
+    np.ndarray
+        Array of shape (number of windows, horizon) with the forecasted requests per minute.
+    """
+
+    return np.repeat(np.nan_to_num(windows[:, -1:].astype(float)), horizon, axis=1)
+
+
+def create_fallback_forecasters(configurations: dict) -> list:
+    """
+    Create the chain of fallback forecasters selected by the 'fallback_forecasters' configuration, in the order they
+    are tried.
+
+    Parameters
+    ----------
+    configurations
+        Configuration passed for the custom HPA programme
+
+    Returns
+    -------
+    list
+        Tier name and forecasting method of every fallback forecaster.
+    """
+
+    smoothing_level = configurations.get(constants.FALLBACK_SMOOTHING_LEVEL, constants.DEFAULT_FALLBACK_SMOOTHING_LEVEL)
+    smoothing_trend = configurations.get(constants.FALLBACK_SMOOTHING_TREND, constants.DEFAULT_FALLBACK_SMOOTHING_TREND)
+    forecasters = {
+        constants.FORECAST_TIER_HOLT: partial(
+            holt_forecast, smoothing_level=smoothing_level, smoothing_trend=smoothing_trend
+        ),
+        constants.FORECAST_TIER_EWMA: partial(ewma_forecast, smoothing_level=smoothing_level),
+        constants.FORECAST_TIER_LAST_VALUE_SLOPE: last_value_slope_forecast,
+        constants.FORECAST_TIER_LAST_VALUE: last_value_forecast
+    }
+
+    fallback_forecasters = []
+    for tier in configurations.get(constants.FALLBACK_FORECASTERS, constants.DEFAULT_FALLBACK_FORECASTERS):
+        if tier not in forecasters:
+            raise ValueError("Unknown fallback forecaster " + str(tier))
+        fallback_forecasters.append((tier, forecasters[tier]))
+    return fallback_forecasters
+
+
+def fallback_predict(windows: np.ndarray, horizon: int, fallback_forecasters: list) -> Tuple[np.ndarray, list]:
+    """
+    Forecast every window with the first fallback forecaster producing a finite forecast for it. Windows no forecaster
+    could handle are held at their latest value, so every window always gets a forecast.
+
+    Parameters
+    ----------
+    windows
+        Array of shape (number of windows, window length) with the requests per minute.
+    horizon
+        Number of steps to be forecasted.
+    fallback_forecasters
+        Tier name and forecasting method of every fallback forecaster, as created by create_fallback_forecasters.
+
+    Returns
+    -------
+    np.ndarray
+        Array of shape (number of windows, horizon) with the forecasted requests per minute, never negative.
+    list
+        Tier which produced the forecast of every window.
+    """
+
+    predictions = np.zeros((len(windows), horizon))
+    tiers = [None] * len(windows)
+    remaining = np.arange(len(windows))
+
+    chain = list(fallback_forecasters) + [(constants.FORECAST_TIER_LAST_VALUE, last_value_forecast)]
+    for tier, forecaster in chain:
+        if len(remaining) == 0:
+            break
+
+        with np.errstate(all="ignore"):
+            forecasted = forecaster(windows[remaining], horizon)
+        finite = np.all(np.isfinite(forecasted), axis=1)
+
+        predictions[remaining[finite]] = forecasted[finite]
+        for index in remaining[finite]:
+            tiers[index] = tier
+        remaining = remaining[~finite]
+
+    return np.maximum(predictions, 0), tiers
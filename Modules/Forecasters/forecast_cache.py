@@ -0,0 +1,105 @@
+import threading
+from collections import OrderedDict
+from typing import Optional
+
+
+class ForecastCache:
+    """
+    Bounded LRU cache of forecasts keyed on the input window, its alignment within the hour, the forecast horizon and
+    the model version.
+    Retried ticks and targets sharing an identical window (e.g. idle services) cost a lookup instead of an inference.
+
+    Parameters
+    ----------
+    max_size
+        Maximum number of forecasts kept in the cache.
+    model_version
+        Version of the forecasting model the cached forecasts were produced with.
+    """
+
+    def __init__(self, max_size: int, model_version: str = ""):
+        self.max_size = max_size
+        self.model_version = model_version
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def key(self, window_values: tuple, second_of_hour: int, horizon: int = 1) -> tuple:
+        """
+        Build the cache key of a window.
+
+        Parameters
+        ----------
+        window_values
+            Requests per step of the window.
+        second_of_hour
+            Seconds into the hour of the first step of the window.
+        horizon
+            Number of steps forecasted from the window.
+
+        Returns
+        -------
+        tuple
+            Cache key of the window.
+        """
+
+        return self.model_version, second_of_hour, horizon, window_values
+
+    def get(self, key: tuple) -> Optional[tuple]:
+        """
+        Look up the forecast of a window and count the hit or miss.
+
+        Parameters
+        ----------
+        key
+            Cache key of the window.
+
+        Returns
+        -------
+        tuple
+            The cached forecast, None if the window is not cached.
+        """
+
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+            self.misses += 1
+            return None
+
+    def put(self, key: tuple, forecast: tuple):
+        """
+        Store the forecast of a window, evicting the least recently used one when the cache is full.
+
+        Parameters
+        ----------
+        key
+            Cache key of the window.
+        forecast
+            Forecast of the window.
+        """
+
+        with self._lock:
+            self._entries[key] = forecast
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, model_version: str):
+        """
+        Drop every cached forecast, e.g. after the forecasting model was reloaded.
+
+        Parameters
+        ----------
+        model_version
+            Version of the newly loaded forecasting model.
+        """
+
+        with self._lock:
+            self.model_version = model_version
+            self._entries.clear()
@@ -0,0 +1,89 @@
+import threading
+from typing import Optional
+import numpy as np
+from darts import TimeSeries
+
+
+class ForecastStore:
+    """
+    Multi-step forecasts of every target kept across ticks. As long as the observed workload stays within a tolerance
+    band around the stored forecast, later ticks read the remaining steps of the forecast instead of running
+    inference again.
+
+    Parameters
+    ----------
+    tolerance
+        Relative deviation between the observed and the forecasted workload up to which a forecast is reused.
+    """
+
+    def __init__(self, tolerance: float):
+        self.tolerance = tolerance
+        self.reuses = 0
+        self.reforecasts = 0
+        self._forecasts = {}
+        self._lock = threading.Lock()
+
+    def store(self, target_key: str, time_series: TimeSeries, forecast: np.ndarray):
+        """
+        Store the forecast made from the window of a target.
+
+        Parameters
+        ----------
+        target_key
+            Identifier of the target deployment.
+        time_series
+            TimeSeries object the forecast was made from.
+        forecast
+            Forecasted requests per step following the window.
+        """
+
+        time_index = time_series.time_index
+        with self._lock:
+            self._forecasts[target_key] = (time_index[-1], time_index.freq, np.asarray(forecast, dtype=float))
+            self.reforecasts += 1
+
+    def reusable(self, target_key: str, time_series: TimeSeries, steps: int) -> Optional[np.ndarray]:
+        """
+        Look up the remaining steps of the stored forecast of a target. The forecast is only reused when it still
+        covers the requested steps and every workload observed since it was made is within the tolerance band.
+
+        Parameters
+        ----------
+        target_key
+            Identifier of the target deployment.
+        time_series
+            TimeSeries object with the latest window of the target.
+        steps
+            Number of steps ahead the forecast has to cover.
+
+        Returns
+        -------
+        np.ndarray
+            Forecasted requests for the next steps, None if the target has to be forecasted again.
+        """
+
+        with self._lock:
+            entry = self._forecasts.get(target_key)
+        if entry is None:
+            return None
+
+        forecast_origin, freq, forecast = entry
+        last_timestamp = time_series.time_index[-1]
+        if freq is None or freq != time_series.time_index.freq or last_timestamp < forecast_origin:
+            return None
+
+        elapsed_steps = int(round((last_timestamp - forecast_origin) / freq))
+        if forecast_origin + elapsed_steps * freq != last_timestamp or len(forecast) - elapsed_steps < steps:
+            return None
+
+        if elapsed_steps > 0:
+            observed = time_series.values()[-elapsed_steps:, 0]
+            if len(observed) < elapsed_steps:
+                return None
+            expected = forecast[:elapsed_steps]
+            if np.any(np.abs(observed - expected) > self.tolerance * np.maximum(np.abs(expected), 1)):
+                return None
+
+        with self._lock:
+            self.reuses += 1
+        return forecast[elapsed_steps:elapsed_steps + steps]
@@ -0,0 +1,245 @@
+import threading
+import numpy as np
+import torch
+from darts import TimeSeries
+from darts.models import TCNModel
+from Modules.Constants import constants
+
+
+class DartsInferenceEngine:
+    """
+    Inference engine running the forecasting model through TCNModel.predict.
+
+    Parameters
+    ----------
+    model
+        Temporal Convolutional Network forecasting model.
+    """
+
+    name = constants.INFERENCE_BACKEND_DARTS
+
+    def __init__(self, model: TCNModel):
+        self.model = model
+        self.input_chunk_length = model.input_chunk_length
+        self.output_chunk_length = model.output_chunk_length
+
+    def predict_chunk(self, scaled_windows: np.ndarray, covariates: np.ndarray, time_indexes: list) -> np.ndarray:
+        """
+        Predict the scaled workload of the output chunk following every window of a batch.
+
+        Parameters
+        ----------
+        scaled_windows
+            Array of shape (number of windows, window length) with the scaled requests per step.
+        covariates
+            Array of shape (number of windows, window length, number of covariates) with the scaled covariates.
+        time_indexes
+            Time index of every window.
+
+        Returns
+        -------
+        np.ndarray
+            Array of shape (number of windows, output chunk length) with the scaled predictions.
+        """
+
+        series = [
+            TimeSeries.from_times_and_values(
+                time_index, scaled_window[:, None], columns=[constants.TIME_SERIES_VALUE_COLUMN]
+            )
+            for time_index, scaled_window in zip(time_indexes, scaled_windows)
+        ]
+        past_covariates = [
+            TimeSeries.from_times_and_values(
+                time_index, covariate_values, columns=constants.MINUTE_COVARIATE_COLUMNS
+            )
+            for time_index, covariate_values in zip(time_indexes, covariates)
+        ]
+
+        predictions = self.model.predict(
+            n=self.output_chunk_length,
+            series=series,
+            past_covariates=past_covariates,
+            batch_size=len(series)
+        )
+
+        return np.stack([prediction.values()[:, 0] for prediction in predictions])
+
+    def predict(self, scaled_windows: np.ndarray, covariates: np.ndarray, time_indexes: list) -> np.ndarray:
+        """
+        Predict the scaled workload of the next step for a batch of windows.
+
+        Parameters
+        ----------
+        scaled_windows
+            Array of shape (number of windows, window length) with the scaled requests per step.
+        covariates
+            Array of shape (number of windows, window length, number of covariates) with the scaled covariates.
+        time_indexes
+            Time index of every window.
+
+        Returns
+        -------
+        np.ndarray
+            Scaled prediction of the next step, one per window.
+        """
+
+        return self.predict_chunk(scaled_windows, covariates, time_indexes)[:, 0]
+
+    def warm_up(self):
+        """
+        Nothing to warm up, the darts model runs its own setup on every call.
+        """
+
+
+class TorchInferenceEngine:
+    """
+    Inference engine running the forward pass of the TCN module directly under torch.inference_mode, bypassing the
+    dataset, dataloader and trainer setup of TCNModel.predict. Input tensors are preallocated and reused across
+    calls.
+
+    Parameters
+    ----------
+    model
+        Temporal Convolutional Network forecasting model.
+    max_batch_size
+        Number of windows the input tensor is preallocated for. Larger batches grow the tensor.
+    """
+
+    name = constants.INFERENCE_BACKEND_TORCH
+
+    def __init__(self, model: TCNModel, max_batch_size: int = constants.DEFAULT_MAX_CONCURRENT_TARGETS):
+        self.module = model.model
+        self.module.eval()
+        self.input_chunk_length = model.input_chunk_length
+        self.output_chunk_length = model.output_chunk_length
+        self.dtype = next(self.module.parameters()).dtype
+        self._input_size = self.module.input_size
+        self._input = torch.zeros((max_batch_size, self.input_chunk_length, self._input_size), dtype=self.dtype)
+        self._module_input = None
+        self._lock = threading.Lock()
+
+    def _forward(self, x: torch.Tensor) -> torch.Tensor:
+        """
+        Run the forward pass of the TCN module. Depending on the darts version, the module expects the past features
+        alone or wrapped into a tuple of past, future and static features.
+
+        Parameters
+        ----------
+        x
+            Tensor of shape (batch size, input chunk length, input size) with the past target and covariates.
+
+        Returns
+        -------
+        torch.Tensor
+            Output of the module.
+        """
+
+        if self._module_input is not None:
+            return self.module(self._module_input(x))
+
+        for module_input in (lambda t: (t, None, None, None), lambda t: (t, None), lambda t: t):
+            try:
+                output = self.module(module_input(x))
+            except (TypeError, ValueError):
+                continue
+            self._module_input = module_input
+            return output
+
+        raise TypeError("Unsupported input signature of the forecasting module")
+
+    def predict_chunk(self, scaled_windows: np.ndarray, covariates: np.ndarray, time_indexes: list) -> np.ndarray:
+        """
+        Predict the scaled workload of the output chunk following every window of a batch.
+
+        Parameters
+        ----------
+        scaled_windows
+            Array of shape (number of windows, window length) with the scaled requests per step.
+        covariates
+            Array of shape (number of windows, window length, number of covariates) with the scaled covariates.
+        time_indexes
+            Time index of every window. Not needed by this engine.
+
+        Returns
+        -------
+        np.ndarray
+            Array of shape (number of windows, output chunk length) with the scaled predictions.
+        """
+
+        batch_size = scaled_windows.shape[0]
+
+        with self._lock:
+            if batch_size > self._input.shape[0]:
+                self._input = torch.zeros((batch_size, self.input_chunk_length, self._input_size), dtype=self.dtype)
+
+            x = self._input[:batch_size]
+            x[:, :, 0] = torch.from_numpy(scaled_windows[:, -self.input_chunk_length:])
+            x[:, :, 1:] = torch.from_numpy(covariates[:, -self.input_chunk_length:])
+
+            with torch.inference_mode():
+                output = self._forward(x)
+
+            # output is of size (batch size, input chunk length, target size, nr params)
+            return output[:, -self.output_chunk_length:, 0, 0].numpy().astype(np.float64)
+
+    def predict(self, scaled_windows: np.ndarray, covariates: np.ndarray, time_indexes: list) -> np.ndarray:
+        """
+        Predict the scaled workload of the next step for a batch of windows.
+
+        Parameters
+        ----------
+        scaled_windows
+            Array of shape (number of windows, window length) with the scaled requests per step.
+        covariates
+            Array of shape (number of windows, window length, number of covariates) with the scaled covariates.
+        time_indexes
+            Time index of every window. Not needed by this engine.
+
+        Returns
+        -------
+        np.ndarray
+            Scaled prediction of the next step, one per window.
+        """
+
+        return self.predict_chunk(scaled_windows, covariates, time_indexes)[:, 0]
+
+    def warm_up(self):
+        """
+        Run a forward pass on the preallocated input, so the first tick does not pay for the lazy initialisation.
+        """
+
+        with self._lock, torch.inference_mode():
+            self._forward(self._input[:1])
+
+
+def create_inference_engine(model: TCNModel, configurations: dict):
+    """
+    Create the inference engine selected by the 'inference_backend' configuration.
+
+    Parameters
+    ----------
+    model
+        Temporal Convolutional Network forecasting model.
+    configurations
+        Configuration passed for the custom HPA programme
+
+    Returns
+    -------
+    DartsInferenceEngine or TorchInferenceEngine
+        Inference engine of the forecasting model.
+    """
+
+    backend = configurations.get(constants.INFERENCE_BACKEND, constants.INFERENCE_BACKEND_DARTS)
+
+    if backend == constants.INFERENCE_BACKEND_TORCH:
+        engine = TorchInferenceEngine(
+            model,
+            configurations.get(constants.MAX_CONCURRENT_TARGETS, constants.DEFAULT_MAX_CONCURRENT_TARGETS)
+        )
+    elif backend == constants.INFERENCE_BACKEND_DARTS:
+        engine = DartsInferenceEngine(model)
+    else:
+        raise ValueError("Unknown inference backend " + str(backend))
+
+    engine.warm_up()
+    return engine
@@ -0,0 +1,41 @@
+import os
+from onnxruntime.quantization import quantize_dynamic, QuantType
+from Modules.Constants import constants
+from Modules.Logs import logger
+
+
+def load_quantized_model_path(
+        model_path: str = constants.PATH_TO_ONNX_MODEL,
+        quantized_model_path: str = constants.PATH_TO_QUANTIZED_ONNX_MODEL
+) -> str:
+    """
+    Produce the dynamically quantized (int8) variant of the exported ONNX forecasting model. The quantized model is
+    cached next to the original one and only rebuilt when the original model is newer. The weights of the
+    convolutions are stored as int8 and their activations are quantized on the fly (ConvInteger), which is the part
+    of the TCN doing the heavy lifting on CPU.
+
+    Parameters
+    ----------
+    model_path
+        Path to the ONNX model exported with Tools/export_onnx_model.py.
+    quantized_model_path
+        Path of the cached quantized model.
+
+    Returns
+    -------
+    str
+        Path to the quantized model.
+    """
+
+    if not os.path.exists(quantized_model_path) or \
+            os.path.getmtime(quantized_model_path) < os.path.getmtime(model_path):
+
+        quantize_dynamic(model_path, quantized_model_path, weight_type=QuantType.QInt8)
+        logger.log_action(
+            "info",
+            "Quantized forecasting model created at " + quantized_model_path + " (" +
+            str(os.path.getsize(quantized_model_path)) + " bytes, original " + str(os.path.getsize(model_path)) +
+            " bytes)"
+        )
+
+    return quantized_model_path
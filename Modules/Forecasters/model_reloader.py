@@ -0,0 +1,219 @@
+import threading
+from typing import Optional
+import numpy as np
+from Modules.Constants import constants
+from Modules.Logs import logger
+from Modules.MetricsManagers import local_metrics
+from Modules.Forecasters.workload_forecaster import load_forecasting_model, load_scaler_parameters, \
+    get_model_version, verify_inference_engine, canary_series, canary_predictions
+
+
+class ReloadedModel:
+    """
+    Forecasting model loaded, warmed up and validated by the model reloader, waiting to be swapped in.
+
+    Parameters
+    ----------
+    forecasting_model
+        Temporal Convolutional Network forecasting model, None with the 'onnx' inference backend.
+    inference_engine
+        Warmed up inference engine of the forecasting model.
+    scaler_parameters
+        Persisted scaling parameters of the forecasting model.
+    version
+        Version of the forecasting model on disk.
+    """
+
+    def __init__(self, forecasting_model, inference_engine, scaler_parameters: Optional[dict], version: str):
+        self.forecasting_model = forecasting_model
+        self.inference_engine = inference_engine
+        self.scaler_parameters = scaler_parameters
+        self.version = version
+
+
+def watched_model_path(configurations: dict) -> str:
+    """
+    Path to the model file the configured inference backend loads.
+
+    Parameters
+    ----------
+    configurations
+        Configuration passed for the custom HPA programme
+
+    Returns
+    -------
+    str
+        Path to the model file.
+    """
+
+    if configurations.get(constants.INFERENCE_BACKEND) == constants.INFERENCE_BACKEND_ONNX:
+        return constants.PATH_TO_ONNX_MODEL
+    return constants.PATH_TO_DEEP_LEARNING_MODEL
+
+
+class ModelReloader:
+    """
+    Background watcher of the forecasting model on disk. A changed model file, or changed scaling parameters, are
+    loaded and warmed up on the watcher thread and validated on the canary windows, then handed over to be swapped in
+    between two ticks, so a retrained model is rolled out without restarting the autoscaler and without pausing a
+    tick. A model failing to load or to validate is rejected and the model in use stays in place.
+
+    Parameters
+    ----------
+    configurations
+        Configuration passed for the custom HPA programme
+    version
+        Version of the forecasting model in use.
+    poll_interval
+        Number of seconds between two checks of the model file.
+    """
+
+    def __init__(
+            self,
+            configurations: dict,
+            version: str,
+            poll_interval: float = constants.DEFAULT_MODEL_RELOAD_INTERVAL
+    ):
+        self.configurations = configurations
+        self.model_path = watched_model_path(configurations)
+        self.version = version
+        self.poll_interval = poll_interval
+        self.reloads = 0
+        self.rejections = 0
+        self._observed_version = version
+        self._rejected_version = None
+        self._reloaded_model = None
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="model-reloader", daemon=True)
+
+    def start(self):
+        """
+        Start watching the model file in the background.
+        """
+
+        self._thread.start()
+
+    def stop(self):
+        """
+        Stop watching the model file.
+        """
+
+        self._stop_event.set()
+
+    def take_reloaded_model(self) -> Optional[ReloadedModel]:
+        """
+        Hand over the model reloaded since the last call, to be swapped in.
+
+        Returns
+        -------
+        ReloadedModel
+            Reloaded and validated forecasting model, None if the model did not change.
+        """
+
+        with self._lock:
+            reloaded_model = self._reloaded_model
+            self._reloaded_model = None
+        return reloaded_model
+
+    def _load(self, version: str) -> ReloadedModel:
+        """
+        Load and warm up the forecasting model on disk with the configured inference backend. An engine bypassing
+        TCNModel.predict has to reproduce its predictions on the canary windows, otherwise the darts engine is used.
+
+        Parameters
+        ----------
+        version
+            Version of the forecasting model on disk.
+
+        Returns
+        -------
+        ReloadedModel
+            Loaded forecasting model.
+        """
+
+        if self.configurations.get(constants.INFERENCE_BACKEND) == constants.INFERENCE_BACKEND_ONNX:
+            from Modules.Forecasters.onnx_inference_engine import OnnxInferenceEngine
+
+            model_path = constants.PATH_TO_ONNX_MODEL
+            if self.configurations.get(constants.MODEL_QUANTIZATION) == constants.MODEL_QUANTIZATION_INT8:
+                from Modules.Forecasters.model_quantization import load_quantized_model_path
+
+                model_path = load_quantized_model_path()
+            inference_engine = OnnxInferenceEngine(model_path)
+            inference_engine.warm_up()
+            return ReloadedModel(None, inference_engine, load_scaler_parameters(), version)
+
+        from Modules.Forecasters.inference_engine import create_inference_engine, DartsInferenceEngine
+
+        forecasting_model = load_forecasting_model()
+        if not forecasting_model.model_created:
+            raise ValueError("forecasting model not created")
+
+        inference_engine = create_inference_engine(forecasting_model, self.configurations)
+        if not isinstance(inference_engine, DartsInferenceEngine):
+            difference = verify_inference_engine(inference_engine, forecasting_model)
+            if difference > constants.INFERENCE_PARITY_TOLERANCE:
+                logger.log_action("warning", "Inference engine '" + inference_engine.name + "' of the reloaded "
+                                             "model differs from the darts predictions by " + str(difference) +
+                                  ". Falling back to the darts engine")
+                inference_engine = DartsInferenceEngine(forecasting_model)
+
+        return ReloadedModel(forecasting_model, inference_engine, load_scaler_parameters(), version)
+
+    def _reload(self, version: str):
+        """
+        Load the changed forecasting model and validate it on the canary windows, handing it over on success.
+
+        Parameters
+        ----------
+        version
+            Version of the forecasting model on disk.
+        """
+
+        try:
+            reloaded_model = self._load(version)
+            inference_engine = reloaded_model.inference_engine
+            predictions = canary_predictions(inference_engine, reloaded_model.scaler_parameters)
+            expected_shape = (len(canary_series(inference_engine.input_chunk_length)),
+                              inference_engine.output_chunk_length)
+            if predictions.shape != expected_shape:
+                raise ValueError("predictions on the canary windows of shape " + str(predictions.shape) +
+                                 ", expected " + str(expected_shape))
+            if not np.all(np.isfinite(predictions)) or np.any(predictions < 0):
+                raise ValueError("invalid predictions on the canary windows: " + str(predictions.ravel().tolist()))
+        except Exception as exception:
+            self._rejected_version = version
+            self.rejections += 1
+            local_metrics.model_reloads.inc(1, constants.MODEL_RELOAD_OUTCOME_REJECTED)
+            logger.log_action("error", "Changed forecasting model rejected, the model in use stays in place: " +
+                              str(exception))
+            return
+
+        with self._lock:
+            self._reloaded_model = reloaded_model
+        self.version = version
+        self.reloads += 1
+        logger.log_action("info", "Changed forecasting model loaded and validated. Swapping it in on the next tick")
+
+    def _run(self):
+        """
+        Check the model file until the reloader is stopped. A change is only loaded once the version stayed the same
+        for a whole poll interval, so a model file still being written is not picked up.
+        """
+
+        while not self._stop_event.wait(self.poll_interval):
+            try:
+                version = get_model_version(self.model_path)
+            except OSError:
+                continue
+
+            if version in (self.version, self._rejected_version):
+                self._observed_version = version
+                continue
+
+            if version != self._observed_version:
+                self._observed_version = version
+                continue
+
+            self._reload(version)
@@ -0,0 +1,108 @@
+import threading
+import numpy as np
+import onnxruntime
+from Modules.Constants import constants
+
+_ONNX_INPUT_DTYPES = {
+    "tensor(float)": np.float32,
+    "tensor(double)": np.float64
+}
+
+
+class OnnxInferenceEngine:
+    """
+    Inference engine running the exported forecasting model on CPU with ONNX Runtime. Neither darts nor torch is
+    needed to run it.
+
+    Parameters
+    ----------
+    model_path
+        Path to the ONNX model exported with Tools/export_onnx_model.py.
+    intra_op_num_threads
+        Number of threads used by ONNX Runtime within an operator.
+    """
+
+    name = constants.INFERENCE_BACKEND_ONNX
+
+    def __init__(self, model_path: str = constants.PATH_TO_ONNX_MODEL, intra_op_num_threads: int = 1):
+        options = onnxruntime.SessionOptions()
+        options.intra_op_num_threads = intra_op_num_threads
+        options.graph_optimization_level = onnxruntime.GraphOptimizationLevel.ORT_ENABLE_ALL
+
+        self.model_path = model_path
+        self.session = onnxruntime.InferenceSession(model_path, options, providers=["CPUExecutionProvider"])
+
+        metadata = self.session.get_modelmeta().custom_metadata_map
+        self.input_chunk_length = int(metadata[constants.ONNX_METADATA_INPUT_CHUNK_LENGTH])
+        self.output_chunk_length = int(metadata[constants.ONNX_METADATA_OUTPUT_CHUNK_LENGTH])
+
+        model_input = self.session.get_inputs()[0]
+        self._input_name = model_input.name
+        self._input_size = model_input.shape[2]
+        self._input_dtype = _ONNX_INPUT_DTYPES[model_input.type]
+        self._lock = threading.Lock()
+
+    def predict_chunk(self, scaled_windows: np.ndarray, covariates: np.ndarray, time_indexes: list) -> np.ndarray:
+        """
+        Predict the scaled workload of the output chunk following every window of a batch.
+
+        Parameters
+        ----------
+        scaled_windows
+            Array of shape (number of windows, window length) with the scaled requests per step.
+        covariates
+            Array of shape (number of windows, window length, number of covariates) with the scaled covariates.
+        time_indexes
+            Time index of every window. Not needed by this engine.
+
+        Returns
+        -------
+        np.ndarray
+            Array of shape (number of windows, output chunk length) with the scaled predictions.
+        """
+
+        x = np.concatenate(
+            [
+                scaled_windows[:, -self.input_chunk_length:, None],
+                covariates[:, -self.input_chunk_length:]
+            ],
+            axis=2
+        ).astype(self._input_dtype)
+
+        with self._lock:
+            output = self.session.run(None, {self._input_name: x})[0]
+
+        # output is of size (batch size, output chunk length)
+        return output.astype(np.float64)
+
+    def predict(self, scaled_windows: np.ndarray, covariates: np.ndarray, time_indexes: list) -> np.ndarray:
+        """
+        Predict the scaled workload of the next step for a batch of windows.
+
+        Parameters
+        ----------
+        scaled_windows
+            Array of shape (number of windows, window length) with the scaled requests per step.
+        covariates
+            Array of shape (number of windows, window length, number of covariates) with the scaled covariates.
+        time_indexes
+            Time index of every window. Not needed by this engine.
+
+        Returns
+        -------
+        np.ndarray
+            Scaled prediction of the next step, one per window.
+        """
+
+        return self.predict_chunk(scaled_windows, covariates, time_indexes)[:, 0]
+
+    def warm_up(self):
+        """
+        Run a single inference, so the first tick does not pay for the lazy initialisation of the session.
+        """
+
+        with self._lock:
+            self.session.run(
+                None,
+                {self._input_name: np.zeros((1, self.input_chunk_length, self._input_size), dtype=self._input_dtype)}
+            )
@@ -0,0 +1,97 @@
+from concurrent.futures import ThreadPoolExecutor, TimeoutError
+from typing import Optional
+from Modules.Constants import constants
+from Modules.Logs import logger
+from Modules.Forecasters.forecast_cache import ForecastCache
+from Modules.Forecasters.forecast_store import ForecastStore
+from Modules.Forecasters.workload_forecaster import predict_future_workloads, final_predictions, \
+    fallback_future_workloads
+
+
+class TieredForecaster:
+    """
+    Forecaster running the deep learning based forecasting model within a latency budget and falling back to the
+    cheap fallback forecasters when the model misses its deadline, fails, or is still busy with the inference of a
+    previous tick, so every tick gets a forecast on time. The model runs on a dedicated thread, an inference missing
+    its deadline completes in the background and still fills the forecast cache and store for later ticks.
+
+    Parameters
+    ----------
+    fallback_forecasters
+        Tier name and forecasting method of every fallback forecaster, as created by create_fallback_forecasters.
+    """
+
+    def __init__(self, fallback_forecasters: list):
+        self.fallback_forecasters = fallback_forecasters
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="model-inference")
+        self._inference = None
+
+    def forecast(
+            self,
+            time_series_list: list,
+            inference_engine,
+            configurations: list,
+            timeout: float,
+            scaler_parameters: Optional[dict] = None,
+            forecast_cache: Optional[ForecastCache] = None,
+            forecast_store: Optional[ForecastStore] = None
+    ) -> list:
+        """
+        Forecast the future workload of several targets with the forecasting model, or with the fallback forecasters
+        when the model does not deliver within the timeout.
+
+        Parameters
+        ----------
+        time_series_list
+            List of TimeSeries objects with the requests per minute of the last window of ticks, one per target.
+        inference_engine
+            Inference engine of the deep learning based forecasting model.
+        configurations
+            List of configurations passed for the custom HPA programme, one per target.
+        timeout
+            Number of seconds the forecasting model is given.
+        scaler_parameters
+            Persisted scaling parameters of the forecasting model, None to scale every window on its own.
+        forecast_cache
+            Cache of forecasts keyed on the input window, None to always run inference.
+        forecast_store
+            Forecasts of the previous ticks, None to forecast every target on every tick.
+
+        Returns
+        -------
+        list
+            Number of requests per minute to be expected for each of the next ticks, one list per target.
+        """
+
+        if not time_series_list:
+            return []
+
+        if self._inference is not None and not self._inference.done():
+            logger.log_action("warning", "Forecasting model still busy with the inference of a previous tick. "
+                                         "Falling back to the fallback forecasters")
+            return fallback_future_workloads(time_series_list, configurations, self.fallback_forecasters)
+
+        self._inference = self._executor.submit(
+            predict_future_workloads, time_series_list, inference_engine, configurations, scaler_parameters,
+            forecast_cache, forecast_store
+        )
+
+        try:
+            prediction_results = self._inference.result(timeout=max(0.0, timeout))
+        except TimeoutError:
+            logger.log_action("warning", "Forecasting model missed its deadline of " + str(round(timeout, 2)) +
+                              " seconds. Falling back to the fallback forecasters")
+            return fallback_future_workloads(time_series_list, configurations, self.fallback_forecasters)
+        except Exception:
+            logger.log_action("error", "Error while forecasting the workload with the forecasting model. Falling "
+                                       "back to the fallback forecasters")
+            return fallback_future_workloads(time_series_list, configurations, self.fallback_forecasters)
+
+        return final_predictions(time_series_list, prediction_results, configurations, constants.FORECAST_TIER_MODEL)
+
+    def shutdown(self):
+        """
+        Stop the inference thread once the running inference, if any, completed.
+        """
+
+        self._executor.shutdown(wait=True)
@@ -1,16 +1,27 @@
+import json
+import os
+import numpy as np
+import pandas as pd
+from typing import Optional, Tuple, TYPE_CHECKING
 from darts import TimeSeries
-from darts.models import TCNModel
-from darts.dataprocessing.transformers import Scaler
-from darts.models.forecasting.torch_forecasting_model import TorchForecastingModel
-from darts.utils.timeseries_generation import datetime_attribute_timeseries
 from Modules.Logs import logger
+from Modules.Forecasters.forecast_cache import ForecastCache
+from Modules.Forecasters.forecast_store import ForecastStore
+from Modules.Forecasters.fallback_forecasters import fallback_predict
+from Modules.MetricsManagers import local_metrics
 
 from Modules.Constants import constants
 
+if TYPE_CHECKING:
+    from darts.models import TCNModel
 
-def load_forecasting_model() -> TorchForecastingModel:
+_MINUTE_COVARIATE_TABLE = np.eye(constants.MINUTES_PER_HOUR)
+
+
+def load_forecasting_model() -> "TCNModel":
     """
-    Load the forecasting model
+    Load the forecasting model. darts.models pulls in torch and PyTorch Lightning, so it is only imported when a
+    backend needing the darts model is configured.
 
     Returns
     -------
@@ -18,116 +29,712 @@ def load_forecasting_model() -> TorchForecastingModel:
         Temporal Convolutional Network forecasting model.
     """
 
+    from darts.models import TCNModel
+
     return TCNModel.load_model(constants.PATH_TO_DEEP_LEARNING_MODEL)
 
 
-def _scale_time_series(time_series: TimeSeries, scaler: Scaler) -> TimeSeries:
+def get_model_version(model_path: str = constants.PATH_TO_DEEP_LEARNING_MODEL) -> str:
     """
-    Method to scale time series of requests per minute
+    Identify the version of the forecasting model on disk by the modification time and size of the model file and
+    of the persisted scaling parameters
 
     Parameters
     ----------
-    time_series
-        TimeSeries object with the data of requests per minute for the last 10 minutes.
-    scaler
-        Scaler object to scale timeseries
+    model_path
+        Path to the model file in use.
 
     Returns
     -------
-    TimeSeries
-        Scaled timeseries.
+    str
+        Version of the forecasting model.
     """
 
-    series_transformed = scaler.fit_transform(time_series)
-    return series_transformed
+    version = []
+    for path in (model_path, constants.PATH_TO_SCALER_PARAMETERS):
+        if os.path.exists(path):
+            file_status = os.stat(path)
+            version.append(str(file_status.st_mtime_ns) + "-" + str(file_status.st_size))
+        else:
+            version.append("none")
+    return ":".join(version)
 
 
-def _inverse_scale_prediction(prediction: TimeSeries, scaler: Scaler) -> TimeSeries:
+def load_scaler_parameters() -> Optional[dict]:
+    """
+    Load the scaling parameters persisted alongside the forecasting model
+
+    Returns
+    -------
+    dict
+        Minimum and maximum of the training data, None if no parameters were persisted.
     """
-    Method to reverse scale the predicted resultant timeseries
+
+    if not os.path.exists(constants.PATH_TO_SCALER_PARAMETERS):
+        return None
+
+    with open(constants.PATH_TO_SCALER_PARAMETERS) as file:
+        return json.load(file)
+
+
+def save_scaler_parameters(training_values: np.ndarray) -> dict:
+    """
+    Fit the scaling parameters on the training data of the forecasting model and persist them alongside the model
 
     Parameters
     ----------
-    prediction
-        Predicted results using the provided time series (number of requests for the next minute)
-    scaler
-        Same scaler object used to scale and transform the input timeseries
+    training_values
+        Requests per minute of the training data.
 
     Returns
     -------
-    TimeSeries
-        inverse scaled timeseries.
+    dict
+        Minimum and maximum of the training data.
     """
 
-    return scaler.inverse_transform(prediction)
+    scaler_parameters = {
+        constants.SCALER_PARAMETER_MIN: float(np.min(training_values)),
+        constants.SCALER_PARAMETER_MAX: float(np.max(training_values))
+    }
+
+    with open(constants.PATH_TO_SCALER_PARAMETERS, "w") as file:
+        json.dump(scaler_parameters, file)
+
+    return scaler_parameters
 
 
-def _create_covariate_series(transformed_time_series: TimeSeries) -> TimeSeries:
+def _scale_windows(windows: np.ndarray, scaler_parameters: Optional[dict]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
     """
-    Method to scale time series of minute covariate series
+    Method to min-max scale windows of requests per minute. The persisted training parameters are used when
+    available, otherwise every window is scaled by its own minimum and maximum.
 
     Parameters
     ----------
-    transformed_time_series
-        scaled time series of requests per minute
+    windows
+        Array of shape (number of windows, window length) with the requests per minute.
+    scaler_parameters
+        Persisted scaling parameters of the forecasting model, None to fit every window on its own.
 
     Returns
     -------
-    TimeSeries
-        Scaled minute covariate series.
+    np.ndarray
+        Scaled windows.
+    np.ndarray
+        Minimum used to scale every window.
+    np.ndarray
+        Data range used to scale every window.
     """
 
-    past_covariate_series = datetime_attribute_timeseries(
-        transformed_time_series, attribute='minute', one_hot=True
-    )
-    covariate_scaler = Scaler()
-    scaled_covariate_series = covariate_scaler.fit_transform(past_covariate_series)
-    return scaled_covariate_series
+    if scaler_parameters is not None:
+        minimum = np.full(windows.shape[0], scaler_parameters[constants.SCALER_PARAMETER_MIN])
+        maximum = np.full(windows.shape[0], scaler_parameters[constants.SCALER_PARAMETER_MAX])
+    else:
+        minimum = windows.min(axis=1)
+        maximum = windows.max(axis=1)
+
+    data_range = maximum - minimum
+    data_range[data_range == 0] = 1
+
+    return (windows - minimum[:, None]) / data_range[:, None], minimum, data_range
+
+
+def _inverse_scale_predictions(predictions: np.ndarray, minimum: np.ndarray, data_range: np.ndarray) -> np.ndarray:
+    """
+    Method to reverse scale the predicted values
+
+    Parameters
+    ----------
+    predictions
+        Scaled predictions, one row per window.
+    minimum
+        Minimum used to scale every window.
+    data_range
+        Data range used to scale every window.
+
+    Returns
+    -------
+    np.ndarray
+        inverse scaled predictions.
+    """
+
+    return predictions * data_range[:, None] + minimum[:, None]
 
 
-def forecast_future_workload(time_series: TimeSeries, model: TCNModel, configuration: dict) -> int:
+def _create_covariate_values(time_index: pd.DatetimeIndex) -> np.ndarray:
     """
-    Method for forecasting the future workload (number of requests) for the next minute.
+    Method to slice the minute covariates of a window out of the precomputed one-hot table. Min-max scaling a one-hot
+    column containing both values leaves it unchanged, so the table rows are already scaled.
+
+    Parameters
+    ----------
+    time_index
+        Time index of the window.
+
+    Returns
+    -------
+    np.ndarray
+        Array of shape (window length, 60) with the scaled minute covariates.
+    """
+
+    return _MINUTE_COVARIATE_TABLE[time_index.minute]
+
+
+def _final_prediction(
+        time_series: TimeSeries,
+        prediction_result: np.ndarray,
+        configuration: dict,
+        tier: str = constants.FORECAST_TIER_MODEL
+) -> list:
+    """
+    Method to turn the inverse scaled predictions of a target into the final forecasted workload. The prediction error
+    mitigation value is applied when the workload is not decreasing.
 
     Parameters
     ----------
     time_series
-        TimeSeries object with the data of requests per minute for the last 10 minutes.
+        TimeSeries object with the requests per minute of the last window of ticks.
+    prediction_result
+        Inverse scaled predictions for the next ticks.
+    configuration
+        configurations passed for the custom HPA programme
+    tier
+        Forecasting tier which produced the predictions, one of the FORECAST_TIER_* constants.
+
+    Returns
+    -------
+    list
+        Number of requests per minute to be expected for each of the next ticks.
+    """
+
+    values = time_series.values()
+    predicted_values = [int(round(float(prediction))) for prediction in prediction_result]
+
+    if int(values[-2][0]) <= int(values[-1][0]):
+        final_prediction = [
+            int(predicted_value * (1 + configuration[constants.PREDICTION_ERROR_MITIGATION_VALUE]))
+            for predicted_value in predicted_values
+        ]
+    else:
+        final_prediction = predicted_values
+
+    local_metrics.forecasted_workload.set(
+        final_prediction[0], configuration[constants.NAMESPACE], configuration[constants.DEPLOYMENT_NAME]
+    )
+    local_metrics.forecast_tiers.inc(1, configuration[constants.NAMESPACE], configuration[constants.DEPLOYMENT_NAME],
+                                     tier)
+    logger.log_action("info", "Forecasted workload (" + tier + ") of " + configuration[constants.DEPLOYMENT_NAME] +
+                      " for the next " + str(len(final_prediction)) + " tick(s) is: " +
+                      ", ".join(str(workload) for workload in final_prediction))
+    return final_prediction
+
+
+def final_predictions(
+        time_series_list: list,
+        prediction_results: list,
+        configurations: list,
+        tier: str = constants.FORECAST_TIER_MODEL
+) -> list:
+    """
+    Method to turn the inverse scaled predictions of several targets into their final forecasted workloads
+
+    Parameters
+    ----------
+    time_series_list
+        List of TimeSeries objects with the requests per minute of the last window of ticks, one per target.
+    prediction_results
+        Inverse scaled predictions for the next ticks, one array per target.
+    configurations
+        List of configurations passed for the custom HPA programme, one per target.
+    tier
+        Forecasting tier which produced the predictions, one of the FORECAST_TIER_* constants.
+
+    Returns
+    -------
+    list
+        Number of requests per minute to be expected for each of the next ticks, one list per target.
+    """
+
+    return [
+        _final_prediction(time_series, prediction_result, configuration, tier)
+        for time_series, prediction_result, configuration in zip(time_series_list, prediction_results, configurations)
+    ]
+
+
+def prepare_inputs(time_series_list: list, scaler_parameters: Optional[dict]) -> tuple:
+    """
+    Method to turn a list of windows into the scaled model inputs of a batched inference call
+
+    Parameters
+    ----------
+    time_series_list
+        List of TimeSeries objects with the requests per minute of the last window of ticks.
+    scaler_parameters
+        Persisted scaling parameters of the forecasting model, None to scale every window on its own.
+
+    Returns
+    -------
+    tuple
+        Scaled windows, minimum and data range used for scaling, scaled covariates and the time index of every window.
+    """
+
+    time_indexes = [time_series.time_index for time_series in time_series_list]
+    windows = np.stack([time_series.values()[:, 0] for time_series in time_series_list])
+    scaled_windows, minimum, data_range = _scale_windows(windows, scaler_parameters)
+    covariates = np.stack([_create_covariate_values(time_index) for time_index in time_indexes])
+
+    return scaled_windows, minimum, data_range, covariates, time_indexes
+
+
+def canary_series(window_length: int) -> list:
+    """
+    Method to create the canary windows inference engines are checked on: a rising, an oscillating and a falling
+    workload, starting at different minutes of the hour
+
+    Parameters
+    ----------
+    window_length
+        Number of steps in the input window of the forecasting model.
+
+    Returns
+    -------
+    list
+        List of TimeSeries objects with the requests per minute of the canary windows.
+    """
+
+    return [
+        TimeSeries.from_times_and_values(
+            pd.date_range(start=pd.Timestamp(2022, 1, 1, 0, offset), periods=window_length, freq="min"),
+            values[:, None],
+            columns=[constants.TIME_SERIES_VALUE_COLUMN]
+        )
+        for offset, values in (
+            (0, np.linspace(100, 1000, window_length)),
+            (25, 500 + 400 * np.sin(np.arange(window_length))),
+            (55, np.linspace(1000, 100, window_length))
+        )
+    ]
+
+
+def verify_inference_engine(inference_engine, model: "TCNModel") -> float:
+    """
+    Method to compare the predictions of an inference engine with TCNModel.predict on canary windows
+
+    Parameters
+    ----------
+    inference_engine
+        Inference engine to be verified.
     model
-        Deep learning based forecasting model for forecasting purposes.
+        Temporal Convolutional Network forecasting model the engine was created from.
+
+    Returns
+    -------
+    float
+        Maximum absolute difference between the scaled predictions of the engine and of TCNModel.predict.
+    """
+
+    from Modules.Forecasters.inference_engine import DartsInferenceEngine
+
+    scaled_windows, _, _, covariates, time_indexes = prepare_inputs(canary_series(model.input_chunk_length), None)
+
+    reference = DartsInferenceEngine(model).predict(scaled_windows, covariates, time_indexes)
+    candidate = inference_engine.predict(scaled_windows, covariates, time_indexes)
+
+    return float(np.max(np.abs(reference - candidate)))
+
+
+def canary_predictions(inference_engine, scaler_parameters: Optional[dict]) -> np.ndarray:
+    """
+    Method to predict the output chunk following every canary window with an inference engine, e.g. to validate a
+    newly loaded forecasting model before it is used
+
+    Parameters
+    ----------
+    inference_engine
+        Inference engine of the deep learning based forecasting model.
+    scaler_parameters
+        Persisted scaling parameters of the forecasting model, None to scale every window on its own.
+
+    Returns
+    -------
+    np.ndarray
+        Array of shape (number of canary windows, output chunk length) with the predicted requests.
+    """
+
+    scaled_windows, minimum, data_range, covariates, time_indexes = prepare_inputs(
+        canary_series(inference_engine.input_chunk_length), scaler_parameters
+    )
+    predictions = inference_engine.predict_chunk(scaled_windows, covariates, time_indexes)
+    return _inverse_scale_predictions(predictions, minimum, data_range)
+
+
+def _forecast_horizon(configuration: dict) -> int:
+    """
+    Number of steps forecasted at once for a target, never shorter than its pod startup lead time
+
+    Parameters
+    ----------
     configuration
         configurations passed for the custom HPA programme
 
     Returns
     -------
     int
-        Number of requests to be expected for the next minute.
+        Forecast horizon in steps.
+    """
+
+    return max(
+        configuration.get(constants.FORECAST_HORIZON, constants.DEFAULT_FORECAST_HORIZON),
+        _lead_time_steps(configuration)
+    )
+
+
+def _lead_time_steps(configuration: dict) -> int:
+    """
+    Number of steps a new pod takes to become ready, which the scaling decision has to look ahead
+
+    Parameters
+    ----------
+    configuration
+        configurations passed for the custom HPA programme
+
+    Returns
+    -------
+    int
+        Pod startup lead time in steps.
+    """
+
+    return max(1, int(configuration.get(constants.POD_STARTUP_LEAD_TIME, constants.DEFAULT_POD_STARTUP_LEAD_TIME)))
+
+
+def _predict_horizon(
+        inference_engine,
+        scaled_windows: np.ndarray,
+        covariates: np.ndarray,
+        time_indexes: list,
+        horizon: int
+) -> np.ndarray:
+    """
+    Method to predict several steps ahead for a batch of windows. Output chunks of the model are fed back into the
+    windows until the horizon is covered, the minute covariates of the predicted steps are known in advance.
+
+    Parameters
+    ----------
+    inference_engine
+        Inference engine of the deep learning based forecasting model.
+    scaled_windows
+        Array of shape (number of windows, window length) with the scaled requests per step.
+    covariates
+        Array of shape (number of windows, window length, 60) with the scaled minute covariates.
+    time_indexes
+        Time index of every window.
+    horizon
+        Number of steps to be predicted.
+
+    Returns
+    -------
+    np.ndarray
+        Array of shape (number of windows, horizon) with the scaled predictions.
     """
 
-    scaler = Scaler()
-    transformed_time_series = _scale_time_series(time_series, scaler)
-    past_covariate_series = _create_covariate_series(transformed_time_series)
+    window_length = scaled_windows.shape[1]
+    chunks = []
+    predicted_steps = 0
+
+    while True:
+        chunk = inference_engine.predict_chunk(scaled_windows, covariates, time_indexes)
+        chunks.append(chunk)
+        predicted_steps += chunk.shape[1]
+        if predicted_steps >= horizon:
+            break
+
+        time_indexes = [time_index.shift(chunk.shape[1]) for time_index in time_indexes]
+        scaled_windows = np.concatenate([scaled_windows, chunk], axis=1)[:, -window_length:]
+        covariates = np.stack([_create_covariate_values(time_index) for time_index in time_indexes])
+
+    return np.concatenate(chunks, axis=1)[:, :horizon]
+
+
+def _predict_workloads(
+        time_series_list: list,
+        inference_engine,
+        scaler_parameters: Optional[dict],
+        horizon: int = 1
+) -> np.ndarray:
+    """
+    Method to predict the inverse scaled workload of the next ticks for a batch of windows in one batched inference
+    call per output chunk
+
+    Parameters
+    ----------
+    time_series_list
+        List of TimeSeries objects with the requests per minute of the last window of ticks.
+    inference_engine
+        Inference engine of the deep learning based forecasting model.
+    scaler_parameters
+        Persisted scaling parameters of the forecasting model, None to scale every window on its own.
+    horizon
+        Number of ticks to be predicted.
+
+    Returns
+    -------
+    np.ndarray
+        Array of shape (number of windows, horizon) with the predicted requests.
+    """
+
+    with local_metrics.stage_timer(constants.LOCAL_METRICS_STAGE_PREPROCESSING):
+        scaled_windows, minimum, data_range, covariates, time_indexes = prepare_inputs(
+            time_series_list, scaler_parameters
+        )
+    with local_metrics.stage_timer(constants.LOCAL_METRICS_STAGE_INFERENCE):
+        predictions = _predict_horizon(inference_engine, scaled_windows, covariates, time_indexes, horizon)
+    return _inverse_scale_predictions(predictions, minimum, data_range)
+
+
+def _cached_predict_workloads(
+        time_series_list: list,
+        inference_engine,
+        scaler_parameters: Optional[dict],
+        forecast_cache: ForecastCache,
+        horizon: int = 1
+) -> list:
+    """
+    Method to predict the workload of the next ticks for a batch of windows, serving identical windows from the
+    forecast cache. Only the windows missing from the cache go through inference.
+
+    Parameters
+    ----------
+    time_series_list
+        List of TimeSeries objects with the requests per minute of the last window of ticks.
+    inference_engine
+        Inference engine of the deep learning based forecasting model.
+    scaler_parameters
+        Persisted scaling parameters of the forecasting model, None to scale every window on its own.
+    forecast_cache
+        Cache of forecasts keyed on the input window.
+    horizon
+        Number of ticks to be predicted.
+
+    Returns
+    -------
+    list
+        Predicted requests per minute for the next ticks, one array per window.
+    """
+
+    keys = [
+        forecast_cache.key(
+            tuple(time_series.values()[:, 0].tolist()),
+            time_series.time_index[0].minute * 60 + time_series.time_index[0].second,
+            horizon
+        )
+        for time_series in time_series_list
+    ]
+    prediction_results = [forecast_cache.get(key) for key in keys]
+
+    missing = {}
+    for index, (key, prediction_result) in enumerate(zip(keys, prediction_results)):
+        if prediction_result is None:
+            missing.setdefault(key, []).append(index)
 
-    prediction = model.predict(
-        n=1,
-        series=transformed_time_series,
-        past_covariates=past_covariate_series,
+    if missing:
+        predicted = _predict_workloads(
+            [time_series_list[indexes[0]] for indexes in missing.values()], inference_engine, scaler_parameters, horizon
+        )
+        for (key, indexes), prediction_result in zip(missing.items(), predicted):
+            forecast_cache.put(key, tuple(prediction_result.tolist()))
+            for index in indexes:
+                prediction_results[index] = prediction_result
+
+    logger.log_action(
+        "info",
+        "Forecast cache: " + str(len(time_series_list) - len(missing)) + " of " + str(len(time_series_list)) +
+        " window(s) served from cache (" + str(forecast_cache.hits) + " hits, " + str(forecast_cache.misses) +
+        " misses in total)",
+        cloud_log_bool=False
     )
-    prediction_result = _inverse_scale_prediction(prediction, scaler)
 
-    if int(time_series.values()[8][0]) <= int(time_series.values()[9][0]):
+    return [np.asarray(prediction_result) for prediction_result in prediction_results]
+
+
+def predict_future_workloads(
+        time_series_list: list,
+        inference_engine,
+        configurations: list,
+        scaler_parameters: Optional[dict] = None,
+        forecast_cache: Optional[ForecastCache] = None,
+        forecast_store: Optional[ForecastStore] = None
+) -> list:
+    """
+    Method for predicting the inverse scaled workload of several targets at once with the forecasting model, for as
+    many ticks ahead as their pod startup lead time. Targets whose stored forecast still matches the observed workload
+    reuse it, the others are predicted over the forecast horizon in a single batched inference, apart from the windows
+    found in the forecast cache.
+
+    Parameters
+    ----------
+    time_series_list
+        List of TimeSeries objects with the requests per minute of the last window of ticks, one per target.
+    inference_engine
+        Inference engine of the deep learning based forecasting model.
+    configurations
+        List of configurations passed for the custom HPA programme, one per target.
+    scaler_parameters
+        Persisted scaling parameters of the forecasting model, None to scale every window on its own.
+    forecast_cache
+        Cache of forecasts keyed on the input window, None to always run inference.
+    forecast_store
+        Forecasts of the previous ticks, None to forecast every target on every tick.
+
+    Returns
+    -------
+    list
+        Inverse scaled predictions for the next ticks, one array per target.
+    """
+
+    if not time_series_list:
+        return []
+
+    target_keys = [
+        configuration[constants.NAMESPACE] + "/" + configuration[constants.DEPLOYMENT_NAME]
+        for configuration in configurations
+    ]
+    lead_time_steps = [_lead_time_steps(configuration) for configuration in configurations]
+
+    prediction_results = [None] * len(time_series_list)
+    if forecast_store is not None:
+        prediction_results = [
+            forecast_store.reusable(target_key, time_series, steps)
+            for target_key, time_series, steps in zip(target_keys, time_series_list, lead_time_steps)
+        ]
 
-        final_prediction = int(
-            int(round(float(prediction_result.data_array().data)))
-            * (1 + configuration[constants.PREDICTION_ERROR_MITIGATION_VALUE])
+    missing = [index for index, prediction_result in enumerate(prediction_results) if prediction_result is None]
+
+    if missing:
+        horizon = max(_forecast_horizon(configurations[index]) for index in missing)
+        missing_series = [time_series_list[index] for index in missing]
+
+        if forecast_cache is not None:
+            predicted = _cached_predict_workloads(
+                missing_series, inference_engine, scaler_parameters, forecast_cache, horizon
+            )
+        else:
+            predicted = _predict_workloads(missing_series, inference_engine, scaler_parameters, horizon)
+
+        for index, prediction_result in zip(missing, predicted):
+            prediction_result = prediction_result[:_forecast_horizon(configurations[index])]
+            if forecast_store is not None:
+                forecast_store.store(target_keys[index], time_series_list[index], prediction_result)
+            prediction_results[index] = prediction_result[:lead_time_steps[index]]
+
+    if forecast_store is not None:
+        logger.log_action(
+            "info",
+            "Forecast reuse: " + str(len(time_series_list) - len(missing)) + " of " + str(len(time_series_list)) +
+            " target(s) served from stored forecasts (" + str(forecast_store.reuses) + " reuses, " +
+            str(forecast_store.reforecasts) + " forecasts in total)",
+            cloud_log_bool=False
         )
-        logger.log_action("info", "Forecasted workload for the next minute is: " + str(final_prediction))
-        return final_prediction
 
-    elif int(time_series.values()[8][0]) > int(time_series.values()[9][0]):
+    return prediction_results
+
+
+def forecast_future_workloads(
+        time_series_list: list,
+        inference_engine,
+        configurations: list,
+        scaler_parameters: Optional[dict] = None,
+        forecast_cache: Optional[ForecastCache] = None,
+        forecast_store: Optional[ForecastStore] = None
+) -> list:
+    """
+    Method for forecasting the future workload (number of requests) of several targets at once with the forecasting
+    model, for as many ticks ahead as their pod startup lead time.
+
+    Parameters
+    ----------
+    time_series_list
+        List of TimeSeries objects with the requests per minute of the last window of ticks, one per target.
+    inference_engine
+        Inference engine of the deep learning based forecasting model.
+    configurations
+        List of configurations passed for the custom HPA programme, one per target.
+    scaler_parameters
+        Persisted scaling parameters of the forecasting model, None to scale every window on its own.
+    forecast_cache
+        Cache of forecasts keyed on the input window, None to always run inference.
+    forecast_store
+        Forecasts of the previous ticks, None to forecast every target on every tick.
+
+    Returns
+    -------
+    list
+        Number of requests per minute to be expected for each of the next ticks, one list per target.
+    """
 
-        final_prediction = int(
-            int(round(float(prediction_result.data_array().data)))
+    prediction_results = predict_future_workloads(
+        time_series_list, inference_engine, configurations, scaler_parameters, forecast_cache, forecast_store
+    )
+    return final_predictions(time_series_list, prediction_results, configurations)
+
+
+def fallback_future_workloads(time_series_list: list, configurations: list, fallback_forecasters: list) -> list:
+    """
+    Method for forecasting the future workload (number of requests) of several targets at once with the cheap fallback
+    forecasters, for as many ticks ahead as their pod startup lead time.
+
+    Parameters
+    ----------
+    time_series_list
+        List of TimeSeries objects with the requests per minute of the last window of ticks, one per target.
+    configurations
+        List of configurations passed for the custom HPA programme, one per target.
+    fallback_forecasters
+        Tier name and forecasting method of every fallback forecaster, as created by create_fallback_forecasters.
+
+    Returns
+    -------
+    list
+        Number of requests per minute to be expected for each of the next ticks, one list per target.
+    """
+
+    if not time_series_list:
+        return []
+
+    lead_time_steps = [_lead_time_steps(configuration) for configuration in configurations]
+    windows = np.stack([time_series.values()[:, 0] for time_series in time_series_list])
+    predictions, tiers = fallback_predict(windows, max(lead_time_steps), fallback_forecasters)
+
+    return [
+        _final_prediction(time_series, prediction_result[:steps], configuration, tier)
+        for time_series, prediction_result, steps, configuration, tier in zip(
+            time_series_list, predictions, lead_time_steps, configurations, tiers
         )
-        logger.log_action("info", "Forecasted workload for the next minute is: " + str(final_prediction))
-        return final_prediction
+    ]
+
+
+def forecast_future_workload(
+        time_series: TimeSeries,
+        inference_engine,
+        configuration: dict,
+        scaler_parameters: Optional[dict] = None
+) -> list:
+    """
+    Method for forecasting the future workload (number of requests) for the next ticks.
+
+    Parameters
+    ----------
+    time_series
+        TimeSeries object with the requests per minute of the last window of ticks.
+    inference_engine
+        Inference engine of the deep learning based forecasting model.
+    configuration
+        configurations passed for the custom HPA programme
+    scaler_parameters
+        Persisted scaling parameters of the forecasting model, None to scale the window on its own.
+
+    Returns
+    -------
+    list
+        Number of requests per minute to be expected for each of the next ticks.
+    """
+
+    return forecast_future_workloads([time_series], inference_engine, [configuration], scaler_parameters)[0]
@@ -1,10 +1,249 @@
-from google.cloud import logging
+import atexit
+import logging as local_logging
+import queue
+import threading
+import time
+from typing import Optional
 from Modules.Constants import constants
 
 
+class _FlushRequest:
+    """
+    Marker put on the queue of the log shipper, answered once every log queued before it is written.
+
+    Parameters
+    ----------
+    stop
+        Whether the shipper stops after the flush.
+    """
+
+    def __init__(self, stop: bool = False):
+        self.stop = stop
+        self.done = threading.Event()
+
+
+class CloudLogShipper:
+    """
+    Background shipper writing logs to the Google cloud monitoring dashboard. Logs are queued in memory and written in
+    batches through a single client by a daemon thread, once the batch is full or the flush interval elapsed. When the
+    queue is full, logs are dropped and counted instead of blocking the caller.
+
+    Parameters
+    ----------
+    queue_size
+        Maximum number of logs waiting to be written.
+    batch_size
+        Maximum number of logs written in a single request.
+    flush_interval
+        Maximum number of seconds a log waits before its batch is written.
+    """
+
+    def __init__(
+            self,
+            queue_size: int = constants.DEFAULT_CLOUD_LOG_QUEUE_SIZE,
+            batch_size: int = constants.DEFAULT_CLOUD_LOG_BATCH_SIZE,
+            flush_interval: float = constants.DEFAULT_CLOUD_LOG_FLUSH_INTERVAL
+    ):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.dropped = 0
+        self.written = 0
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._cloud_logger = None
+        self._thread = threading.Thread(target=self._run, name="cloud-log-shipper", daemon=True)
+        self._thread.start()
+
+    def submit(self, text: str, severity: str) -> bool:
+        """
+        Queue a log without waiting for it to be written.
+
+        Parameters
+        ----------
+        text
+            Message of the log
+        severity
+            The log's severity level
+
+        Returns
+        -------
+        bool
+            False if the queue was full and the log was dropped.
+        """
+
+        try:
+            self._queue.put_nowait((text, severity))
+            return True
+        except queue.Full:
+            self.dropped += 1
+            return False
+
+    def flush(self, timeout: Optional[float] = None, stop: bool = False) -> bool:
+        """
+        Wait until every log queued so far is written.
+
+        Parameters
+        ----------
+        timeout
+            Maximum number of seconds to wait, None to wait without limit.
+        stop
+            Whether the shipper stops after the flush.
+
+        Returns
+        -------
+        bool
+            False if the logs were not written within the timeout.
+        """
+
+        if not self._thread.is_alive():
+            return False
+
+        flush_request = _FlushRequest(stop)
+        try:
+            self._queue.put(flush_request, timeout=timeout)
+        except queue.Full:
+            return False
+        return flush_request.done.wait(timeout)
+
+    def stop(self, timeout: Optional[float] = constants.CLOUD_LOG_SHUTDOWN_TIMEOUT) -> bool:
+        """
+        Write the queued logs and stop the background thread.
+
+        Parameters
+        ----------
+        timeout
+            Maximum number of seconds to wait for the queued logs to be written.
+
+        Returns
+        -------
+        bool
+            False if the logs were not written within the timeout.
+        """
+
+        flushed = self.flush(timeout, stop=True)
+        if self.dropped:
+            local_logging.warning(str(self.dropped) + " log(s) dropped by the cloud log shipper")
+        return flushed
+
+    def _run(self):
+        """
+        Collect the queued logs into batches and write them until a stopping flush request is received.
+        """
+
+        batch = []
+        deadline = None
+
+        while True:
+            timeout = self.flush_interval if deadline is None else max(0.0, deadline - time.monotonic())
+            try:
+                item = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                item = None
+
+            if isinstance(item, _FlushRequest):
+                self._write(batch)
+                batch, deadline = [], None
+                item.done.set()
+                if item.stop:
+                    return
+                continue
+
+            if item is not None:
+                batch.append(item)
+                if deadline is None:
+                    deadline = time.monotonic() + self.flush_interval
+
+            if batch and (len(batch) >= self.batch_size or time.monotonic() >= deadline):
+                self._write(batch)
+                batch, deadline = [], None
+
+    def _write(self, batch: list):
+        """
+        Write a batch of logs in a single request. A failed batch is dropped and counted.
+
+        Parameters
+        ----------
+        batch
+            List of tuples of log message and severity.
+        """
+
+        if not batch:
+            return
+
+        try:
+            if self._cloud_logger is None:
+                # the SDK is only imported once cloud logging is enabled and the first batch is written
+                from google.cloud import logging
+
+                self._cloud_logger = logging.Client().logger(constants.CLOUD_LOGGER_NAME)
+
+            with self._cloud_logger.batch() as cloud_batch:
+                for text, severity in batch:
+                    cloud_batch.log_text(text, severity=severity)
+            self.written += len(batch)
+
+        except Exception as exception:
+            self.dropped += len(batch)
+            local_logging.error("Failed to write " + str(len(batch)) + " log(s) to the cloud: " + str(exception))
+
+
+_log_shipper = None
+_log_shipper_lock = threading.Lock()
+
+
+def start_log_shipper(
+        queue_size: int = constants.DEFAULT_CLOUD_LOG_QUEUE_SIZE,
+        batch_size: int = constants.DEFAULT_CLOUD_LOG_BATCH_SIZE,
+        flush_interval: float = constants.DEFAULT_CLOUD_LOG_FLUSH_INTERVAL
+) -> CloudLogShipper:
+    """
+    Start the background shipper used by log_to_cloud, replacing a running one after writing its queued logs.
+
+    Parameters
+    ----------
+    queue_size
+        Maximum number of logs waiting to be written.
+    batch_size
+        Maximum number of logs written in a single request.
+    flush_interval
+        Maximum number of seconds a log waits before its batch is written.
+
+    Returns
+    -------
+    CloudLogShipper
+        The running log shipper.
+    """
+
+    global _log_shipper
+
+    with _log_shipper_lock:
+        if _log_shipper is not None:
+            _log_shipper.stop()
+        _log_shipper = CloudLogShipper(queue_size, batch_size, flush_interval)
+        return _log_shipper
+
+
+def stop_log_shipper(timeout: Optional[float] = constants.CLOUD_LOG_SHUTDOWN_TIMEOUT):
+    """
+    Write the queued logs and stop the background shipper.
+
+    Parameters
+    ----------
+    timeout
+        Maximum number of seconds to wait for the queued logs to be written.
+    """
+
+    global _log_shipper
+
+    with _log_shipper_lock:
+        if _log_shipper is not None:
+            _log_shipper.stop(timeout)
+            _log_shipper = None
+
+
 def log_to_cloud(text: str, severity: str):
     """
-    Method to log messages to the Google cloud monitoring dashboard
+    Method to log messages to the Google cloud monitoring dashboard. The log is queued for the background shipper, so
+    the caller never waits on the network.
 
     Parameters
     ----------
@@ -13,6 +252,11 @@ def log_to_cloud(text: str, severity: str):
     severity
         The log's severity level
     """
-    logging_client = logging.Client()
-    cloud_logger = logging_client.logger(constants.CLOUD_LOGGER_NAME)
-    cloud_logger.log_text(text, severity=severity)
+
+    log_shipper = _log_shipper
+    if log_shipper is None:
+        log_shipper = start_log_shipper()
+    log_shipper.submit(text, severity)
+
+
+atexit.register(stop_log_shipper)
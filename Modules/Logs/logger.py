@@ -32,6 +32,6 @@ def log_action(log_type: str, message: str, cloud_log_bool: bool = True):
 
     """
     logging.log(level=log_types[log_type.lower()], msg=message)
-    if cloud_log_bool:
+    if cloud_log_bool and main.configs is not None:
         if main.configs[constants.ENABLE_CLOUD_LOGGING]:
             cloud_logging.log_to_cloud(text=message, severity=log_type.upper())
@@ -1,4 +1,5 @@
 import time
+from typing import Optional
 
 import google.api_core.exceptions
 from google.api import label_pb2 as ga_label
@@ -6,14 +7,17 @@ from google.api import metric_pb2 as ga_metric
 from google.cloud import monitoring_v3
 from Modules.Logs import logger
 from Modules.Constants import constants
+from Modules.Scheduler.tick_scheduler import get_tick_interval
 
 
-def _createMetricDescriptor(configurations, metric):
+def _createMetricDescriptor(client: monitoring_v3.MetricServiceClient, configurations, metric):
     """
     Create metric descriptor object for new custom metric.
 
     Parameters
     ----------
+    client
+        Metric service client shared by the publisher.
     configurations
         Configuration passed for the custom HPA programme.
     metric
@@ -25,7 +29,6 @@ def _createMetricDescriptor(configurations, metric):
         Google MetricDescriptor object.
     """
 
-    client = monitoring_v3.MetricServiceClient()
     descriptor = ga_metric.MetricDescriptor()
 
     if metric == constants.PREDICTED_REQUEST_COUNT:
@@ -37,11 +40,6 @@ def _createMetricDescriptor(configurations, metric):
 
         descriptor.type = constants.POD_REPLICA_COUNT_BY_DEPLOYMENT_METRIC_DESCRIPTOR_TYPE
         descriptor.description = "This is a custom metric for " + constants.POD_REPLICA_COUNT_BY_DEPLOYMENT
-        label2 = ga_label.LabelDescriptor()
-        label2.key = "namespace"
-        label2.value_type = ga_label.LabelDescriptor.ValueType.STRING
-        label2.description = "This is a namespace label"
-        descriptor.labels.append(label2)
 
     elif metric == constants.PROMETHEUS_SERVER_METRIC_FOR_REQUEST_COUNT:
 
@@ -57,6 +55,12 @@ def _createMetricDescriptor(configurations, metric):
     label1.description = "This is a deployment label"
     descriptor.labels.append(label1)
 
+    label2 = ga_label.LabelDescriptor()
+    label2.key = "namespace"
+    label2.value_type = ga_label.LabelDescriptor.ValueType.STRING
+    label2.description = "This is a namespace label"
+    descriptor.labels.append(label2)
+
     label3 = ga_label.LabelDescriptor()
     label3.key = "projectId"
     label3.value_type = ga_label.LabelDescriptor.ValueType.STRING
@@ -76,12 +80,16 @@ def _createMetricDescriptor(configurations, metric):
     return descriptor
 
 
-def _getMetricDescriptor(configurations: dict, metric: str):
+def _getMetricDescriptor(client: monitoring_v3.MetricServiceClient, configurations: dict, metric: str):
     """
-    Retrieve metric descriptor of the given metric.
+    Retrieve metric descriptor of the given metric. A descriptor created before the series were labelled with the
+    namespace is created again with the namespace label, so deployments of the same name in different namespaces
+    form separate series.
 
     Parameters
     ----------
+    client
+        Metric service client shared by the publisher.
     configurations
         Configuration passed for the custom HPA programme.
     metric
@@ -93,7 +101,6 @@ def _getMetricDescriptor(configurations: dict, metric: str):
         Google MetricDescriptor object.
     """
 
-    client = monitoring_v3.MetricServiceClient()
     project_id = configurations[constants.PROJECT_ID]
     project_name = f"projects/{project_id}"
     descriptor = None
@@ -112,7 +119,12 @@ def _getMetricDescriptor(configurations: dict, metric: str):
         descriptor = client.get_metric_descriptor(name=descriptor_type)
     except google.api_core.exceptions.NotFound:
         logger.log_action("error", "Metric Descriptor not found! Creating new descriptor...")
-        descriptor = _createMetricDescriptor(configurations, metric)
+        descriptor = _createMetricDescriptor(client, configurations, metric)
+
+    if all(label.key != "namespace" for label in descriptor.labels):
+        logger.log_action("warning", "Metric Descriptor " + descriptor.type + " has no namespace label! Updating "
+                                     "descriptor...")
+        descriptor = _createMetricDescriptor(client, configurations, metric)
     return descriptor
 
 
@@ -145,14 +157,16 @@ def _createTimeSeriesPointsForPods(value: int) -> monitoring_v3.Point:
     return point
 
 
-def _createTimeSeriesPointsForRequest(value: int) -> monitoring_v3.Point:
+def _createTimeSeriesPointsForRequest(value: int, tick_time: int) -> monitoring_v3.Point:
     """
-    Creating timeseries point for predicted requests count metric.
+    Creating timeseries point for predicted requests count metric, at the start of the tick it was predicted for.
 
     Parameters
     ----------
     value
         Number of request count.
+    tick_time
+        UNIX timestamp of the start of the tick, aligned to the tick interval.
 
     Returns
     ----------
@@ -160,20 +174,7 @@ def _createTimeSeriesPointsForRequest(value: int) -> monitoring_v3.Point:
         Timeseries point object.
     """
 
-    current_time = time.localtime(int(time.time()))
-    tup = (
-        current_time.tm_year,
-        current_time.tm_mon,
-        current_time.tm_mday,
-        current_time.tm_hour,
-        current_time.tm_min,
-        0,
-        current_time.tm_wday,
-        current_time.tm_yday,
-        current_time.tm_isdst
-    )
-    time_sec = time.mktime(tup)
-    end_time = {"seconds": int(time_sec)}
+    end_time = {"seconds": tick_time}
     interval = monitoring_v3.TimeInterval(
         {"end_time": end_time}
     )
@@ -186,14 +187,19 @@ def _createTimeSeriesPointsForRequest(value: int) -> monitoring_v3.Point:
     return point
 
 
-def _createTImeSeriesPointsForPrometheusMetric(value: int) -> monitoring_v3.Point:
+def _createTImeSeriesPointsForPrometheusMetric(value: int, tick_time: int, tick_interval: int) -> monitoring_v3.Point:
     """
-    Creating timeseries point for requests count metric from prometheus server.
+    Creating timeseries point for requests count metric from prometheus server, at the start of the previous tick it
+    was received in.
 
     Parameters
     ----------
     value
         Number of request count.
+    tick_time
+        UNIX timestamp of the start of the tick, aligned to the tick interval.
+    tick_interval
+        Length of a tick in seconds.
 
     Returns
     ----------
@@ -201,20 +207,7 @@ def _createTImeSeriesPointsForPrometheusMetric(value: int) -> monitoring_v3.Poin
         Timeseries point object.
     """
 
-    current_time = time.localtime(int(time.time()))
-    tup = (
-        current_time.tm_year,
-        current_time.tm_mon,
-        current_time.tm_mday,
-        current_time.tm_hour,
-        current_time.tm_min - 1,
-        0,
-        current_time.tm_wday,
-        current_time.tm_yday,
-        current_time.tm_isdst
-    )
-    time_sec = time.mktime(tup)
-    end_time = {"seconds": int(time_sec)}
+    end_time = {"seconds": tick_time - tick_interval}
     interval = monitoring_v3.TimeInterval(
         {"end_time": end_time}
     )
@@ -227,121 +220,113 @@ def _createTImeSeriesPointsForPrometheusMetric(value: int) -> monitoring_v3.Poin
     return point
 
 
-def _publish_predicted_request_count_metric(predicted_workload: int, configurations: dict):
-    """
-    Method to publish metrics of the predicted request count to the Google cloud monitoring Dashboard
-
-    Parameters
-    ----------
-    predicted_workload
-        Predicted workload for the next minute.
-    configurations
-        Configuration passed for the custom HPA programme
-    """
-
-    descriptor = _getMetricDescriptor(configurations, constants.PREDICTED_REQUEST_COUNT)
-
-    series = monitoring_v3.TimeSeries()
-    series.metric.type = descriptor.type
-    series.resource.type = "global"
-
-    series.metric.labels["deployment"] = configurations[constants.DEPLOYMENT_NAME]
-    series.metric.labels["projectId"] = configurations[constants.PROJECT_ID]
-
-    series.points = [_createTimeSeriesPointsForRequest(predicted_workload)]
-
-    client = monitoring_v3.MetricServiceClient()
-    project_id = configurations[constants.PROJECT_ID]
-    project_name = f"projects/{project_id}"
-
-    client.create_time_series(
-        name=project_name,
-        time_series=[series]
-    )
-
-
-def _publish_pod_replica_count_metrics(pod_count_after_scaling: int, configurations: dict):
-    """
-    Method to publish metrics of the predicted pod replica count to the Google cloud monitoring Dashboard
-
-    Parameters
-    ----------
-    pod_count_after_scaling
-        Number of pod replicas
-    configurations
-        Configuration passed for the custom HPA programme
-    """
-
-    descriptor = _getMetricDescriptor(configurations, constants.POD_REPLICA_COUNT_BY_DEPLOYMENT)
-
-    series = monitoring_v3.TimeSeries()
-    series.metric.type = descriptor.type
-    series.resource.type = "global"
-
-    series.metric.labels["deployment"] = configurations[constants.DEPLOYMENT_NAME]
-    series.metric.labels["projectId"] = configurations[constants.PROJECT_ID]
-    series.metric.labels["namespace"] = configurations[constants.NAMESPACE]
-
-    series.points = [_createTimeSeriesPointsForPods(pod_count_after_scaling)]
-
-    client = monitoring_v3.MetricServiceClient()
-    project_id = configurations[constants.PROJECT_ID]
-    project_name = f"projects/{project_id}"
-    client.create_time_series(
-        name=project_name,
-        time_series=[series]
-    )
-
-
-def _publish_prometheus_server_metric_for_request_count(request_count: int, configurations: dict):
+class CloudMetricPublisher:
     """
-    Method to publish metrics of request count from prometheus metric server to the Google cloud monitoring Dashboard
+    Publisher of the custom metrics to the Google cloud monitoring dashboard. The metric service client is created
+    and the metric descriptors are resolved (or created) once, when the publisher is created. Every tick, the series
+    of all targets are sent in a single create_time_series request.
 
     Parameters
     ----------
-    request_count
-        Predicted workload for the next minute.
     configurations
         Configuration passed for the custom HPA programme
+    client
+        Metric service client to publish with, a new MetricServiceClient if not given.
     """
 
-    descriptor = _getMetricDescriptor(configurations, constants.PROMETHEUS_SERVER_METRIC_FOR_REQUEST_COUNT)
-
-    series = monitoring_v3.TimeSeries()
-    series.metric.type = descriptor.type
-    series.resource.type = "global"
-
-    series.metric.labels["deployment"] = configurations[constants.DEPLOYMENT_NAME]
-    series.metric.labels["projectId"] = configurations[constants.PROJECT_ID]
-
-    series.points = [_createTImeSeriesPointsForPrometheusMetric(request_count)]
-
-    client = monitoring_v3.MetricServiceClient()
-    project_id = configurations[constants.PROJECT_ID]
-    project_name = f"projects/{project_id}"
-
-    client.create_time_series(
-        name=project_name,
-        time_series=[series]
-    )
-
-
-def cloudMetricPublishing(pod_count: int, predicted_workload: int, prometheus_request_count: int, configurations: dict):
-    """
-    Method to publish custom metrics to the Google cloud monitoring dashboard
-
-    Parameters
-    ----------
-    pod_count
-        Number of pod replicas to be executed for the next iteration
-    predicted_workload
-        Predicted number of requests for the next minute
-    prometheus_request_count
-        Number of requests received from prometheus server for the previous minute
-    configurations
-        Configuration passed for the custom HPA programme
-    """
+    def __init__(self, configurations: dict, client: Optional[monitoring_v3.MetricServiceClient] = None):
+        self.client = client or monitoring_v3.MetricServiceClient()
+        self.project_name = f"projects/{configurations[constants.PROJECT_ID]}"
+        self.descriptor_types = {
+            metric: _getMetricDescriptor(self.client, configurations, metric).type
+            for metric in (
+                constants.POD_REPLICA_COUNT_BY_DEPLOYMENT,
+                constants.PREDICTED_REQUEST_COUNT,
+                constants.PROMETHEUS_SERVER_METRIC_FOR_REQUEST_COUNT
+            )
+        }
 
-    _publish_pod_replica_count_metrics(pod_count, configurations)
-    _publish_predicted_request_count_metric(predicted_workload, configurations)
-    _publish_prometheus_server_metric_for_request_count(prometheus_request_count, configurations)
+    def _create_series(self, metric: str, point: monitoring_v3.Point, configurations: dict) -> monitoring_v3.TimeSeries:
+        """
+        Create the series of a single metric point of a target, labelled with the namespace and name of the target, so
+        targets of the same name in different namespaces never form duplicate series in a batch.
+
+        Parameters
+        ----------
+        metric
+            name of the metric
+        point
+            Timeseries point object.
+        configurations
+            Configuration of the target deployment.
+
+        Returns
+        ----------
+        monitoring_v3.TimeSeries
+            Timeseries object.
+        """
+
+        series = monitoring_v3.TimeSeries()
+        series.metric.type = self.descriptor_types[metric]
+        series.resource.type = "global"
+
+        series.metric.labels["deployment"] = configurations[constants.DEPLOYMENT_NAME]
+        series.metric.labels["projectId"] = configurations[constants.PROJECT_ID]
+        series.metric.labels["namespace"] = configurations[constants.NAMESPACE]
+
+        series.points = [point]
+        return series
+
+    def time_series(self, pod_count: int, predicted_workload: int, prometheus_request_count: int,
+                    configurations: dict, trigger_time: float) -> list:
+        """
+        Create the series of the custom metrics of a target. The request count points are timed on the tick, so
+        every tick writes a strictly newer point even with several ticks per minute.
+
+        Parameters
+        ----------
+        pod_count
+            Number of pod replicas to be executed for the next iteration
+        predicted_workload
+            Predicted requests per minute for the next tick
+        prometheus_request_count
+            Requests per minute received from prometheus server in the previous tick
+        configurations
+            Configuration of the target deployment.
+        trigger_time
+            UNIX timestamp the tick was scheduled at.
+
+        Returns
+        ----------
+        list
+            Timeseries objects of the target.
+        """
+
+        tick_interval = get_tick_interval(configurations)
+        tick_time = int(trigger_time // tick_interval * tick_interval)
+
+        return [
+            self._create_series(constants.POD_REPLICA_COUNT_BY_DEPLOYMENT, _createTimeSeriesPointsForPods(pod_count),
+                                configurations),
+            self._create_series(constants.PREDICTED_REQUEST_COUNT,
+                                _createTimeSeriesPointsForRequest(predicted_workload, tick_time), configurations),
+            self._create_series(constants.PROMETHEUS_SERVER_METRIC_FOR_REQUEST_COUNT,
+                                _createTImeSeriesPointsForPrometheusMetric(prometheus_request_count, tick_time,
+                                                                           tick_interval), configurations)
+        ]
+
+    def publish(self, time_series: list):
+        """
+        Send the series of all targets, in as few create_time_series requests as the API allows.
+
+        Parameters
+        ----------
+        time_series
+            Timeseries objects to be published.
+        """
+
+        for start in range(0, len(time_series), constants.MAX_TIME_SERIES_PER_REQUEST):
+            self.client.create_time_series(
+                name=self.project_name,
+                time_series=time_series[start:start + constants.MAX_TIME_SERIES_PER_REQUEST]
+            )
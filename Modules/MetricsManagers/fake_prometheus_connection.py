@@ -0,0 +1,46 @@
+from datetime import datetime
+import numpy as np
+from Modules.Constants import constants
+
+
+class FakePrometheusConnect:
+    """
+    In-memory stand-in of the PrometheusConnect object serving a recorded request trace. Range queries return the
+    per-step request counts of the trace in the shape of the response to the HAProxy request count query, so the
+    request count buffers and the series construction run unchanged on top of it.
+
+    Parameters
+    ----------
+    timestamps
+        UNIX timestamps of the steps of the trace in chronological order, each one at the end of its step.
+    values
+        Request counts of the steps of the trace.
+    backend
+        HAProxy backend label the series is reported for.
+    """
+
+    def __init__(self, timestamps: np.ndarray, values: np.ndarray, backend: str = constants.DEFAULT_PROMETHEUS_BACKEND):
+        self.timestamps = np.asarray(timestamps, dtype=np.float64)
+        self.values = np.asarray(values, dtype=np.float64)
+        self.backend = backend
+        self.queries = 0
+
+    def custom_query_range(self, query: str, start_time: datetime, end_time: datetime, step: str, params=None) -> list:
+        """
+        Return the steps of the trace between the start and end time, both included.
+        """
+
+        self.queries += 1
+
+        first = np.searchsorted(self.timestamps, start_time.timestamp(), side="left")
+        last = np.searchsorted(self.timestamps, end_time.timestamp(), side="right")
+        if first >= last:
+            return []
+
+        return [{
+            "metric": {constants.PROMQL_RESPONSE_METRIC_LABEL: self.backend},
+            "values": [
+                [timestamp, str(value)]
+                for timestamp, value in zip(self.timestamps[first:last].tolist(), self.values[first:last].tolist())
+            ]
+        }]
@@ -0,0 +1,148 @@
+import json
+import math
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Sequence
+from urllib.parse import parse_qs, urlparse
+from Modules.Constants import constants
+
+
+def diurnal_workload(timestamp: float) -> float:
+    """
+    Deterministic synthetic workload: a daily cycle between 200 and 1800 requests per minute with an hourly ripple.
+
+    Parameters
+    ----------
+    timestamp
+        UNIX timestamp of the step.
+
+    Returns
+    -------
+    float
+        Number of requests of the step.
+    """
+
+    return 1000 + 800 * math.sin(2 * math.pi * timestamp / 86400) + 100 * math.sin(2 * math.pi * timestamp / 3600)
+
+
+class _FakePrometheusRequestHandler(BaseHTTPRequestHandler):
+    """
+    Request handler answering range queries of the fake prometheus metric server. Any other path answers with an
+    empty success response, which is enough for the connection check.
+    """
+
+    protocol_version = "HTTP/1.1"
+    # headers and body are written separately, Nagle's algorithm would hold the body back on keep-alive connections
+    disable_nagle_algorithm = True
+
+    def _respond(self):
+        server = self.server
+        url = urlparse(self.path)
+        if server.latency > 0:
+            time.sleep(server.latency)
+
+        result = []
+        if url.path == "/api/v1/query_range":
+            parameters = parse_qs(url.query)
+            start = int(float(parameters["start"][0]))
+            end = int(float(parameters["end"][0]))
+            step = int(float(parameters["step"][0]))
+            with server.lock:
+                server.queries += 1
+            result = [
+                {
+                    "metric": {constants.PROMQL_RESPONSE_METRIC_LABEL: backend},
+                    "values": [
+                        [timestamp, str(round(server.workload(timestamp)))]
+                        for timestamp in range(start, end + 1, step)
+                    ]
+                }
+                for backend in server.backends
+            ]
+
+        body = json.dumps({"status": "success", "data": {"resultType": "matrix", "result": result}}).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        self._respond()
+
+    def do_POST(self):
+        self._respond()
+
+    def log_message(self, format, *args):
+        """
+        Queries are not logged.
+        """
+
+
+class FakePrometheusServer:
+    """
+    In-process HTTP stand-in of the prometheus metric server answering the HAProxy request count query for a set of
+    backends from a synthetic workload, so the ingestion runs over a real keep-alive HTTP connection without a
+    Prometheus deployment.
+
+    Parameters
+    ----------
+    backends
+        HAProxy backends reported in every range query response.
+    workload
+        Callable returning the number of requests of the step ending at a UNIX timestamp.
+    latency
+        Number of seconds every response is delayed by.
+    """
+
+    def __init__(
+            self,
+            backends: Sequence[str] = (constants.DEFAULT_PROMETHEUS_BACKEND,),
+            workload: Callable[[float], float] = diurnal_workload,
+            latency: float = 0.0
+    ):
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), _FakePrometheusRequestHandler)
+        self._server.daemon_threads = True
+        self._server.backends = list(backends)
+        self._server.workload = workload
+        self._server.latency = latency
+        self._server.queries = 0
+        self._server.lock = threading.Lock()
+
+    @property
+    def url(self) -> str:
+        """
+        Address of the server, to be used as the prometheus server address.
+        """
+
+        return "http://127.0.0.1:" + str(self._server.server_address[1])
+
+    @property
+    def queries(self) -> int:
+        """
+        Number of range queries answered so far.
+        """
+
+        return self._server.queries
+
+    def start(self) -> str:
+        """
+        Serve the queries from a daemon thread.
+
+        Returns
+        -------
+        str
+            Address of the server.
+        """
+
+        threading.Thread(target=self._server.serve_forever, name="fake-prometheus-server", daemon=True).start()
+        return self.url
+
+    def stop(self):
+        """
+        Stop serving and close the listening socket.
+        """
+
+        self._server.shutdown()
+        self._server.server_close()
@@ -0,0 +1,352 @@
+import bisect
+import math
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Sequence
+from Modules.Constants import constants
+
+_registry = []
+_registry_lock = threading.Lock()
+_metrics_server = None
+
+
+def _format_labels(label_names: Sequence[str], label_values: Sequence[str], extra: str = "") -> str:
+    """
+    Format the labels of a sample in the Prometheus text exposition format.
+
+    Parameters
+    ----------
+    label_names
+        Names of the labels.
+    label_values
+        Values of the labels.
+    extra
+        Additional, already formatted label (e.g. the 'le' label of a histogram bucket).
+
+    Returns
+    -------
+    str
+        Formatted labels, empty if the sample has none.
+    """
+
+    labels = [
+        name + '="' + str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") + '"'
+        for name, value in zip(label_names, label_values)
+    ]
+    if extra:
+        labels.append(extra)
+    return "{" + ",".join(labels) + "}" if labels else ""
+
+
+def _format_value(value: float) -> str:
+    """
+    Format a sample value in the Prometheus text exposition format.
+
+    Parameters
+    ----------
+    value
+        Value of the sample.
+
+    Returns
+    -------
+    str
+        Formatted value.
+    """
+
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value))
+
+
+class _Metric:
+    """
+    Base of the local metrics, holding one value per combination of label values. Metrics register themselves, so
+    they are exposed on the /metrics endpoint.
+
+    Parameters
+    ----------
+    name
+        Name of the metric.
+    description
+        Help text of the metric.
+    label_names
+        Names of the labels of the metric.
+    """
+
+    metric_type = "untyped"
+
+    def __init__(self, name: str, description: str, label_names: Sequence[str] = ()):
+        self.name = name
+        self.description = description
+        self.label_names = tuple(label_names)
+        self._values = {}
+        self._lock = threading.Lock()
+
+        with _registry_lock:
+            _registry.append(self)
+
+    def _samples(self) -> list:
+        """
+        Render the samples of the metric.
+
+        Returns
+        -------
+        list
+            Lines of the samples in the Prometheus text exposition format.
+        """
+
+        with self._lock:
+            return [
+                self.name + _format_labels(self.label_names, label_values) + " " + _format_value(value)
+                for label_values, value in sorted(self._values.items())
+            ]
+
+    def render(self) -> str:
+        """
+        Render the metric in the Prometheus text exposition format.
+
+        Returns
+        -------
+        str
+            HELP and TYPE lines followed by the samples of the metric.
+        """
+
+        lines = ["# HELP " + self.name + " " + self.description, "# TYPE " + self.name + " " + self.metric_type]
+        return "\n".join(lines + self._samples())
+
+
+class Counter(_Metric):
+    """
+    Monotonically increasing count of events.
+    """
+
+    metric_type = "counter"
+
+    def inc(self, amount: float = 1, *label_values: str):
+        """
+        Increase the counter.
+
+        Parameters
+        ----------
+        amount
+            Amount to increase the counter by.
+        label_values
+            Values of the labels, in the order of the label names.
+        """
+
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0) + amount
+
+
+class Gauge(_Metric):
+    """
+    Value which can go up and down, e.g. the latest forecast.
+    """
+
+    metric_type = "gauge"
+
+    def set(self, value: float, *label_values: str):
+        """
+        Set the gauge.
+
+        Parameters
+        ----------
+        value
+            New value of the gauge.
+        label_values
+            Values of the labels, in the order of the label names.
+        """
+
+        with self._lock:
+            self._values[label_values] = value
+
+
+class Histogram(_Metric):
+    """
+    Distribution of observed values over cumulative buckets, from which Prometheus derives quantiles such as the p99
+    latency.
+
+    Parameters
+    ----------
+    name
+        Name of the metric.
+    description
+        Help text of the metric.
+    label_names
+        Names of the labels of the metric.
+    buckets
+        Upper bounds of the buckets in increasing order.
+    """
+
+    metric_type = "histogram"
+
+    def __init__(self, name: str, description: str, label_names: Sequence[str] = (),
+                 buckets: Sequence[float] = constants.LOCAL_METRICS_LATENCY_BUCKETS):
+        super().__init__(name, description, label_names)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, *label_values: str):
+        """
+        Record an observed value.
+
+        Parameters
+        ----------
+        value
+            Observed value.
+        label_values
+            Values of the labels, in the order of the label names.
+        """
+
+        with self._lock:
+            bucket_counts, total = self._values.get(label_values, ([0] * (len(self.buckets) + 1), 0.0))
+            bucket_counts[bisect.bisect_left(self.buckets, value)] += 1
+            self._values[label_values] = (bucket_counts, total + value)
+
+    def _samples(self) -> list:
+        lines = []
+        with self._lock:
+            for label_values, (bucket_counts, total) in sorted(self._values.items()):
+                cumulative_count = 0
+                for upper_bound, bucket_count in zip(self.buckets + (math.inf,), bucket_counts):
+                    cumulative_count += bucket_count
+                    lines.append(
+                        self.name + "_bucket" +
+                        _format_labels(self.label_names, label_values, 'le="' + _format_value(upper_bound) + '"') +
+                        " " + str(cumulative_count)
+                    )
+                lines.append(self.name + "_sum" + _format_labels(self.label_names, label_values) + " " +
+                             _format_value(total))
+                lines.append(self.name + "_count" + _format_labels(self.label_names, label_values) + " " +
+                             str(cumulative_count))
+        return lines
+
+
+stage_duration = Histogram(
+    "autoscaler_stage_duration_seconds", "Duration of the stages of an iteration in seconds", ("stage",)
+)
+stage_budget_overruns = Counter(
+    "autoscaler_stage_budget_overruns_total", "Number of stages which overran their time budget", ("stage",)
+)
+prometheus_query_duration = Histogram(
+    "autoscaler_prometheus_query_duration_seconds", "Duration of the range queries to the prometheus metric server",
+    ("namespace", "deployment")
+)
+trigger_to_scale = Histogram(
+    "autoscaler_trigger_to_scale_seconds", "Time from the tick trigger to the scaling decision of a target"
+)
+ingestion_fallbacks = Counter(
+    "autoscaler_ingestion_fallbacks_total", "Number of targets forecasted from their last good data",
+    ("namespace", "deployment")
+)
+tick_duration = Histogram("autoscaler_tick_duration_seconds", "Duration of an iteration in seconds")
+ticks = Counter("autoscaler_ticks_total", "Number of iterations fired")
+failed_ticks = Counter("autoscaler_failed_ticks_total", "Number of iterations which raised an error")
+missed_ticks = Counter("autoscaler_missed_ticks_total", "Number of ticks missed because an iteration overran")
+tick_jitter = Gauge("autoscaler_tick_jitter_seconds", "Delay between the tick boundary and the start of the iteration")
+forecasted_workload = Gauge(
+    "autoscaler_forecasted_requests", "Forecasted requests per minute for the next tick", ("namespace", "deployment")
+)
+forecast_tiers = Counter(
+    "autoscaler_forecasts_total", "Number of forecasts by the forecasting tier which produced them",
+    ("namespace", "deployment", "tier")
+)
+model_reloads = Counter(
+    "autoscaler_model_reloads_total", "Number of reloads of a changed forecasting model by outcome", ("outcome",)
+)
+pod_replicas = Gauge(
+    "autoscaler_pod_replicas", "Pod replica count decided for the deployment", ("namespace", "deployment")
+)
+time_to_ready = Histogram(
+    "autoscaler_time_to_ready_seconds", "Time for a scaled deployment to converge to its requested ready replicas",
+    ("namespace", "deployment"), constants.LOCAL_METRICS_READINESS_BUCKETS
+)
+readiness_timeouts = Counter(
+    "autoscaler_readiness_timeouts_total", "Number of scale actions which did not converge within the deadline",
+    ("namespace", "deployment")
+)
+scaling_decision_outcomes = Counter(
+    "autoscaler_scaling_decisions_total", "Number of scaling decisions by outcome",
+    ("namespace", "deployment", "outcome")
+)
+
+
+@contextmanager
+def stage_timer(stage: str):
+    """
+    Time a stage of the iteration into the stage duration histogram.
+
+    Parameters
+    ----------
+    stage
+        Name of the stage, one of the LOCAL_METRICS_STAGE_* constants.
+    """
+
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        stage_duration.observe(time.perf_counter() - start, stage)
+
+
+def render_metrics() -> str:
+    """
+    Render every registered metric in the Prometheus text exposition format.
+
+    Returns
+    -------
+    str
+        Body of the /metrics endpoint.
+    """
+
+    with _registry_lock:
+        metrics = list(_registry)
+    return "\n".join(metric.render() for metric in metrics) + "\n"
+
+
+class _MetricsRequestHandler(BaseHTTPRequestHandler):
+    """
+    Request handler serving the local metrics on /metrics.
+    """
+
+    def do_GET(self):
+        if self.path.split("?")[0] != "/metrics":
+            self.send_error(404)
+            return
+
+        body = render_metrics().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        """
+        Scrapes are not logged.
+        """
+
+
+def start_metrics_server(port: int) -> ThreadingHTTPServer:
+    """
+    Serve the local metrics on http://0.0.0.0:<port>/metrics from a daemon thread.
+
+    Parameters
+    ----------
+    port
+        Port of the metrics endpoint, 0 to pick a free one.
+
+    Returns
+    -------
+    ThreadingHTTPServer
+        The running metrics server.
+    """
+
+    global _metrics_server
+
+    if _metrics_server is None:
+        _metrics_server = ThreadingHTTPServer(("", port), _MetricsRequestHandler)
+        _metrics_server.daemon_threads = True
+        threading.Thread(target=_metrics_server.serve_forever, name="local-metrics-server", daemon=True).start()
+    return _metrics_server
@@ -0,0 +1,118 @@
+import threading
+import time
+from typing import Tuple
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from prometheus_api_client import PrometheusConnect
+from Modules.Constants import constants
+from Modules.MetricsManagers import local_metrics
+
+_prometheus_connection = None
+_prometheus_connection_lock = threading.Lock()
+
+
+def _create_prometheus_connection(configurations: dict) -> PrometheusConnect:
+    """
+    Create a PrometheusConnect object backed by a pooled keep-alive session with bounded retries and timeouts
+
+    Parameters
+    ----------
+    configurations
+        configurations passed for the custom HPA programme
+
+    Returns
+    -------
+    PrometheusConnect
+        A PrometheusConnect object with connection details.
+    """
+
+    url = configurations[constants.PROMETHEUS_SERVER_ADDRESS]
+
+    retry = Retry(
+        total=configurations.get(constants.PROMETHEUS_MAX_RETRIES, constants.DEFAULT_PROMETHEUS_MAX_RETRIES),
+        backoff_factor=configurations.get(
+            constants.PROMETHEUS_RETRY_BACKOFF_FACTOR, constants.DEFAULT_PROMETHEUS_RETRY_BACKOFF_FACTOR
+        ),
+        status_forcelist=constants.PROMETHEUS_RETRY_ON_STATUS,
+        allowed_methods=frozenset(["GET", "POST"])
+    )
+
+    pool_size = configurations.get(
+        constants.MAX_CONCURRENT_TARGETS, constants.DEFAULT_MAX_CONCURRENT_TARGETS
+    )
+
+    session = requests.Session()
+    session.verify = False
+
+    prom = PrometheusConnect(
+        url=url,
+        disable_ssl=True,
+        retry=retry,
+        session=session,
+        timeout=(
+            configurations.get(constants.PROMETHEUS_CONNECT_TIMEOUT, constants.DEFAULT_PROMETHEUS_CONNECT_TIMEOUT),
+            configurations.get(constants.PROMETHEUS_READ_TIMEOUT, constants.DEFAULT_PROMETHEUS_READ_TIMEOUT)
+        )
+    )
+
+    # PrometheusConnect mounts a default sized adapter for its url, replace it with the pooled one
+    session.mount(url, HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=retry))
+
+    return prom
+
+
+def get_prometheus_connection(configurations: dict) -> PrometheusConnect:
+    """
+    Retrieve the PrometheusConnect object shared across iterations and targets, creating it on the first call
+
+    Parameters
+    ----------
+    configurations
+        configurations passed for the custom HPA programme
+
+    Returns
+    -------
+    PrometheusConnect
+        A PrometheusConnect object with connection details.
+    """
+
+    global _prometheus_connection
+
+    with _prometheus_connection_lock:
+        if _prometheus_connection is None:
+            _prometheus_connection = _create_prometheus_connection(configurations)
+        return _prometheus_connection
+
+
+def timed_query_range(prom: PrometheusConnect, configurations: dict, **kwargs) -> Tuple[list, float]:
+    """
+    Execute a range query on the prometheus metric server and record its latency for the target, failed queries
+    included
+
+    Parameters
+    ----------
+    prom
+        PrometheusConnect object with connection details.
+    configurations
+        configurations passed for the custom HPA programme
+    kwargs
+        Arguments of PrometheusConnect.custom_query_range.
+
+    Returns
+    -------
+    list
+        Result list returned by the Prometheus query API.
+    float
+        Duration of the query in seconds.
+    """
+
+    start = time.perf_counter()
+    try:
+        result = prom.custom_query_range(**kwargs)
+    finally:
+        seconds = time.perf_counter() - start
+        local_metrics.prometheus_query_duration.observe(
+            seconds, configurations[constants.NAMESPACE], configurations[constants.DEPLOYMENT_NAME]
+        )
+    return result, seconds
@@ -1,18 +1,26 @@
 import time
+import threading
+import numpy as np
 import pandas as pd
 from typing import Optional, Tuple
 from prometheus_api_client import PrometheusConnect
-from prometheus_api_client.utils import parse_datetime
 from darts import TimeSeries
-from darts.utils.missing_values import fill_missing_values
 from datetime import timedelta, datetime
 from Modules.Constants import constants
 from Modules.Logs import logger
+from Modules.MetricsManagers.request_count_buffer import RequestCountBuffer
+from Modules.MetricsManagers.local_metrics import stage_timer
+from Modules.Scheduler.tick_scheduler import get_tick_interval
+from Modules.MetricsManagers.prometheus_connection import get_prometheus_connection, timed_query_range
+
+_request_count_buffers = {}
+_request_count_buffers_lock = threading.Lock()
 
 
 def check_prometheus_server_endpoint(configurations: dict) -> PrometheusConnect:
     """
-    check for the connectivity of the prometheus metric server using the provided host address
+    check for the connectivity of the prometheus metric server using the provided host address. The returned
+    connection is the one shared by every iteration.
 
     Parameters
     ----------
@@ -25,88 +33,265 @@ def check_prometheus_server_endpoint(configurations: dict) -> PrometheusConnect:
         A PrometheusConnect object with connection details.
     """
 
-    prom = PrometheusConnect(
-        url=configurations[constants.PROMETHEUS_SERVER_ADDRESS],
-        disable_ssl=True
-    )
-    return prom
+    return get_prometheus_connection(configurations)
 
 
-def getTimeSeries(configurations: dict) -> Optional[Tuple[TimeSeries, int]]:
+def _select_backend_result(result: list, configurations: dict) -> Optional[dict]:
     """
-    Retrieve timeseries data of request count from the prometheus metrics server for the last 10 minutes
+    Pick the series of the configured HAProxy backend out of a Prometheus query response
 
     Parameters
     ----------
+    result
+        Result list returned by the Prometheus query API.
     configurations
         configurations passed for the custom HPA programme
 
     Returns
     -------
-    TimeSeries
-        A TimeSeries of requests per minute.
-    int
-        Number of requests received in the previous minute from prometheus server
+    dict
+        The matching series entry, or None if the backend is not part of the response.
     """
 
-    prom = PrometheusConnect(
-        url=configurations[constants.PROMETHEUS_SERVER_ADDRESS],
-        disable_ssl=True
-    )
+    backend = configurations.get(constants.PROMETHEUS_BACKEND, constants.DEFAULT_PROMETHEUS_BACKEND)
+
+    for item in result:
+        if item['metric'] == {constants.PROMQL_RESPONSE_METRIC_LABEL: backend}:
+            return item
+    return None
+
+
+def _get_request_count_buffer(
+        configurations: dict,
+        window_length: int = constants.TIME_SERIES_WINDOW_SIZE
+) -> RequestCountBuffer:
+    """
+    Retrieve the request count ring buffer of a target deployment, creating it on the first call with one step per
+    tick
+
+    Parameters
+    ----------
+    configurations
+        configurations passed for the custom HPA programme
+    window_length
+        Number of steps of the windows taken from the buffer.
+
+    Returns
+    -------
+    RequestCountBuffer
+        Ring buffer with the most recent request counts of the target deployment.
+    """
+
+    key = (configurations[constants.NAMESPACE], configurations[constants.DEPLOYMENT_NAME])
+
+    with _request_count_buffers_lock:
+        if key not in _request_count_buffers:
+            capacity = max(
+                configurations.get(constants.REQUEST_COUNT_BUFFER_SIZE, constants.DEFAULT_REQUEST_COUNT_BUFFER_SIZE),
+                window_length
+            )
+            _request_count_buffers[key] = RequestCountBuffer(capacity, get_tick_interval(configurations))
+        return _request_count_buffers[key]
+
+
+def _update_request_count_buffer(
+        prom: PrometheusConnect,
+        request_count_buffer: RequestCountBuffer,
+        end_time: datetime,
+        configurations: dict
+) -> bool:
+    """
+    Bring the request count ring buffer of a target deployment up to date. Only the steps which are newer than the
+    latest buffered step are queried. The whole buffer is backfilled on startup or when the gap is too large.
+
+    Parameters
+    ----------
+    prom
+        PrometheusConnect object with connection details.
+    request_count_buffer
+        Ring buffer of the target deployment.
+    end_time
+        Newest step to be available in the buffer after the update.
+    configurations
+        configurations passed for the custom HPA programme
 
-    start_time = parse_datetime("9m").replace(second=0, microsecond=0)
-    end_time = parse_datetime("now").replace(second=0, microsecond=0)
+    Returns
+    -------
+    bool
+        True if the buffer is up to date, False if the response did not contain the target's backend.
+    """
+
+    missing_steps = request_count_buffer.missing_steps(end_time.timestamp())
+
+    if missing_steps == 0:
+        return True
+
+    if missing_steps is None or missing_steps >= request_count_buffer.capacity:
+        request_count_buffer.reset()
+        missing_steps = request_count_buffer.capacity
+        query_type = "Backfilling"
+    else:
+        query_type = "Incrementally retrieving"
+
+    step = timedelta(seconds=request_count_buffer.step_seconds)
+    start_time = end_time - (missing_steps - 1) * step
 
     logger.log_action(
         "info",
-        "Time series to be received for the interval from " +
-        time.strftime(constants.DATE_TIME_FORMAT_STRING, time.localtime((start_time - timedelta(minutes=1)).timestamp()))
-        + " to " +
-        time.strftime(constants.DATE_TIME_FORMAT_STRING, time.localtime((end_time - timedelta(minutes=1)).timestamp()))
+        query_type + " time series of " + configurations[constants.DEPLOYMENT_NAME] + " for the interval from " +
+        time.strftime(constants.DATE_TIME_FORMAT_STRING, time.localtime((start_time - step).timestamp())) + " to " +
+        time.strftime(constants.DATE_TIME_FORMAT_STRING, time.localtime((end_time - step).timestamp()))
     )
 
-    result = prom.custom_query_range(
-        query=constants.PROMQL_HAPROXY_REQUEST_COUNT,
+    result, query_seconds = timed_query_range(
+        prom,
+        configurations,
+        query=constants.PROMQL_HAPROXY_REQUEST_COUNT.format(window=request_count_buffer.step_seconds),
         start_time=start_time,
         end_time=end_time,
-        step='60'
+        step=str(request_count_buffer.step_seconds)
     )
 
-    if result[0]['metric'] == constants.PROMQL_RESPONSE_METRIC:
-        logger.log_action("info", "Response received from Prometheus metric server successfully")
+    logger.log_action(
+        "info",
+        "Prometheus query for " + configurations[constants.DEPLOYMENT_NAME] + " completed in " +
+        str(round(query_seconds * 1000, 1)) + " ms",
+        cloud_log_bool=False
+    )
 
-        final_time_series = []
+    backend_result = _select_backend_result(result, configurations)
 
-        for item in result[0]['values']:
-            current_time = time.strftime(
-                constants.DATE_TIME_FORMAT_STRING,
-                time.localtime((datetime.fromtimestamp(item[0]) - timedelta(minutes=1)).timestamp())
-            )
+    if backend_result is None:
+        return False
+
+    request_count_buffer.extend(backend_result['values'])
+    return True
 
-            final_time_series.insert(
-                0,
-                {
-                    constants.TIME_SERIES_TIME_COLUMN: current_time,
-                    constants.TIME_SERIES_VALUE_COLUMN: int(round(float(item[1])))
-                }
-            )
 
-        dataframe = pd.DataFrame.from_dict(final_time_series)
-        dataframe[constants.TIME_SERIES_TIME_COLUMN] = pd.to_datetime(dataframe.time)
+def _build_time_series(timestamps: np.ndarray, values: np.ndarray, step_seconds: int) -> TimeSeries:
+    """
+    Build the TimeSeries of requests per step straight from the raw prometheus timestamps and values. Every step is
+    labelled with the local start time of its interval and missing steps are linearly interpolated.
 
-        last_minute_request_count = int(dataframe[constants.TIME_SERIES_VALUE_COLUMN].iloc[0])
+    Parameters
+    ----------
+    timestamps
+        UNIX timestamps of the steps in chronological order.
+    values
+        Request counts of the steps in chronological order.
+    step_seconds
+        Length of a single step in seconds.
 
-        series = fill_missing_values(
-            TimeSeries.from_dataframe(
-                dataframe,
-                constants.TIME_SERIES_TIME_COLUMN,
-                [constants.TIME_SERIES_VALUE_COLUMN]
-            ),
-            "auto"
+    Returns
+    -------
+    TimeSeries
+        A TimeSeries of requests per step without missing values.
+    """
+
+    grid = np.arange(timestamps[0], timestamps[-1] + step_seconds / 2, step_seconds)
+    filled_values = np.interp(grid, timestamps, np.round(values))
+
+    utc_offset = time.localtime(timestamps[-1]).tm_gmtoff
+    times = pd.DatetimeIndex(
+        ((grid - step_seconds + utc_offset) * 1e9).astype("int64").astype("datetime64[ns]"),
+        name=constants.TIME_SERIES_TIME_COLUMN
+    )
+
+    return TimeSeries.from_times_and_values(
+        times,
+        filled_values.reshape(-1, 1),
+        freq=str(step_seconds) + "s",
+        columns=[constants.TIME_SERIES_VALUE_COLUMN]
+    )
+
+
+def fetch_time_series(
+        prom: PrometheusConnect,
+        request_count_buffer: RequestCountBuffer,
+        end_time: datetime,
+        configurations: dict,
+        window_length: int = constants.TIME_SERIES_WINDOW_SIZE
+) -> Optional[Tuple[TimeSeries, int]]:
+    """
+    Bring the request count ring buffer of a target deployment up to the given time and build the TimeSeries of its
+    last window_length steps. Shared by the live iterations and the replay simulator, which passes an in-memory
+    stand-in of the prometheus metric server.
+
+    Parameters
+    ----------
+    prom
+        PrometheusConnect object with connection details.
+    request_count_buffer
+        Ring buffer of the target deployment.
+    end_time
+        Newest step to be part of the TimeSeries.
+    configurations
+        configurations passed for the custom HPA programme
+    window_length
+        Number of steps of the TimeSeries, the input chunk length of the forecasting model.
+
+    Returns
+    -------
+    TimeSeries
+        A TimeSeries of requests per minute, one step per tick.
+    int
+        Requests per minute received in the previous tick from prometheus server
+    """
+
+    with stage_timer(constants.LOCAL_METRICS_STAGE_PROMETHEUS_FETCH):
+        buffer_updated = _update_request_count_buffer(prom, request_count_buffer, end_time, configurations)
+
+    if buffer_updated:
+        logger.log_action(
+            "info",
+            "Response received from Prometheus metric server successfully for " +
+            configurations[constants.DEPLOYMENT_NAME]
         )
 
+        with stage_timer(constants.LOCAL_METRICS_STAGE_SERIES_CONSTRUCTION):
+            timestamps, values = request_count_buffer.window(window_length, end_time.timestamp())
+            series = _build_time_series(timestamps, values, request_count_buffer.step_seconds)
+        last_minute_request_count = int(series.values()[-1][0])
+
         return series, last_minute_request_count
 
     else:
-        logger.log_action("error", "Error occurred while retrieving response from metric server")
+        logger.log_action(
+            "error",
+            "Error occurred while retrieving response from metric server for " +
+            configurations[constants.DEPLOYMENT_NAME]
+        )
         return None
+
+
+def getTimeSeries(
+        configurations: dict,
+        window_length: int = constants.TIME_SERIES_WINDOW_SIZE
+) -> Optional[Tuple[TimeSeries, int]]:
+    """
+    Retrieve timeseries data of request count from the prometheus metrics server for the last window_length ticks.
+    Previously retrieved steps are kept in a ring buffer, so only the newest step is queried on a regular iteration.
+
+    Parameters
+    ----------
+    configurations
+        configurations passed for the custom HPA programme
+    window_length
+        Number of steps of the TimeSeries, the input chunk length of the forecasting model.
+
+    Returns
+    -------
+    TimeSeries
+        A TimeSeries of requests per minute, one step per tick.
+    int
+        Requests per minute received in the previous tick from prometheus server
+    """
+
+    prom = get_prometheus_connection(configurations)
+
+    tick_interval = get_tick_interval(configurations)
+    end_time = datetime.fromtimestamp(time.time() // tick_interval * tick_interval)
+
+    return fetch_time_series(
+        prom, _get_request_count_buffer(configurations, window_length), end_time, configurations, window_length
+    )
@@ -0,0 +1,126 @@
+from typing import Optional, Tuple
+import numpy as np
+
+
+class RequestCountBuffer:
+    """
+    Fixed size ring buffer holding the most recent per-step request counts of a target deployment, so that only the
+    newest steps have to be retrieved from the prometheus metric server on every iteration.
+
+    Parameters
+    ----------
+    capacity
+        Maximum number of steps kept in the buffer.
+    step_seconds
+        Length of a single step in seconds.
+    """
+
+    def __init__(self, capacity: int, step_seconds: int = 60):
+        self.capacity = capacity
+        self.step_seconds = step_seconds
+        self._timestamps = np.zeros(capacity, dtype=np.float64)
+        self._values = np.zeros(capacity, dtype=np.float64)
+        self._head = 0
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    @property
+    def latest_timestamp(self) -> Optional[float]:
+        """
+        UNIX timestamp of the newest step in the buffer, None if the buffer is empty.
+        """
+
+        if self._size == 0:
+            return None
+        return float(self._timestamps[(self._head - 1) % self.capacity])
+
+    def missing_steps(self, end_timestamp: float) -> Optional[int]:
+        """
+        Number of steps between the newest buffered step and the given end of the window.
+
+        Parameters
+        ----------
+        end_timestamp
+            UNIX timestamp of the newest step to be available after the update.
+
+        Returns
+        -------
+        int
+            Number of steps to be retrieved, None if the buffer is empty or not consistent with the given time.
+        """
+
+        latest_timestamp = self.latest_timestamp
+        if latest_timestamp is None or latest_timestamp > end_timestamp:
+            return None
+        return int(round((end_timestamp - latest_timestamp) / self.step_seconds))
+
+    def reset(self):
+        """
+        Drop every buffered step.
+        """
+
+        self._head = 0
+        self._size = 0
+
+    def append(self, timestamp: float, value: float):
+        """
+        Append a step to the buffer, overwriting the oldest one when the buffer is full. Steps which are not newer
+        than the latest buffered step are ignored.
+
+        Parameters
+        ----------
+        timestamp
+            UNIX timestamp of the step.
+        value
+            Request count of the step.
+        """
+
+        latest_timestamp = self.latest_timestamp
+        if latest_timestamp is not None and timestamp <= latest_timestamp:
+            return
+
+        self._timestamps[self._head] = timestamp
+        self._values[self._head] = value
+        self._head = (self._head + 1) % self.capacity
+        self._size = min(self._size + 1, self.capacity)
+
+    def extend(self, values: list):
+        """
+        Append the [timestamp, value] pairs of a prometheus range query response in chronological order.
+
+        Parameters
+        ----------
+        values
+            List of [timestamp, value] pairs.
+        """
+
+        for timestamp, value in values:
+            self.append(float(timestamp), float(value))
+
+    def window(self, steps: int, end_timestamp: float) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Retrieve the buffered steps which fall into the window of the given number of steps ending at the given time.
+
+        Parameters
+        ----------
+        steps
+            Length of the window in steps.
+        end_timestamp
+            UNIX timestamp of the newest step of the window.
+
+        Returns
+        -------
+        np.ndarray
+            UNIX timestamps of the steps in chronological order.
+        np.ndarray
+            Request counts of the steps in chronological order.
+        """
+
+        order = (np.arange(self._size) + self._head - self._size) % self.capacity
+        timestamps = self._timestamps[order]
+        values = self._values[order]
+
+        in_window = timestamps > end_timestamp - steps * self.step_seconds
+        return timestamps[in_window], values[in_window]
@@ -0,0 +1,127 @@
+import time
+from Modules.Constants import constants
+from Modules.Logs import logger
+from Modules.MetricsManagers import local_metrics
+from Modules.Scheduler.tick_scheduler import get_tick_interval
+
+
+class TickBudget:
+    """
+    Deadlines of the stages of a single tick. Every stage gets a time budget and the deadlines are cumulative from
+    the moment the tick was triggered, so a slow stage eats into the following ones and the end of the last stage
+    bounds the time from the trigger to the scaling calls.
+
+    Parameters
+    ----------
+    trigger_time
+        UNIX timestamp the tick was triggered at.
+    budgets
+        Time budget in seconds of every stage, in the order the stages run.
+    """
+
+    def __init__(self, trigger_time: float, budgets: dict):
+        self.trigger_time = trigger_time
+        self.deadlines = {}
+
+        deadline = trigger_time
+        for stage, budget in budgets.items():
+            deadline += budget
+            self.deadlines[stage] = deadline
+
+    def remaining(self, stage: str) -> float:
+        """
+        Number of seconds left until the deadline of a stage.
+
+        Parameters
+        ----------
+        stage
+            Name of the stage.
+
+        Returns
+        -------
+        float
+            Seconds left, 0 if the deadline has passed.
+        """
+
+        return max(0.0, self.deadlines[stage] - time.time())
+
+    def elapsed(self) -> float:
+        """
+        Number of seconds since the tick was triggered.
+        """
+
+        return time.time() - self.trigger_time
+
+    def check(self, stage: str) -> bool:
+        """
+        Check whether a stage finished within its deadline, counting and reporting an overrun otherwise.
+
+        Parameters
+        ----------
+        stage
+            Name of the stage.
+
+        Returns
+        -------
+        bool
+            True if the stage finished within its deadline.
+        """
+
+        overrun = time.time() - self.deadlines[stage]
+        if overrun <= 0:
+            return True
+
+        self.report_overrun(stage, "finished " + str(round(overrun, 2)) + " seconds after its deadline")
+        return False
+
+    def report_overrun(self, stage: str, detail: str):
+        """
+        Count and report a stage which overran its budget.
+
+        Parameters
+        ----------
+        stage
+            Name of the stage.
+        detail
+            Description of the overrun.
+        """
+
+        local_metrics.stage_budget_overruns.inc(1, stage)
+        logger.log_action("warning", "Stage '" + stage + "' overran its budget: " + detail, cloud_log_bool=False)
+
+
+def get_stage_budgets(configurations: dict) -> dict:
+    """
+    Read the time budgets of the stages of a tick from the configuration. Stages without a configured budget get
+    their default share of the tick interval, and budgets adding up to more than the tick interval are scaled down
+    proportionally, so a tick always completes before the next one is due.
+
+    Parameters
+    ----------
+    configurations
+        Configuration passed for the custom HPA programme
+
+    Returns
+    -------
+    dict
+        Time budget in seconds of every stage, in the order the stages run.
+    """
+
+    tick_interval = get_tick_interval(configurations)
+
+    budgets = {
+        constants.TICK_STAGE_INGESTION: configurations.get(
+            constants.INGESTION_BUDGET, constants.DEFAULT_INGESTION_BUDGET_FRACTION * tick_interval
+        ),
+        constants.TICK_STAGE_FORECASTING: configurations.get(
+            constants.FORECASTING_BUDGET, constants.DEFAULT_FORECASTING_BUDGET_FRACTION * tick_interval
+        ),
+        constants.TICK_STAGE_SCALING: configurations.get(
+            constants.SCALING_BUDGET, constants.DEFAULT_SCALING_BUDGET_FRACTION * tick_interval
+        )
+    }
+
+    total = sum(budgets.values())
+    if total > tick_interval:
+        budgets = {stage: budget * tick_interval / total for stage, budget in budgets.items()}
+    return budgets
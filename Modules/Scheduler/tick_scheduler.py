@@ -0,0 +1,171 @@
+import math
+import threading
+import time
+from typing import Callable
+from Modules.Constants import constants
+from Modules.Logs import logger
+from Modules.MetricsManagers import local_metrics
+
+
+class TickScheduler:
+    """
+    Timer based scheduler which sleeps until the next interval boundary (e.g. every ":00" for a one minute interval)
+    and fires the given job. The job runs in the scheduler thread itself, so two ticks can never overlap. When an
+    iteration overruns the interval, the skipped boundaries are reported as missed ticks. An iteration raising an
+    error is logged and counted as a failed tick, the next tick fires as usual.
+
+    Parameters
+    ----------
+    job
+        Method to be executed on every tick.
+    interval_seconds
+        Length of a tick in seconds. Boundaries are aligned to the wall clock.
+    """
+
+    def __init__(self, job: Callable[[], None], interval_seconds: int = constants.DEFAULT_TICK_INTERVAL):
+        self.job = job
+        self.interval_seconds = interval_seconds
+        self.ticks = 0
+        self.missed_ticks = 0
+        self.failed_ticks = 0
+        self.last_jitter = 0.0
+        self.max_jitter = 0.0
+        self.scheduled_time = None
+        self._stop_event = threading.Event()
+
+    def _next_boundary(self, now: float) -> float:
+        """
+        Compute the wall clock time of the next interval boundary strictly after the given time.
+
+        Parameters
+        ----------
+        now
+            Current wall clock time as a UNIX timestamp.
+
+        Returns
+        -------
+        float
+            UNIX timestamp of the next boundary.
+        """
+
+        return (math.floor(now / self.interval_seconds) + 1) * self.interval_seconds
+
+    def _sleep_until(self, boundary: float) -> bool:
+        """
+        Block until the given boundary is reached or the scheduler is stopped.
+
+        Parameters
+        ----------
+        boundary
+            UNIX timestamp to wake up at.
+
+        Returns
+        -------
+        bool
+            True if the boundary was reached, False if the scheduler was stopped while waiting.
+        """
+
+        remaining = boundary - time.time()
+        while remaining > 0:
+            if self._stop_event.wait(remaining):
+                return False
+            remaining = boundary - time.time()
+        return not self._stop_event.is_set()
+
+    def _run_tick(self, scheduled_time: float):
+        """
+        Execute the job for a single tick and account for jitter and overruns.
+
+        Parameters
+        ----------
+        scheduled_time
+            Boundary at which the tick was supposed to fire.
+        """
+
+        self.scheduled_time = scheduled_time
+        self.last_jitter = time.time() - scheduled_time
+        self.max_jitter = max(self.max_jitter, self.last_jitter)
+        self.ticks += 1
+        local_metrics.ticks.inc()
+        local_metrics.tick_jitter.set(self.last_jitter)
+
+        logger.log_action(
+            "info",
+            "Tick fired with a jitter of " + str(round(self.last_jitter * 1000, 1)) + " ms",
+            cloud_log_bool=False
+        )
+
+        start = time.perf_counter()
+        try:
+            self.job()
+        except Exception as exception:
+            self.failed_ticks += 1
+            local_metrics.failed_ticks.inc()
+            logger.log_action("error", "Iteration failed, continuing with the next tick: " + str(exception))
+        local_metrics.tick_duration.observe(time.perf_counter() - start)
+
+        missed = int((time.time() - scheduled_time) // self.interval_seconds)
+        if missed > 0:
+            self.missed_ticks += missed
+            local_metrics.missed_ticks.inc(missed)
+            logger.log_action(
+                "warning",
+                "Iteration overran the tick interval! " + str(missed) + " tick(s) missed (" +
+                str(self.missed_ticks) + " in total)"
+            )
+
+    def run_forever(self):
+        """
+        Run the scheduling loop until stop() is called.
+        """
+
+        while not self._stop_event.is_set():
+            boundary = self._next_boundary(time.time())
+            if not self._sleep_until(boundary):
+                break
+            self._run_tick(boundary)
+
+    def stop(self):
+        """
+        Stop the scheduling loop. A tick which is already running is allowed to complete.
+        """
+
+        self._stop_event.set()
+
+
+def get_tick_interval(configurations: dict) -> int:
+    """
+    Read the length of a tick from the configuration. The PromQL window, the query step, the series frequency and the
+    look-ahead of the scaling decisions all follow it.
+
+    Parameters
+    ----------
+    configurations
+        Configuration passed for the custom HPA programme
+
+    Returns
+    -------
+    int
+        Length of a tick in seconds.
+    """
+
+    return int(configurations.get(constants.TICK_INTERVAL, constants.DEFAULT_TICK_INTERVAL))
+
+
+def is_valid_tick_interval(interval_seconds: int) -> bool:
+    """
+    Check whether ticks of the given length line up with every hour, so the steps of a window always fall on the same
+    offsets within the hour the minute covariates are derived from.
+
+    Parameters
+    ----------
+    interval_seconds
+        Length of a tick in seconds.
+
+    Returns
+    -------
+    bool
+        True if the interval is positive and divides an hour.
+    """
+
+    return 0 < interval_seconds <= constants.SECONDS_PER_HOUR and constants.SECONDS_PER_HOUR % interval_seconds == 0
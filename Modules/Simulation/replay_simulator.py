@@ -0,0 +1,543 @@
+import logging
+import math
+import multiprocessing
+import os
+import time
+from datetime import datetime
+from typing import Optional, Tuple
+import numpy as np
+import pandas as pd
+import main
+from Modules.Constants import constants
+from Modules.AdaptionManager.fake_kubernetes_api import FakeAppsV1Api
+from Modules.AdaptionManager.resource_adaptor import scaling_decisions, use_apps_api
+from Modules.Forecasters.inference_engine import create_inference_engine
+from Modules.Forecasters.workload_forecaster import forecast_future_workloads, load_forecasting_model, \
+    load_scaler_parameters
+from Modules.MetricsManagers.fake_prometheus_connection import FakePrometheusConnect
+from Modules.MetricsManagers.prometheus_monitor import fetch_time_series
+from Modules.MetricsManagers.request_count_buffer import RequestCountBuffer
+from Modules.Scheduler.tick_scheduler import get_tick_interval
+
+_sweep_worker = {}
+
+
+def _simulation_configurations(configurations: dict) -> dict:
+    """
+    Configuration of the simulated target: the given one, acting on the deployment of the fake Kubernetes API once
+    per minute of the trace.
+
+    Parameters
+    ----------
+    configurations
+        Configuration passed for the custom HPA programme
+
+    Returns
+    -------
+    dict
+        Configuration of the simulated target.
+    """
+
+    return dict(
+        configurations,
+        **{
+            constants.NAMESPACE: constants.SIMULATION_NAMESPACE,
+            constants.DEPLOYMENT_NAME: constants.SIMULATION_DEPLOYMENT_NAME,
+            constants.TICK_INTERVAL: constants.SIMULATION_TICK_INTERVAL
+        }
+    )
+
+
+def load_trace(path: str) -> pd.Series:
+    """
+    Load a recorded per-minute request trace from a CSV or Parquet file with a 'count' column and an optional 'time'
+    column. Traces without times are placed on consecutive minutes from 2022-01-01 00:00.
+
+    Parameters
+    ----------
+    path
+        Path to the trace, read as Parquet if it ends with '.parquet'.
+
+    Returns
+    -------
+    pd.Series
+        Requests per minute indexed by the start time of the minute.
+    """
+
+    if path.endswith(".parquet"):
+        frame = pd.read_parquet(path)
+    else:
+        frame = pd.read_csv(path)
+
+    values = frame[constants.TIME_SERIES_VALUE_COLUMN].to_numpy(dtype=float)
+
+    if constants.TIME_SERIES_TIME_COLUMN in frame:
+        times = pd.DatetimeIndex(pd.to_datetime(frame[constants.TIME_SERIES_TIME_COLUMN]))
+        if times.tz is not None:
+            times = times.tz_convert(None)
+    else:
+        times = pd.date_range(start=pd.Timestamp(2022, 1, 1), periods=len(values), freq="min")
+
+    return pd.Series(values, index=times, name=constants.TIME_SERIES_VALUE_COLUMN)
+
+
+def _trace_timestamps(times: pd.DatetimeIndex, step_seconds: int) -> np.ndarray:
+    """
+    UNIX timestamps prometheus reports the steps of a trace at. Every step is reported at the end of its interval and
+    the times of the trace are local times, the way the series construction labels them.
+
+    Parameters
+    ----------
+    times
+        Local start times of the steps.
+    step_seconds
+        Length of a single step in seconds.
+
+    Returns
+    -------
+    np.ndarray
+        UNIX timestamps of the steps.
+    """
+
+    return np.array([time.mktime(step_time.timetuple()) + step_seconds for step_time in times.to_pydatetime()])
+
+
+def ingest_trace(
+        trace: pd.Series,
+        configurations: dict,
+        window_length: int = constants.TIME_SERIES_WINDOW_SIZE
+) -> Tuple[list, np.ndarray, pd.DatetimeIndex]:
+    """
+    Replay the ingestion of a trace: every tick brings the request count buffer of the target up to date from an
+    in-memory stand-in of the prometheus metric server and builds the window of the last minutes.
+
+    Parameters
+    ----------
+    trace
+        Requests per minute indexed by the start time of the minute.
+    configurations
+        Configuration of the simulated target.
+    window_length
+        Number of minutes in the input window of the forecasting model.
+
+    Returns
+    -------
+    list
+        TimeSeries of the last minutes at every tick.
+    np.ndarray
+        Actual requests of the minute following every tick.
+    pd.DatetimeIndex
+        Start time of the minute following every tick.
+    """
+
+    step_seconds = get_tick_interval(configurations)
+    timestamps = _trace_timestamps(trace.index, step_seconds)
+    prom = FakePrometheusConnect(
+        timestamps,
+        trace.to_numpy(),
+        configurations.get(constants.PROMETHEUS_BACKEND, constants.DEFAULT_PROMETHEUS_BACKEND)
+    )
+    request_count_buffer = RequestCountBuffer(
+        max(
+            configurations.get(constants.REQUEST_COUNT_BUFFER_SIZE, constants.DEFAULT_REQUEST_COUNT_BUFFER_SIZE),
+            window_length
+        ),
+        step_seconds
+    )
+
+    series_list = []
+    ticks = []
+    for step in range(window_length, len(trace)):
+        fetch_result = fetch_time_series(
+            prom, request_count_buffer, datetime.fromtimestamp(timestamps[step - 1]), configurations, window_length
+        )
+        if fetch_result is not None:
+            series_list.append(fetch_result[0])
+            ticks.append(step)
+
+    return series_list, trace.to_numpy()[ticks], trace.index[ticks]
+
+
+class SimulatedDeployment:
+    """
+    Deployment of the fake Kubernetes API whose new pods only become ready after a startup delay. Scaling down removes
+    the pods which are not ready yet first, as the ReplicaSet controller does.
+
+    Parameters
+    ----------
+    api
+        Fake Kubernetes API hosting the deployment.
+    configurations
+        Configuration of the simulated target.
+    replicas
+        Initial replica count, ready from the start.
+    startup_delay_steps
+        Number of steps, possibly fractional, a new pod takes to become ready.
+    """
+
+    def __init__(self, api: FakeAppsV1Api, configurations: dict, replicas: int, startup_delay_steps: float):
+        self.api = api
+        self.namespace = configurations[constants.NAMESPACE]
+        self.name = configurations[constants.DEPLOYMENT_NAME]
+        self.startup_delay_steps = startup_delay_steps
+        self._pods_ready_at = [-math.inf] * replicas
+        self._ready_replicas = replicas
+
+        api.create_deployment(self.namespace, self.name, replicas)
+
+    def advance(self, step: int) -> Tuple[int, float]:
+        """
+        Apply the replica count requested at the start of a step and let the pods started so far become ready.
+
+        Parameters
+        ----------
+        step
+            Index of the step.
+
+        Returns
+        -------
+        int
+            Replica count of the step.
+        float
+            Number of pods serving requests over the step, pods becoming ready within the step count in part.
+        """
+
+        replicas = self.api.read_namespaced_deployment_scale(name=self.name, namespace=self.namespace).spec.replicas
+
+        if replicas > len(self._pods_ready_at):
+            self._pods_ready_at.extend([step + self.startup_delay_steps] * (replicas - len(self._pods_ready_at)))
+        elif replicas < len(self._pods_ready_at):
+            self._pods_ready_at = sorted(self._pods_ready_at)[:replicas]
+
+        ready_replicas = sum(1 for ready_at in self._pods_ready_at if ready_at <= step + 1)
+        if ready_replicas != self._ready_replicas:
+            self.api.set_ready_replicas(self.namespace, self.name, ready_replicas)
+            self._ready_replicas = ready_replicas
+
+        serving_pods = sum(min(1.0, max(0.0, step + 1 - ready_at)) for ready_at in self._pods_ready_at)
+        return replicas, serving_pods
+
+
+def simulate_scaling(
+        forecasts: list,
+        demand: np.ndarray,
+        times: pd.DatetimeIndex,
+        configurations: dict
+) -> Tuple[dict, pd.DataFrame]:
+    """
+    Replay the scaling decisions of a trace against a fake Kubernetes API and measure how well the actual workload was
+    served. Requests beyond the capacity of the ready pods ('simulation_pod_capacity' per pod) are counted as unserved.
+    The capacity is fixed and the threshold value only drives the scaling decisions, so the points of a threshold
+    sweep are measured against the same capacity.
+
+    Parameters
+    ----------
+    forecasts
+        Forecasted workload at every tick, as returned by forecast_future_workloads.
+    demand
+        Actual requests of the minute following every tick.
+    times
+        Start time of the minute following every tick.
+    configurations
+        Configuration of the simulated target.
+
+    Returns
+    -------
+    dict
+        Summary of the simulation.
+    pd.DataFrame
+        Demand, forecast, replicas and capacity of every simulated minute.
+    """
+
+    step_seconds = get_tick_interval(configurations)
+    threshold = configurations[constants.INCOMING_REQUEST_THRESHOLD_VALUE]
+    startup_delay = configurations.get(constants.SIMULATION_STARTUP_DELAY, constants.DEFAULT_SIMULATION_STARTUP_DELAY)
+    sla_tolerance = configurations.get(constants.SIMULATION_SLA_TOLERANCE, constants.DEFAULT_SIMULATION_SLA_TOLERANCE)
+    pod_capacity = configurations.get(constants.SIMULATION_POD_CAPACITY, constants.DEFAULT_SIMULATION_POD_CAPACITY)
+
+    api = FakeAppsV1Api()
+    deployment = SimulatedDeployment(
+        api,
+        configurations,
+        max(configurations[constants.MIN_POD_REPLICAS], int(math.ceil(demand[0] / threshold))),
+        startup_delay / step_seconds
+    )
+
+    replicas = np.zeros(len(demand), dtype=int)
+    serving_pods = np.zeros(len(demand))
+
+    previous_api = use_apps_api(api)
+    try:
+        for step, forecast in enumerate(forecasts):
+            scaling_decisions(forecast, configurations)
+            replicas[step], serving_pods[step] = deployment.advance(step)
+    finally:
+        use_apps_api(previous_api)
+
+    timeline = pd.DataFrame({
+        constants.TIME_SERIES_TIME_COLUMN: times,
+        "demand": demand,
+        "forecast": [forecast[0] for forecast in forecasts],
+        "replicas": replicas,
+        "serving_pods": serving_pods,
+        "capacity": serving_pods * pod_capacity
+    })
+    timeline["unserved"] = np.maximum(0.0, timeline["demand"] - timeline["capacity"])
+
+    forecast_error = timeline["forecast"] - timeline["demand"]
+    observed = timeline["demand"] > 0
+    replica_changes = np.diff(replicas)
+
+    summary = {
+        "minutes": len(timeline),
+        "under_provisioned_minutes": int((timeline["unserved"] > 0).sum()),
+        "sla_violations": int((timeline["unserved"] > sla_tolerance * timeline["demand"]).sum()),
+        "unserved_requests": float(timeline["unserved"].sum()),
+        "pod_minutes": float(replicas.sum() * step_seconds / 60),
+        "mean_replicas": float(replicas.mean()),
+        "scale_ups": int((replica_changes > 0).sum()),
+        "scale_downs": int((replica_changes < 0).sum()),
+        "forecast_mae": float(forecast_error.abs().mean()),
+        "forecast_rmse": float(np.sqrt((forecast_error ** 2).mean())),
+        "forecast_mape": float((forecast_error[observed].abs() / timeline["demand"][observed]).mean())
+    }
+
+    return summary, timeline
+
+
+def load_inference_engine(configurations: dict) -> Tuple[object, Optional[dict]]:
+    """
+    Load the forecasting model with the configured inference backend, as the autoscaler does on startup.
+
+    Parameters
+    ----------
+    configurations
+        Configuration passed for the custom HPA programme
+
+    Returns
+    -------
+    object
+        Warmed up inference engine.
+    dict
+        Persisted scaling parameters of the forecasting model, None if not available.
+    """
+
+    if configurations.get(constants.INFERENCE_BACKEND) == constants.INFERENCE_BACKEND_ONNX:
+        # imported here, so onnxruntime is only required by the onnx backend
+        from Modules.Forecasters.onnx_inference_engine import OnnxInferenceEngine
+        from Modules.Forecasters.model_quantization import load_quantized_model_path
+
+        model_path = constants.PATH_TO_ONNX_MODEL
+        if configurations.get(constants.MODEL_QUANTIZATION) == constants.MODEL_QUANTIZATION_INT8:
+            model_path = load_quantized_model_path()
+
+        inference_engine = OnnxInferenceEngine(model_path)
+        inference_engine.warm_up()
+    else:
+        inference_engine = create_inference_engine(load_forecasting_model(), configurations)
+
+    return inference_engine, load_scaler_parameters()
+
+
+def _forecast_settings(configurations: dict) -> tuple:
+    """
+    Configuration values the forecasts of a trace depend on, besides the trace and the model: the forecast horizon,
+    the pod startup lead time extending it and the prediction error mitigation value.
+
+    Parameters
+    ----------
+    configurations
+        Configuration of the simulated target.
+
+    Returns
+    -------
+    tuple
+        Forecast horizon, pod startup lead time and prediction error mitigation value.
+    """
+
+    return (
+        configurations.get(constants.FORECAST_HORIZON, constants.DEFAULT_FORECAST_HORIZON),
+        configurations.get(constants.POD_STARTUP_LEAD_TIME, constants.DEFAULT_POD_STARTUP_LEAD_TIME),
+        configurations[constants.PREDICTION_ERROR_MITIGATION_VALUE]
+    )
+
+
+def forecast_trace(
+        series_list: list,
+        inference_engine,
+        configurations: dict,
+        scaler_parameters: Optional[dict] = None
+) -> list:
+    """
+    Forecast the workload at every tick of an ingested trace in one batched inference.
+
+    Parameters
+    ----------
+    series_list
+        TimeSeries of the last minutes at every tick, as returned by ingest_trace.
+    inference_engine
+        Inference engine of the deep learning based forecasting model.
+    configurations
+        Configuration of the simulated target.
+    scaler_parameters
+        Persisted scaling parameters of the forecasting model, None to scale every window on its own.
+
+    Returns
+    -------
+    list
+        Forecasted workload at every tick.
+    """
+
+    return forecast_future_workloads(
+        series_list, inference_engine, [configurations] * len(series_list), scaler_parameters
+    )
+
+
+def replay(
+        trace: pd.Series,
+        inference_engine,
+        configurations: dict,
+        scaler_parameters: Optional[dict] = None,
+        series: Optional[tuple] = None,
+        forecasts: Optional[list] = None
+) -> Tuple[dict, pd.DataFrame]:
+    """
+    Replay a recorded trace through the ingestion, the forecaster and the scaling decisions of the autoscaler. The
+    forecasts only depend on the trace, so every tick is forecasted in one batched inference before the scaling
+    decisions are replayed minute by minute.
+
+    Parameters
+    ----------
+    trace
+        Requests per minute indexed by the start time of the minute.
+    inference_engine
+        Inference engine of the deep learning based forecasting model.
+    configurations
+        Configuration of the simulated target.
+    scaler_parameters
+        Persisted scaling parameters of the forecasting model, None to scale every window on its own.
+    series
+        Result of ingest_trace for the trace, to skip the ingestion when replaying the same trace again.
+    forecasts
+        Result of forecast_trace for the trace, to skip the inference when only the scaling decisions change.
+
+    Returns
+    -------
+    dict
+        Summary of the simulation, including its wall time.
+    pd.DataFrame
+        Demand, forecast, replicas and capacity of every simulated minute.
+    """
+
+    start = time.perf_counter()
+
+    configurations = _simulation_configurations(configurations)
+
+    series_list, demand, times = series if series is not None else \
+        ingest_trace(trace, configurations, inference_engine.input_chunk_length)
+
+    if forecasts is None:
+        forecasts = forecast_trace(series_list, inference_engine, configurations, scaler_parameters)
+
+    summary, timeline = simulate_scaling(forecasts, demand, times, configurations)
+    summary["wall_seconds"] = time.perf_counter() - start
+
+    return summary, timeline
+
+
+def _initialise_sweep_worker(trace_path: str, configurations: dict):
+    """
+    Load the trace, the inference engine and the ingested windows once per sweep worker process.
+
+    Parameters
+    ----------
+    trace_path
+        Path to the trace.
+    configurations
+        Base configuration of the simulated target.
+    """
+
+    import torch
+
+    # one inference thread per worker, the sweep is parallelised across processes
+    torch.set_num_threads(1)
+    logging.getLogger().setLevel(logging.WARNING)
+    main.configs = None
+
+    trace = load_trace(trace_path)
+    inference_engine, scaler_parameters = load_inference_engine(configurations)
+
+    _sweep_worker["trace"] = trace
+    _sweep_worker["inference_engine"] = inference_engine
+    _sweep_worker["scaler_parameters"] = scaler_parameters
+    _sweep_worker["configurations"] = configurations
+    _sweep_worker["series"] = ingest_trace(
+        trace, _simulation_configurations(configurations), inference_engine.input_chunk_length
+    )
+    _sweep_worker["forecasts"] = {}
+
+
+def _replay_sweep_point(parameters: dict) -> dict:
+    """
+    Replay the trace of the sweep worker with a set of overridden configuration values. The forecasts are computed
+    once per worker and forecast settings, so points only differing in their scaling parameters skip the inference.
+
+    Parameters
+    ----------
+    parameters
+        Configuration values of the sweep point.
+
+    Returns
+    -------
+    dict
+        Configuration values and summary of the simulation.
+    """
+
+    configurations = dict(_sweep_worker["configurations"], **parameters)
+    settings = _forecast_settings(configurations)
+    if settings not in _sweep_worker["forecasts"]:
+        _sweep_worker["forecasts"][settings] = forecast_trace(
+            _sweep_worker["series"][0],
+            _sweep_worker["inference_engine"],
+            _simulation_configurations(configurations),
+            _sweep_worker["scaler_parameters"]
+        )
+
+    summary, _ = replay(
+        _sweep_worker["trace"],
+        _sweep_worker["inference_engine"],
+        configurations,
+        _sweep_worker["scaler_parameters"],
+        _sweep_worker["series"],
+        _sweep_worker["forecasts"][settings]
+    )
+    return dict(parameters, **summary)
+
+
+def sweep(trace_path: str, configurations: dict, parameter_sets: list, processes: Optional[int] = None) -> list:
+    """
+    Replay a trace with every set of configuration values in parallel, one worker process per core. Every worker
+    ingests the trace once with the base configuration and replays the forecasts and scaling decisions per point.
+
+    Parameters
+    ----------
+    trace_path
+        Path to the trace.
+    configurations
+        Base configuration of the simulated target.
+    parameter_sets
+        Configuration values to be overridden, one dict per sweep point.
+    processes
+        Number of worker processes, the number of cores if not given.
+
+    Returns
+    -------
+    list
+        Configuration values and summary of the simulation of every sweep point, in the given order.
+    """
+
+    processes = min(processes or os.cpu_count() or 1, len(parameter_sets))
+
+    context = multiprocessing.get_context("spawn")
+    with context.Pool(processes, initializer=_initialise_sweep_worker, initargs=(trace_path, configurations)) as pool:
+        return pool.map(_replay_sweep_point, parameter_sets)
@@ -0,0 +1,420 @@
+"""
+Microbenchmark of the stages of a tick and of the full main_method against local stand-ins: an in-process fake
+Prometheus HTTP endpoint, the fake Kubernetes API and a no-op cloud monitoring client. Records wall time, CPU time,
+peak RSS and allocations per stage and writes them as JSON, to be compared across commits with --baseline.
+
+Usage (from the repository root):
+    python -m Tools.benchmark_pipeline [--targets 8] [--iterations 50] [--warmup 3] [--prometheus-latency 0]
+        [--set inference_backend=onnx] [--output benchmark.json] [--baseline previous.json] [--verbose]
+"""
+import argparse
+import gc
+import json
+import logging
+import os
+import platform
+import subprocess
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+from typing import Callable, Optional
+import numpy as np
+import yaml
+import main
+from Modules.Constants import constants
+from Modules.Configuration.configuration import get_target_configurations
+from Modules.AdaptionManager.fake_kubernetes_api import FakeAppsV1Api
+from Modules.AdaptionManager.resource_adaptor import scaling_decisions, use_apps_api
+from Modules.Forecasters.fallback_forecasters import create_fallback_forecasters
+from Modules.Forecasters.tiered_forecaster import TieredForecaster
+from Modules.Forecasters.workload_forecaster import forecast_future_workloads
+from Modules.MetricsManagers import prometheus_monitor
+from Modules.MetricsManagers.cloud_metric_publisher import CloudMetricPublisher
+from Modules.MetricsManagers.fake_prometheus_server import FakePrometheusServer
+from Modules.MetricsManagers.prometheus_connection import get_prometheus_connection
+from Modules.MetricsManagers.request_count_buffer import RequestCountBuffer
+from Modules.Scheduler.tick_scheduler import get_tick_interval
+from Modules.Simulation.replay_simulator import load_inference_engine
+
+
+class _NoOpMetricServiceClient:
+    """
+    Metric service client resolving every metric descriptor and discarding the published series.
+    """
+
+    def __init__(self):
+        self.published = 0
+
+    def get_metric_descriptor(self, name: str) -> SimpleNamespace:
+        return SimpleNamespace(
+            name=name, type=name.split("/metricDescriptors/")[-1], labels=[SimpleNamespace(key="namespace")]
+        )
+
+    def create_time_series(self, name: str, time_series: list):
+        self.published += len(time_series)
+
+
+def _memory_status_kb(field: str) -> int:
+    """
+    Read a memory figure of the process from /proc/self/status in kilobytes, 0 where it is not available.
+
+    Parameters
+    ----------
+    field
+        Name of the field, e.g. VmRSS or VmHWM.
+    """
+
+    try:
+        with open("/proc/self/status") as file:
+            for line in file:
+                if line.startswith(field + ":"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return 0
+
+
+def _reset_peak_rss():
+    """
+    Reset the peak RSS (VmHWM) of the process to its current RSS, so the peak of a single stage can be read.
+    """
+
+    try:
+        with open("/proc/self/clear_refs", "w") as file:
+            file.write("5")
+    except OSError:
+        pass
+
+
+def _percentiles(samples: list) -> dict:
+    """
+    Summarise latency samples in milliseconds.
+    """
+
+    samples_ms = np.array(samples) * 1000
+    return {
+        "mean": float(samples_ms.mean()),
+        "p50": float(np.percentile(samples_ms, 50)),
+        "p95": float(np.percentile(samples_ms, 95)),
+        "max": float(samples_ms.max())
+    }
+
+
+def _measure(run: Callable, iterations: int, warmup: int, prepare: Optional[Callable] = None) -> dict:
+    """
+    Measure a stage. Timings and the peak RSS are taken without tracing, the allocations in a separate traced run,
+    as tracemalloc slows every allocation down.
+
+    Parameters
+    ----------
+    run
+        Callable running the stage once.
+    iterations
+        Number of measured runs.
+    warmup
+        Number of runs before measuring.
+    prepare
+        Callable run before every run of the stage, outside of the measurement.
+
+    Returns
+    -------
+    dict
+        Wall and CPU time percentiles, peak RSS increase and allocations of the stage.
+    """
+
+    prepare = prepare or (lambda: None)
+
+    for _ in range(warmup):
+        prepare()
+        run()
+
+    gc.collect()
+    rss_before = _memory_status_kb("VmRSS")
+    _reset_peak_rss()
+
+    wall_times = []
+    cpu_times = []
+    for _ in range(iterations):
+        prepare()
+        wall_start = time.perf_counter()
+        cpu_start = time.process_time()
+        run()
+        cpu_times.append(time.process_time() - cpu_start)
+        wall_times.append(time.perf_counter() - wall_start)
+
+    peak_rss_increase = max(0, _memory_status_kb("VmHWM") - rss_before)
+
+    prepare()
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    tracemalloc.reset_peak()
+    run()
+    traced_peak = tracemalloc.get_traced_memory()[1]
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    statistics = after.compare_to(before, "filename")
+
+    return {
+        "iterations": iterations,
+        "wall_ms": _percentiles(wall_times),
+        "cpu_ms": _percentiles(cpu_times),
+        "peak_rss_increase_kb": peak_rss_increase,
+        "traced_peak_kb": traced_peak / 1024,
+        "allocated_blocks": sum(max(0, statistic.count_diff) for statistic in statistics),
+        "allocated_kb": sum(max(0, statistic.size_diff) for statistic in statistics) / 1024
+    }
+
+
+def _parse_assignment(text: str) -> tuple:
+    """
+    Split a key=value argument into its key and the value parsed the way the configuration file would be parsed.
+    """
+
+    key, separator, value = text.partition("=")
+    if not separator:
+        raise argparse.ArgumentTypeError("expected key=value, got " + text)
+    return key.strip(), yaml.safe_load(value)
+
+
+def _benchmark_configurations(prometheus_url: str, number_of_targets: int, overrides: dict) -> dict:
+    """
+    Configuration of the benchmark: the configuration file with the given overrides, pointed at the stand-ins, with
+    the given number of targets behind their own HAProxy backends.
+    """
+
+    with open(constants.PATH_TO_SCALER_CONFIG_FILE) as file:
+        configurations = yaml.safe_load(file)
+
+    configurations.update(overrides)
+
+    configurations[constants.PROMETHEUS_SERVER_ADDRESS] = prometheus_url
+    configurations[constants.ENABLE_CLOUD_LOGGING] = False
+    configurations[constants.ENABLE_CLOUD_METRIC_PUBLISHING] = True
+    configurations[constants.TARGETS] = [
+        {
+            constants.DEPLOYMENT_NAME: "benchmark-" + str(index),
+            constants.NAMESPACE: "benchmark",
+            constants.PROMETHEUS_BACKEND: "backend-" + str(index)
+        }
+        for index in range(number_of_targets)
+    ]
+    return configurations
+
+
+def _git_commit() -> Optional[str]:
+    """
+    Commit of the working tree the benchmark runs on, None outside of a git checkout.
+    """
+
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_benchmark(
+        number_of_targets: int,
+        iterations: int,
+        warmup: int,
+        prometheus_latency: float,
+        overrides: Optional[dict] = None
+) -> dict:
+    """
+    Benchmark every stage of a tick and the full main_method.
+
+    Parameters
+    ----------
+    number_of_targets
+        Number of target deployments of every tick.
+    iterations
+        Number of measured runs per stage.
+    warmup
+        Number of runs per stage before measuring.
+    prometheus_latency
+        Number of seconds the fake prometheus metric server delays every response by.
+    overrides
+        Values of the configuration file to be overridden.
+
+    Returns
+    -------
+    dict
+        Environment, settings and measurements of every stage.
+    """
+
+    prometheus_server = FakePrometheusServer(
+        ["backend-" + str(index) for index in range(number_of_targets)], latency=prometheus_latency
+    )
+    configurations = _benchmark_configurations(prometheus_server.start(), number_of_targets, overrides or {})
+
+    kubernetes_api = FakeAppsV1Api()
+    previous_api = use_apps_api(kubernetes_api)
+
+    main.configs = configurations
+    main.targets = get_target_configurations(configurations)
+    main.inference_engine, main.scaler_parameters = load_inference_engine(configurations)
+    # forecasts are not cached or reused, so every run pays for the inference
+    main.forecast_cache = None
+    main.forecast_store = None
+    main.tiered_forecaster = TieredForecaster(create_fallback_forecasters(configurations))
+    main.metric_publisher = CloudMetricPublisher(configurations, _NoOpMetricServiceClient())
+
+    for target in main.targets:
+        kubernetes_api.create_deployment(
+            target[constants.NAMESPACE], target[constants.DEPLOYMENT_NAME], target[constants.MIN_POD_REPLICAS]
+        )
+
+    prom = get_prometheus_connection(configurations)
+    tick_interval = get_tick_interval(configurations)
+    window_length = main.inference_engine.input_chunk_length
+    step = timedelta(seconds=tick_interval)
+    start_time = datetime.fromtimestamp(time.time() // tick_interval * tick_interval) - step
+    buffers = [
+        RequestCountBuffer(
+            max(configurations.get(constants.REQUEST_COUNT_BUFFER_SIZE, constants.DEFAULT_REQUEST_COUNT_BUFFER_SIZE),
+                window_length),
+            tick_interval
+        )
+        for _ in main.targets
+    ]
+    state = {"end_time": start_time, "series": [], "forecasts": [], "iteration": 0}
+
+    def fetch():
+        # every run advances by one step, so each target sends the incremental query of a regular tick
+        state["end_time"] += step
+        state["series"] = [
+            prometheus_monitor.fetch_time_series(
+                prom, request_count_buffer, state["end_time"], target, window_length
+            )[0]
+            for request_count_buffer, target in zip(buffers, main.targets)
+        ]
+
+    def forecast():
+        state["forecasts"] = forecast_future_workloads(
+            state["series"], main.inference_engine, main.targets, main.scaler_parameters
+        )
+
+    def scale():
+        # alternate between the forecast and twice the forecast, so the runs scale up and down
+        state["iteration"] += 1
+        factor = 1 + state["iteration"] % 2
+        for target, forecast in zip(main.targets, state["forecasts"]):
+            scaling_decisions([workload * factor for workload in forecast], target)
+
+    def publish():
+        main.metric_publisher.publish([
+            series
+            for target, forecast in zip(main.targets, state["forecasts"])
+            for series in main.metric_publisher.time_series(
+                target[constants.MIN_POD_REPLICAS], forecast[0], forecast[0], target, time.time()
+            )
+        ])
+
+    def prefill_buffers():
+        # the buffers are filled up to the previous tick, so the tick sends the incremental query of a regular tick
+        end_time = datetime.fromtimestamp(time.time() // tick_interval * tick_interval) - step
+        for target in main.targets:
+            request_count_buffer = prometheus_monitor._get_request_count_buffer(target, window_length)
+            request_count_buffer.reset()
+            prometheus_monitor.fetch_time_series(prom, request_count_buffer, end_time, target, window_length)
+
+    fetch()
+    forecast()
+
+    stages = {}
+    try:
+        stages["getTimeSeries"] = _measure(fetch, iterations, warmup)
+        stages["forecast_future_workloads"] = _measure(forecast, iterations, warmup)
+        stages["scaling_decisions"] = _measure(scale, iterations, warmup)
+        stages["cloudMetricPublishing"] = _measure(publish, iterations, warmup)
+        stages["main_method"] = _measure(main.main_method, iterations, warmup, prefill_buffers)
+    finally:
+        if main.fetch_executor is not None:
+            main.fetch_executor.shutdown(wait=True)
+            main.scaling_executor.shutdown(wait=True)
+            main.publisher_executor.shutdown(wait=True)
+        main.tiered_forecaster.shutdown()
+        use_apps_api(previous_api)
+        prometheus_server.stop()
+
+    return {
+        "commit": _git_commit(),
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "settings": {
+            "targets": number_of_targets,
+            "iterations": iterations,
+            "warmup": warmup,
+            "prometheus_latency": prometheus_latency,
+            "inference_backend": main.inference_engine.name,
+            "overrides": overrides or {}
+        },
+        "stages": stages
+    }
+
+
+def _print_results(results: dict, baseline: Optional[dict]):
+    """
+    Print the measurements of every stage, with the change of the median wall time against a baseline.
+    """
+
+    print("{:<28}{:>12}{:>12}{:>12}{:>16}{:>16}{:>18}{:>12}".format(
+        "stage", "p50 ms", "p95 ms", "cpu ms", "peak RSS KB", "traced KB", "allocated blocks", "vs base"
+    ))
+    for name, stage in results["stages"].items():
+        change = ""
+        if baseline is not None and name in baseline["stages"]:
+            base_p50 = baseline["stages"][name]["wall_ms"]["p50"]
+            change = format((stage["wall_ms"]["p50"] - base_p50) / base_p50 * 100, "+.1f") + "%"
+        print("{:<28}{:>12.3f}{:>12.3f}{:>12.3f}{:>16}{:>16.1f}{:>18}{:>12}".format(
+            name,
+            stage["wall_ms"]["p50"],
+            stage["wall_ms"]["p95"],
+            stage["cpu_ms"]["mean"],
+            stage["peak_rss_increase_kb"],
+            stage["traced_peak_kb"],
+            stage["allocated_blocks"],
+            change
+        ))
+
+
+def run():
+    parser = argparse.ArgumentParser(description="Benchmark the stages of a tick against local stand-ins")
+    parser.add_argument("--targets", type=int, default=8, help="Number of target deployments")
+    parser.add_argument("--iterations", type=int, default=50, help="Number of measured runs per stage")
+    parser.add_argument("--warmup", type=int, default=3, help="Number of runs per stage before measuring")
+    parser.add_argument("--prometheus-latency", type=float, default=0.0,
+                        help="Seconds the fake prometheus metric server delays every response by")
+    parser.add_argument("--set", type=_parse_assignment, action="append", default=[], metavar="KEY=VALUE",
+                        help="Override a value of the configuration file")
+    parser.add_argument("--output", help="JSON file to write the results to")
+    parser.add_argument("--baseline", help="JSON file of a previous run to compare with")
+    parser.add_argument("--verbose", action="store_true", help="Keep the info logs of the stages")
+    arguments = parser.parse_args()
+
+    if not arguments.verbose:
+        logging.getLogger().setLevel(logging.WARNING)
+
+    results = run_benchmark(
+        arguments.targets, arguments.iterations, arguments.warmup, arguments.prometheus_latency, dict(arguments.set)
+    )
+
+    baseline = None
+    if arguments.baseline:
+        with open(arguments.baseline) as file:
+            baseline = json.load(file)
+
+    _print_results(results, baseline)
+
+    if arguments.output:
+        with open(arguments.output, "w") as file:
+            json.dump(results, file, indent=2)
+
+
+if __name__ == "__main__":
+    run()
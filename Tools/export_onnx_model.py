@@ -0,0 +1,146 @@
+"""
+Export the forecasting model at 'Dropins/Model/model.pth.tar' to ONNX, so the autoscaler can run it with
+'inference_backend: onnx' and without torch. After the export, the ONNX predictions are compared with TCNModel.predict
+on canary windows and, optionally, on a recorded trace.
+
+Usage (from the repository root):
+    python -m Tools.export_onnx_model [--trace path/to/trace.csv] [--check-only]
+"""
+import argparse
+import copy
+import sys
+import numpy as np
+import onnx
+import pandas as pd
+import torch
+from darts import TimeSeries
+import main
+from Modules.Constants import constants
+from Modules.Forecasters.inference_engine import DartsInferenceEngine, TorchInferenceEngine
+from Modules.Forecasters.onnx_inference_engine import OnnxInferenceEngine
+from Modules.Forecasters.workload_forecaster import load_forecasting_model, verify_inference_engine, prepare_inputs
+
+
+class _ExportableModule(torch.nn.Module):
+    """
+    Wrapper exposing the TCN module as a plain tensor to tensor function returning the predicted output chunk.
+    """
+
+    def __init__(self, model):
+        super().__init__()
+        engine = TorchInferenceEngine(model, max_batch_size=1)
+        engine.warm_up()
+        self.module = copy.deepcopy(engine.module).float()
+        self._module_input = engine._module_input
+        self.output_chunk_length = model.output_chunk_length
+
+    def forward(self, x):
+        output = self.module(self._module_input(x))
+        return output[:, -self.output_chunk_length:, 0, 0]
+
+
+def export(model, model_path: str):
+    """
+    Export the TCN module of the forecasting model to ONNX with a dynamic batch dimension.
+
+    Parameters
+    ----------
+    model
+        Temporal Convolutional Network forecasting model.
+    model_path
+        Path of the ONNX model to be written.
+    """
+
+    exportable_module = _ExportableModule(model).eval()
+    sample_input = torch.zeros((1, model.input_chunk_length, model.model.input_size), dtype=torch.float32)
+
+    torch.onnx.export(
+        exportable_module,
+        (sample_input,),
+        model_path,
+        input_names=["x"],
+        output_names=["prediction"],
+        dynamic_axes={"x": {0: "batch"}, "prediction": {0: "batch"}},
+        opset_version=17,
+        dynamo=False
+    )
+
+    onnx_model = onnx.load(model_path)
+    for key, value in (
+            (constants.ONNX_METADATA_INPUT_CHUNK_LENGTH, model.input_chunk_length),
+            (constants.ONNX_METADATA_OUTPUT_CHUNK_LENGTH, model.output_chunk_length)
+    ):
+        metadata = onnx_model.metadata_props.add()
+        metadata.key = key
+        metadata.value = str(value)
+    onnx.save(onnx_model, model_path)
+
+
+def trace_difference(engine, model, trace_path: str) -> float:
+    """
+    Compare the predictions of an inference engine with TCNModel.predict on every window of a recorded trace.
+
+    Parameters
+    ----------
+    engine
+        Inference engine to be verified.
+    model
+        Temporal Convolutional Network forecasting model.
+    trace_path
+        CSV file with a 'count' column of requests per minute.
+
+    Returns
+    -------
+    float
+        Maximum absolute difference between the scaled predictions.
+    """
+
+    values = pd.read_csv(trace_path)[constants.TIME_SERIES_VALUE_COLUMN].to_numpy(dtype=float)
+    times = pd.date_range(start=pd.Timestamp(2022, 1, 1), periods=len(values), freq="min")
+    window_length = model.input_chunk_length
+
+    windows = [
+        TimeSeries.from_times_and_values(
+            times[start:start + window_length],
+            values[start:start + window_length, None],
+            columns=[constants.TIME_SERIES_VALUE_COLUMN]
+        )
+        for start in range(len(values) - window_length + 1)
+    ]
+
+    scaled_windows, _, _, covariates, time_indexes = prepare_inputs(windows, None)
+    reference = DartsInferenceEngine(model).predict(scaled_windows, covariates, time_indexes)
+    candidate = engine.predict(scaled_windows, covariates, time_indexes)
+
+    return float(np.max(np.abs(reference - candidate)))
+
+
+def run():
+    parser = argparse.ArgumentParser(description="Export the forecasting model to ONNX and check its parity")
+    parser.add_argument("--output", default=constants.PATH_TO_ONNX_MODEL, help="Path of the ONNX model")
+    parser.add_argument("--trace", help="CSV file with a 'count' column of requests per minute to check parity on")
+    parser.add_argument("--check-only", action="store_true", help="Only check the parity of an exported model")
+    arguments = parser.parse_args()
+
+    model = load_forecasting_model()
+
+    if not arguments.check_only:
+        export(model, arguments.output)
+        print("Forecasting model exported to " + arguments.output)
+
+    engine = OnnxInferenceEngine(arguments.output)
+    differences = {"canary windows": verify_inference_engine(engine, model)}
+    if arguments.trace:
+        differences["trace windows"] = trace_difference(engine, model, arguments.trace)
+
+    passed = True
+    for name, difference in differences.items():
+        status = "OK" if difference <= constants.ONNX_PARITY_TOLERANCE else "FAILED"
+        passed = passed and status == "OK"
+        print("Parity on " + name + ": maximum scaled difference " + str(difference) + " [" + status + "]")
+
+    sys.exit(0 if passed else 1)
+
+
+if __name__ == "__main__":
+    run()
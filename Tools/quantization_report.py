@@ -0,0 +1,148 @@
+"""
+Compare the int8 dynamically quantized forecasting model with the fp32 ONNX model on a held-out trace: forecast
+accuracy (MAE against the fp32 model and against the actual workload), inference latency and memory footprint.
+
+Usage (from the repository root, after Tools/export_onnx_model.py):
+    python -m Tools.quantization_report path/to/trace.csv [--holdout-fraction 0.2] [--repeats 200]
+"""
+import argparse
+import multiprocessing
+import time
+import numpy as np
+from Modules.Constants import constants
+
+
+def _memory_status_kb(field: str) -> int:
+    """
+    Read a memory figure of the process from /proc/self/status in kilobytes. VmHWM is used for the peak instead of
+    ru_maxrss, which Linux carries over from the forking parent across exec.
+
+    Parameters
+    ----------
+    field
+        Name of the field, e.g. VmRSS or VmHWM.
+    """
+
+    with open("/proc/self/status") as file:
+        for line in file:
+            if line.startswith(field + ":"):
+                return int(line.split()[1])
+    return 0
+
+
+def _measure_variant(model_path: str, scaled_windows: np.ndarray, covariates: np.ndarray, repeats: int) -> dict:
+    """
+    Load a model variant in a fresh process and measure its predictions, latency and memory. Only ONNX Runtime is
+    imported here, so the memory figures are not distorted by darts or torch.
+
+    Parameters
+    ----------
+    model_path
+        Path to the ONNX model.
+    scaled_windows
+        Scaled held-out windows.
+    covariates
+        Scaled covariates of the held-out windows.
+    repeats
+        Number of single window inferences to time.
+
+    Returns
+    -------
+    dict
+        Predictions, latency percentiles and memory figures of the variant.
+    """
+
+    from Modules.Forecasters.onnx_inference_engine import OnnxInferenceEngine
+
+    rss_before = _memory_status_kb("VmRSS")
+    engine = OnnxInferenceEngine(model_path)
+    engine.warm_up()
+
+    start = time.perf_counter()
+    predictions = engine.predict(scaled_windows, covariates, [])
+    batch_seconds = time.perf_counter() - start
+
+    latencies = []
+    for index in range(repeats):
+        window = index % len(scaled_windows)
+        start = time.perf_counter()
+        engine.predict(scaled_windows[window:window + 1], covariates[window:window + 1], [])
+        latencies.append(time.perf_counter() - start)
+
+    return {
+        "predictions": predictions,
+        "p50_ms": float(np.percentile(latencies, 50) * 1000),
+        "p99_ms": float(np.percentile(latencies, 99) * 1000),
+        "batch_ms": batch_seconds * 1000,
+        "rss_increase_kb": _memory_status_kb("VmRSS") - rss_before,
+        "peak_rss_kb": _memory_status_kb("VmHWM")
+    }
+
+
+def run():
+    parser = argparse.ArgumentParser(description="Accuracy, latency and memory report of the int8 quantized model")
+    parser.add_argument("trace", help="CSV file with a 'count' column of requests per minute")
+    parser.add_argument("--holdout-fraction", type=float, default=0.2, help="Trailing fraction of the trace to use")
+    parser.add_argument("--repeats", type=int, default=200, help="Number of single window inferences to time")
+    arguments = parser.parse_args()
+
+    # imported here, so the spawned measurement processes do not load darts and torch
+    import main
+    import pandas as pd
+    from darts import TimeSeries
+    from Modules.Forecasters.model_quantization import load_quantized_model_path
+    from Modules.Forecasters.onnx_inference_engine import OnnxInferenceEngine
+    from Modules.Forecasters.workload_forecaster import prepare_inputs, load_scaler_parameters
+
+    values = pd.read_csv(arguments.trace)[constants.TIME_SERIES_VALUE_COLUMN].to_numpy(dtype=float)
+    values = values[int(len(values) * (1 - arguments.holdout_fraction)):]
+    times = pd.date_range(start=pd.Timestamp(2022, 1, 1), periods=len(values), freq="min")
+    # the window the model was exported with, read from the metadata of the ONNX model
+    window_length = OnnxInferenceEngine(constants.PATH_TO_ONNX_MODEL).input_chunk_length
+
+    windows = [
+        TimeSeries.from_times_and_values(
+            times[start:start + window_length],
+            values[start:start + window_length, None],
+            columns=[constants.TIME_SERIES_VALUE_COLUMN]
+        )
+        for start in range(len(values) - window_length)
+    ]
+    actual = values[window_length:]
+
+    scaled_windows, minimum, data_range, covariates, _ = prepare_inputs(windows, load_scaler_parameters())
+
+    variants = {
+        "fp32": constants.PATH_TO_ONNX_MODEL,
+        "int8": load_quantized_model_path()
+    }
+
+    context = multiprocessing.get_context("spawn")
+    results = {}
+    for name, model_path in variants.items():
+        with context.Pool(1) as pool:
+            results[name] = pool.apply(_measure_variant, (model_path, scaled_windows, covariates, arguments.repeats))
+        results[name]["forecasts"] = results[name]["predictions"] * data_range + minimum
+
+    print("Held-out windows: " + str(len(windows)))
+    print("MAE int8 vs fp32 forecasts: " +
+          str(round(float(np.mean(np.abs(results["int8"]["forecasts"] - results["fp32"]["forecasts"]))), 3)) +
+          " requests")
+
+    print("{:<6}{:>14}{:>12}{:>12}{:>16}{:>18}{:>16}".format(
+        "model", "MAE actual", "p50 ms", "p99 ms", "batch ms", "RSS increase KB", "peak RSS KB"
+    ))
+    for name, result in results.items():
+        print("{:<6}{:>14.3f}{:>12.3f}{:>12.3f}{:>16.3f}{:>18}{:>16}".format(
+            name,
+            float(np.mean(np.abs(result["forecasts"] - actual))),
+            result["p50_ms"],
+            result["p99_ms"],
+            result["batch_ms"],
+            result["rss_increase_kb"],
+            result["peak_rss_kb"]
+        ))
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,102 @@
+"""
+Replay a recorded per-minute request trace through the forecaster and the scaling decisions of the autoscaler against
+in-memory stand-ins of Prometheus and Kubernetes, and report under-provisioned minutes, pod-minutes, SLA violations
+and forecast error. Sweeps replay every combination of the given values in parallel across cores.
+
+Usage (from the repository root):
+    python -m Tools.replay_simulation path/to/trace.csv [--set threshold_value=400] [--startup-delay 60]
+        [--pod-capacity 400] [--sweep threshold_value=300,400,500] [--sweep resource_removal_strategy=0.3,0.6]
+        [--processes 4] [--timeline timeline.csv] [--output results.csv] [--verbose]
+"""
+import argparse
+import itertools
+import logging
+import yaml
+import main
+import pandas as pd
+from Modules.Constants import constants
+from Modules.Simulation.replay_simulator import load_trace, load_inference_engine, replay, sweep
+
+_SUMMARY_COLUMNS = (
+    "under_provisioned_minutes", "sla_violations", "unserved_requests", "pod_minutes", "mean_replicas",
+    "forecast_mae", "forecast_mape", "wall_seconds"
+)
+
+
+def _parse_value(text: str):
+    """
+    Parse a configuration value given on the command line the way the configuration file would be parsed.
+    """
+
+    return yaml.safe_load(text)
+
+
+def _parse_assignment(text: str) -> tuple:
+    """
+    Split a key=value argument into its key and value.
+    """
+
+    key, separator, value = text.partition("=")
+    if not separator:
+        raise argparse.ArgumentTypeError("expected key=value, got " + text)
+    return key.strip(), value
+
+
+def run():
+    parser = argparse.ArgumentParser(description="Replay a request trace through the scaling pipeline")
+    parser.add_argument("trace", help="CSV or Parquet file with a 'count' column of requests per minute")
+    parser.add_argument("--set", type=_parse_assignment, action="append", default=[], metavar="KEY=VALUE",
+                        help="Override a value of the configuration file")
+    parser.add_argument("--sweep", type=_parse_assignment, action="append", default=[], metavar="KEY=V1,V2,...",
+                        help="Replay every combination of the given configuration values")
+    parser.add_argument("--startup-delay", type=float, help="Seconds a new pod takes to become ready")
+    parser.add_argument("--pod-capacity", type=float,
+                        help="Requests per minute a ready pod serves, fixed across the sweep points")
+    parser.add_argument("--sla-tolerance", type=float,
+                        help="Fraction of unserved requests in a minute counted as an SLA violation")
+    parser.add_argument("--processes", type=int, help="Number of worker processes of a sweep")
+    parser.add_argument("--timeline", help="CSV file to write the per-minute timeline of a single replay to")
+    parser.add_argument("--output", help="CSV file to write the summaries to")
+    parser.add_argument("--verbose", action="store_true", help="Log every iteration of the replay")
+    arguments = parser.parse_args()
+
+    if not arguments.verbose:
+        logging.getLogger().setLevel(logging.WARNING)
+
+    with open(constants.PATH_TO_SCALER_CONFIG_FILE) as file:
+        configurations = yaml.safe_load(file)
+
+    # the replay never talks to the cloud
+    configurations[constants.ENABLE_CLOUD_LOGGING] = False
+    configurations[constants.ENABLE_CLOUD_METRIC_PUBLISHING] = False
+    for key, value in arguments.set:
+        configurations[key] = _parse_value(value)
+    if arguments.startup_delay is not None:
+        configurations[constants.SIMULATION_STARTUP_DELAY] = arguments.startup_delay
+    if arguments.pod_capacity is not None:
+        configurations[constants.SIMULATION_POD_CAPACITY] = arguments.pod_capacity
+    if arguments.sla_tolerance is not None:
+        configurations[constants.SIMULATION_SLA_TOLERANCE] = arguments.sla_tolerance
+
+    if arguments.sweep:
+        keys = [key for key, _ in arguments.sweep]
+        values = [[_parse_value(value) for value in values.split(",")] for _, values in arguments.sweep]
+        parameter_sets = [dict(zip(keys, combination)) for combination in itertools.product(*values)]
+        results = sweep(arguments.trace, configurations, parameter_sets, arguments.processes)
+    else:
+        keys = []
+        inference_engine, scaler_parameters = load_inference_engine(configurations)
+        summary, timeline = replay(load_trace(arguments.trace), inference_engine, configurations, scaler_parameters)
+        results = [summary]
+        if arguments.timeline:
+            timeline.to_csv(arguments.timeline, index=False)
+
+    table = pd.DataFrame(results, columns=keys + ["minutes"] + list(_SUMMARY_COLUMNS))
+    print(table.to_string(index=False, float_format=lambda value: format(value, ".3f")))
+
+    if arguments.output:
+        table.to_csv(arguments.output, index=False)
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,28 @@
+"""
+Persist the scaling parameters of the forecasting model alongside 'Dropins/Model/model.pth.tar', so the autoscaler
+scales its input windows exactly like the training data.
+
+Usage (from the repository root):
+    python -m Tools.save_scaler_parameters path/to/training_trace.csv [--column count]
+"""
+import argparse
+import pandas as pd
+import main
+from Modules.Constants import constants
+from Modules.Forecasters.workload_forecaster import save_scaler_parameters
+
+
+def run():
+    parser = argparse.ArgumentParser(description="Persist the scaling parameters of the forecasting model")
+    parser.add_argument("training_trace", help="CSV file with the requests per minute used to train the model")
+    parser.add_argument("--column", default=constants.TIME_SERIES_VALUE_COLUMN,
+                        help="Column holding the requests per minute")
+    arguments = parser.parse_args()
+
+    training_values = pd.read_csv(arguments.training_trace)[arguments.column].to_numpy(dtype=float)
+    scaler_parameters = save_scaler_parameters(training_values)
+    print("Scaling parameters " + str(scaler_parameters) + " saved to " + constants.PATH_TO_SCALER_PARAMETERS)
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,192 @@
+"""
+Report where the startup time of the autoscaler goes: the import time of the packages pulled in by main, measured in
+a fresh interpreter with -X importtime, and the duration of every startup check of load_fundamentals, compared with
+the tick interval the first tick after a pod reschedule has to be ready within.
+
+Usage (from the repository root):
+    python -m Tools.startup_report [--set inference_backend=onnx] [--fake-prometheus] [--top 15]
+        [--output startup.json] [--verbose]
+"""
+import argparse
+import json
+import logging
+import os
+import re
+import subprocess
+import sys
+import tempfile
+import time
+import yaml
+from Modules.Constants import constants
+
+_IMPORT_TIME_LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$")
+
+
+def _parse_assignment(text: str) -> tuple:
+    """
+    Split a key=value argument into its key and the value parsed the way the configuration file would be parsed.
+    """
+
+    key, separator, value = text.partition("=")
+    if not separator:
+        raise argparse.ArgumentTypeError("expected key=value, got " + text)
+    return key.strip(), yaml.safe_load(value)
+
+
+def import_times(top: int) -> dict:
+    """
+    Import main in a fresh interpreter with -X importtime and collect the cumulative import time of every top level
+    package, which is what importing it costs at the point it is first imported.
+
+    Parameters
+    ----------
+    top
+        Number of packages to be reported, slowest first.
+
+    Returns
+    -------
+    dict
+        Total import time of main and the import time of the slowest packages, in seconds.
+    """
+
+    process = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import main"], capture_output=True, text=True, check=True
+    )
+
+    packages = {}
+    total = 0.0
+    for line in process.stderr.splitlines():
+        match = _IMPORT_TIME_LINE.match(line)
+        if match is None:
+            continue
+        name = match.group(4)
+        cumulative = int(match.group(2)) / 1e6
+        if name == "main":
+            total = cumulative
+        elif "." not in name and name != "Modules":
+            packages[name] = max(packages.get(name, 0.0), cumulative)
+
+    slowest = sorted(packages.items(), key=lambda package: package[1], reverse=True)[:top]
+    return {"main": total, "packages": dict(slowest)}
+
+
+def _startup_configurations(overrides: dict, prometheus_url) -> dict:
+    """
+    Configuration of the startup run: the configuration file with the given overrides, pointed at the fake
+    prometheus metric server if one is given.
+    """
+
+    with open(constants.PATH_TO_SCALER_CONFIG_FILE) as file:
+        configurations = yaml.safe_load(file)
+
+    configurations.update(overrides)
+    if prometheus_url is not None:
+        configurations[constants.PROMETHEUS_SERVER_ADDRESS] = prometheus_url
+    return configurations
+
+
+def startup_times(overrides: dict, fake_prometheus: bool) -> dict:
+    """
+    Import main and run load_fundamentals in this interpreter, which has not imported any of the heavy dependencies
+    yet, and collect the import time and the duration of every startup check.
+
+    Parameters
+    ----------
+    overrides
+        Values of the configuration file to be overridden.
+    fake_prometheus
+        Whether to check an in-process fake prometheus metric server instead of the configured one.
+
+    Returns
+    -------
+    dict
+        Import time of main, duration of every startup check and the tick interval, in seconds.
+    """
+
+    start = time.perf_counter()
+    # imported here, so the import is measured cold
+    import main
+    from Modules.Configuration import configuration
+    from Modules.Logs.cloud_logging import stop_log_shipper
+    from Modules.MetricsManagers.fake_prometheus_server import FakePrometheusServer
+    import_seconds = time.perf_counter() - start
+
+    prometheus_server = None
+    prometheus_url = None
+    if fake_prometheus:
+        prometheus_server = FakePrometheusServer()
+        prometheus_url = prometheus_server.start()
+
+    configurations = _startup_configurations(overrides, prometheus_url)
+    configuration_file, configuration_path = tempfile.mkstemp(suffix=".yaml")
+    with os.fdopen(configuration_file, "w") as file:
+        yaml.safe_dump(configurations, file)
+
+    default_configuration_path = constants.PATH_TO_SCALER_CONFIG_FILE
+    constants.PATH_TO_SCALER_CONFIG_FILE = configuration_path
+    try:
+        configuration.load_fundamentals()
+    finally:
+        constants.PATH_TO_SCALER_CONFIG_FILE = default_configuration_path
+        os.remove(configuration_path)
+        stop_log_shipper()
+        if prometheus_server is not None:
+            prometheus_server.stop()
+
+    return {
+        "import_main": import_seconds,
+        "checks": dict(configuration.startup_durations),
+        "ready": import_seconds + configuration.startup_durations["load_fundamentals"],
+        "tick_interval": int(main.configs.get(constants.TICK_INTERVAL, constants.DEFAULT_TICK_INTERVAL))
+    }
+
+
+def _print_report(imports: dict, startup: dict):
+    """
+    Print the import times of the slowest packages, the durations of the startup checks and the share of the tick
+    interval the startup takes.
+    """
+
+    print("{:<40}{:>10}".format("import", "seconds"))
+    print("{:<40}{:>10.3f}".format("main (fresh interpreter)", imports["main"]))
+    for name, seconds in imports["packages"].items():
+        print("{:<40}{:>10.3f}".format("  " + name, seconds))
+
+    print()
+    print("{:<40}{:>10}".format("startup", "seconds"))
+    print("{:<40}{:>10.3f}".format("import_main", startup["import_main"]))
+    for name, seconds in startup["checks"].items():
+        print("{:<40}{:>10.3f}".format(name, seconds))
+
+    print()
+    print("Ready " + format(startup["ready"], ".2f") + " seconds after the start of the imports, " +
+          format(startup["ready"] / startup["tick_interval"] * 100, ".0f") + "% of the tick interval of " +
+          str(startup["tick_interval"]) + " seconds")
+
+
+def run():
+    parser = argparse.ArgumentParser(description="Report the import and startup times of the autoscaler")
+    parser.add_argument("--set", type=_parse_assignment, action="append", default=[], metavar="KEY=VALUE",
+                        help="Override a value of the configuration file")
+    parser.add_argument("--fake-prometheus", action="store_true",
+                        help="Check an in-process fake prometheus metric server instead of the configured one")
+    parser.add_argument("--top", type=int, default=15, help="Number of packages to report the import time of")
+    parser.add_argument("--output", help="JSON file to write the report to")
+    parser.add_argument("--verbose", action="store_true", help="Keep the info logs of the startup checks")
+    arguments = parser.parse_args()
+
+    imports = import_times(arguments.top)
+
+    if not arguments.verbose:
+        logging.disable(logging.INFO)
+    startup = startup_times(dict(arguments.set), arguments.fake_prometheus)
+
+    _print_report(imports, startup)
+
+    if arguments.output:
+        with open(arguments.output, "w") as file:
+            json.dump({"imports": imports, "startup": startup}, file, indent=2)
+
+
+if __name__ == "__main__":
+    run()
@@ -1,19 +1,37 @@
-import schedule
+import signal
 import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, Future, wait
+from typing import Optional
 
 import main
 from darts import TimeSeries
 from Modules.Logs import logger
+from Modules.Logs.cloud_logging import stop_log_shipper
+from Modules.Constants import constants
 from Modules.Configuration.configuration import load_fundamentals
 from Modules.MetricsManagers.prometheus_monitor import getTimeSeries
-from Modules.Forecasters.workload_forecaster import forecast_future_workload
-from Modules.AdaptionManager.resource_adaptor import scaling_decisions
-from Modules.MetricsManagers.cloud_metric_publisher import cloudMetricPublishing
-
-logger.log_action("info", "Custom Autoscaler started running!", cloud_log_bool=False)
+from Modules.AdaptionManager.resource_adaptor import scaling_decisions, with_measured_lead_time
+from Modules.MetricsManagers import local_metrics
+from Modules.Forecasters.forecast_store import ForecastStore
+from Modules.Scheduler.tick_scheduler import TickScheduler, get_tick_interval
+from Modules.Scheduler.tick_budget import TickBudget, get_stage_budgets
 
 configs = None
+targets = []
 forecasting_model = None
+inference_engine = None
+scaler_parameters = None
+forecast_cache = None
+forecast_store = None
+tiered_forecaster = None
+model_reloader = None
+metric_publisher = None
+tick_scheduler = None
+fetch_executor = None
+scaling_executor = None
+publisher_executor = None
+last_good_data = {}
 
 
 def stop_program(cloud_log_bool=True):
@@ -26,46 +44,351 @@ def stop_program(cloud_log_bool=True):
         Boolean to decide whether the log to be added to the cloud or not.
     """
     logger.log_action("info", "Custom autoscaler stopped running successfully!", cloud_log_bool=cloud_log_bool)
+    stop_log_shipper()
     sys.exit()
 
 
+def _fetch_time_series(target_configs: dict):
+    """
+    Retrieve the time series of a single target deployment from the prometheus metric server.
+
+    Parameters
+    ----------
+    target_configs
+        Configuration of the target deployment.
+    """
+
+    try:
+        return getTimeSeries(target_configs, main.inference_engine.input_chunk_length)
+    except Exception:
+        logger.log_action("error", "Error while retrieving the time series of " +
+                          target_configs[constants.DEPLOYMENT_NAME] + "!")
+        return None
+
+
+def _target_key(target_configs: dict) -> tuple:
+    """
+    Identify a target deployment by its namespace and name.
+    """
+
+    return target_configs[constants.NAMESPACE], target_configs[constants.DEPLOYMENT_NAME]
+
+
+def _remember_fetch_result(target_configs: dict, fetch_job: Future):
+    """
+    Keep the data of a completed fetch as the last good data of the target, including fetches completing after the
+    ingestion deadline.
+
+    Parameters
+    ----------
+    target_configs
+        Configuration of the target deployment.
+    fetch_job
+        Completed fetch of the target.
+    """
+
+    fetch_result = fetch_job.result()
+    if fetch_result is not None:
+        main.last_good_data[_target_key(target_configs)] = (fetch_result, time.time())
+
+
+def _fallback_fetch_result(target_configs: dict):
+    """
+    Retrieve the last good data of a target whose fetch failed or missed the ingestion deadline.
+
+    Parameters
+    ----------
+    target_configs
+        Configuration of the target deployment.
+    """
+
+    last_good = main.last_good_data.get(_target_key(target_configs))
+    max_age = main.configs.get(constants.MAX_STALE_DATA_AGE, constants.DEFAULT_MAX_STALE_DATA_AGE)
+
+    if last_good is None or time.time() - last_good[1] > max_age:
+        return None
+
+    local_metrics.ingestion_fallbacks.inc(1, *_target_key(target_configs))
+    logger.log_action("warning", "Fresh data of " + target_configs[constants.DEPLOYMENT_NAME] + " not available in "
+                      "time. Falling back to the data fetched " + str(int(time.time() - last_good[1])) +
+                      " seconds ago")
+    return last_good[0]
+
+
+def _prepared_time_series(target_configs: dict, fetch_result) -> Optional[TimeSeries]:
+    """
+    Validate the time series retrieved for a target deployment.
+
+    Parameters
+    ----------
+    target_configs
+        Configuration of the target deployment.
+    fetch_result
+        Value returned by the prometheus monitor for the target deployment.
+    """
+
+    time_series = fetch_result[0] if fetch_result is not None else None
+    window_length = main.inference_engine.input_chunk_length
+
+    if type(time_series) == TimeSeries and time_series.n_timesteps == window_length:
+
+        logger.log_action("info", "Time series of " + target_configs[constants.DEPLOYMENT_NAME] +
+                          " prepared for prediction process!")
+        return time_series
+
+    elif type(time_series) == TimeSeries and time_series.n_timesteps < window_length:
+
+        logger.log_action("error", "Minimum of " + str(window_length) + " time steps required for prediction "
+                                   "process! Received " + str(
+            time_series.n_timesteps) + " only for " + target_configs[constants.DEPLOYMENT_NAME] + "!")
+
+    else:
+        logger.log_action("error", "Error while preparing the time series of " +
+                          target_configs[constants.DEPLOYMENT_NAME] + "!")
+
+    return None
+
+
+def _scale_target(
+        target_configs: dict,
+        future_workload: list,
+        last_minute_request_count_from_prometheus: int,
+        trigger_time: float
+) -> list:
+    """
+    Apply the scaling decision of a single target deployment and create the series of its metrics.
+
+    Parameters
+    ----------
+    target_configs
+        Configuration of the target deployment.
+    future_workload
+        Forecasted workload of the target deployment for each of the next ticks.
+    last_minute_request_count_from_prometheus
+        Requests per minute received by the target deployment in the previous tick.
+    trigger_time
+        UNIX timestamp the tick was triggered at.
+
+    Returns
+    -------
+    list
+        Series of the custom metrics of the target, empty if there is nothing to publish.
+    """
+
+    try:
+        pod_count = scaling_decisions(future_workload, target_configs)
+        local_metrics.trigger_to_scale.observe(time.time() - trigger_time)
+    except Exception:
+        local_metrics.scaling_decision_outcomes.inc(
+            1, target_configs[constants.NAMESPACE], target_configs[constants.DEPLOYMENT_NAME],
+            constants.SCALING_OUTCOME_ERROR
+        )
+        logger.log_action("error", "Error while scaling " + target_configs[constants.DEPLOYMENT_NAME] +
+                                   ". Skipping process for current iteration!")
+        return []
+
+    if main.metric_publisher is None:
+        return []
+
+    return main.metric_publisher.time_series(
+        pod_count, future_workload[0], last_minute_request_count_from_prometheus, target_configs, trigger_time
+    )
+
+
+def _publish_metrics(time_series: list):
+    """
+    Publish the metrics of all target deployments to the cloud in a single batch.
+
+    Parameters
+    ----------
+    time_series
+        Series of the custom metrics of all targets.
+    """
+
+    if not time_series:
+        return
+
+    try:
+        with local_metrics.stage_timer(constants.LOCAL_METRICS_STAGE_PUBLISHING):
+            main.metric_publisher.publish(time_series)
+    except Exception:
+        logger.log_action("error", "Error while publishing metrics to cloud. Skipping process for current "
+                                   "iteration!")
+
+
+def _executors() -> tuple:
+    """
+    Retrieve the executors shared across ticks: a pool for the I/O bound fetch jobs, a separate pool for the scaling
+    jobs, so scaling never queues behind a fetch which missed the ingestion deadline, and a single worker publishing
+    metrics off the critical path. Jobs overrunning their stage keep running in the background without holding up
+    the tick.
+
+    Returns
+    -------
+    tuple
+        Fetch executor, scaling executor and publisher executor.
+    """
+
+    if main.fetch_executor is None:
+        max_workers = max(1, min(len(main.targets), main.configs.get(constants.MAX_CONCURRENT_TARGETS,
+                                                                     constants.DEFAULT_MAX_CONCURRENT_TARGETS)))
+        main.fetch_executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="fetch-worker")
+        main.scaling_executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="scaling-worker")
+        main.publisher_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="metric-publisher")
+
+    return main.fetch_executor, main.scaling_executor, main.publisher_executor
+
+
+def _publish_late_metrics(scaling_job: Future):
+    """
+    Publish the metrics of a scaling job which completed after the scaling deadline.
+
+    Parameters
+    ----------
+    scaling_job
+        Completed scaling job.
+    """
+
+    time_series = scaling_job.result()
+    if time_series:
+        main.publisher_executor.submit(_publish_metrics, time_series)
+
+
+def _swap_reloaded_model():
+    """
+    Swap in the forecasting model reloaded by the model reloader since the previous tick, if any. The forecast cache
+    is invalidated and the forecast store replaced, so no forecast of the previous model is served. Inferences of the
+    previous model still running in the background only touch the replaced store, and cache entries keyed on the
+    previous model version, which are never looked up again.
+    """
+
+    if main.model_reloader is None:
+        return
+
+    reloaded_model = main.model_reloader.take_reloaded_model()
+    if reloaded_model is None:
+        return
+
+    main.forecasting_model = reloaded_model.forecasting_model
+    main.inference_engine = reloaded_model.inference_engine
+    main.scaler_parameters = reloaded_model.scaler_parameters
+    if main.forecast_cache is not None:
+        main.forecast_cache.invalidate(reloaded_model.version)
+    if main.forecast_store is not None:
+        main.forecast_store = ForecastStore(main.forecast_store.tolerance)
+
+    local_metrics.model_reloads.inc(1, constants.MODEL_RELOAD_OUTCOME_SWAPPED)
+    logger.log_action("info", "Forecasting model swapped to version " + reloaded_model.version + " with inference "
+                              "engine '" + main.inference_engine.name + "'")
+
+
 def main_method():
     """
-    Main Method of the system.
+    Main Method of the system. Every tick runs in three stages with cumulative deadlines from the tick trigger:
+    ingestion (prometheus fetches of all targets, concurrently), forecasting (one batched inference call on the
+    single shared model, replaced by the fallback forecasters when it misses its deadline or fails) and scaling
+    (concurrently for all targets). Targets whose data is not fetched in time are forecasted from their last good
+    data. Metrics are published by a background worker, so the tick never waits on
+    publishing.
     """
 
     logger.log_action("info", "New iteration triggered")
-    time_series, last_minute_request_count_from_prometheus = getTimeSeries(main.configs)
 
-    if type(time_series) == TimeSeries and time_series.n_timesteps == 10:
+    _swap_reloaded_model()
+
+    trigger_time = time.time()
+    if main.tick_scheduler is not None and main.tick_scheduler.scheduled_time is not None:
+        trigger_time = main.tick_scheduler.scheduled_time
+    budget = TickBudget(trigger_time, get_stage_budgets(main.configs))
+
+    targets = main.targets
+    fetch_executor, scaling_executor, publisher_executor = _executors()
+
+    fetch_jobs = []
+    for target_configs in targets:
+        fetch_job = fetch_executor.submit(_fetch_time_series, target_configs)
+        fetch_job.add_done_callback(lambda job, configs=target_configs: _remember_fetch_result(configs, job))
+        fetch_jobs.append(fetch_job)
 
-        logger.log_action("info", "Time series prepared for prediction process!")
-        future_workload = forecast_future_workload(time_series, main.forecasting_model, main.configs)
-        pod_count = scaling_decisions(future_workload, main.configs)
+    _, late_fetch_jobs = wait(fetch_jobs, timeout=budget.remaining(constants.TICK_STAGE_INGESTION))
+    if late_fetch_jobs:
+        budget.report_overrun(constants.TICK_STAGE_INGESTION,
+                              str(len(late_fetch_jobs)) + " fetch(es) still running at the deadline")
 
+    prepared_targets = []
+    for target_configs, fetch_job in zip(targets, fetch_jobs):
+
+        fetch_result = fetch_job.result() if fetch_job.done() else None
+        if fetch_result is None:
+            fetch_result = _fallback_fetch_result(target_configs)
+
+        time_series = _prepared_time_series(target_configs, fetch_result)
+        if time_series is not None:
+            prepared_targets.append((with_measured_lead_time(target_configs), time_series, fetch_result[1]))
+
+    future_workloads = []
+    if prepared_targets:
         try:
-            cloudMetricPublishing(pod_count, future_workload, last_minute_request_count_from_prometheus, main.configs)
-        except:
-            logger.log_action("error", "Error while publishing metrics to cloud. Skipping process for current "
+            future_workloads = main.tiered_forecaster.forecast(
+                [time_series for _, time_series, _ in prepared_targets],
+                main.inference_engine,
+                [target_configs for target_configs, _, _ in prepared_targets],
+                budget.remaining(constants.TICK_STAGE_FORECASTING),
+                main.scaler_parameters,
+                main.forecast_cache,
+                main.forecast_store
+            )
+        except Exception:
+            logger.log_action("error", "Error while forecasting the workload. Skipping process for current "
                                        "iteration!")
+    budget.check(constants.TICK_STAGE_FORECASTING)
 
-    elif type(time_series) == TimeSeries and time_series.n_timesteps < 10:
+    scaling_jobs = [
+        scaling_executor.submit(_scale_target, target_configs, future_workload, last_minute_request_count,
+                               trigger_time)
+        for (target_configs, _, last_minute_request_count), future_workload in zip(prepared_targets,
+                                                                                    future_workloads)
+    ]
 
-        logger.log_action("error", "Minimum of 10 time steps required for prediction process! Received " + str(
-            time_series.n_timesteps) + " only!")
+    completed_jobs, late_jobs = wait(scaling_jobs, timeout=budget.remaining(constants.TICK_STAGE_SCALING))
+    if late_jobs:
+        budget.report_overrun(constants.TICK_STAGE_SCALING,
+                              str(len(late_jobs)) + " scaling job(s) still running at the deadline")
 
-    else:
-        logger.log_action("error", "Error while preparing the time series!")
+    for scaling_job in late_jobs:
+        scaling_job.add_done_callback(_publish_late_metrics)
+
+    time_series = [series for scaling_job in completed_jobs for series in scaling_job.result()]
+    if time_series:
+        publisher_executor.submit(_publish_metrics, time_series)
+
+    logger.log_action(
+        "info",
+        "Iteration completed " + str(round(budget.elapsed(), 2)) + " seconds after the trigger. Waiting for the "
+        "next iteration..."
+    )
+
+
+def _handle_termination_signal(signum, frame):
+    """
+    Stop the tick scheduler gracefully when the pod receives a termination signal.
+    """
+
+    main.tick_scheduler.stop()
+
+
+if __name__ == "__main__":
 
-    logger.log_action("info", "Waiting for the next iteration...")
+    logger.log_action("info", "Custom Autoscaler started running!", cloud_log_bool=False)
 
+    load_fundamentals()
 
-schedule.every().minute.at(":00").do(main_method)
+    main.tick_scheduler = TickScheduler(main_method, get_tick_interval(main.configs))
+    signal.signal(signal.SIGTERM, _handle_termination_signal)
 
-load_fundamentals()
+    try:
+        main.tick_scheduler.run_forever()
+    except KeyboardInterrupt:
+        pass
 
-try:
-    while True:
-        schedule.run_pending()
-except KeyboardInterrupt:
     stop_program()
@@ -0,0 +1,74 @@
+import os
+import sys
+import time
+import numpy as np
+import pandas as pd
+import pytest
+from darts import TimeSeries
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# main has to be imported before the modules, which refer back to it
+import main  # noqa: E402
+from Modules.Constants import constants  # noqa: E402
+
+
+class StubInferenceEngine:
+    """
+    Inference engine predicting a constant scaled value for every step, optionally after a delay or raising an error,
+    so the forecasting pipeline runs without a trained model.
+    """
+
+    name = "stub"
+
+    def __init__(self, input_chunk_length: int = 10, scaled_value: float = 0.5, delay: float = 0.0,
+                 error: Exception = None):
+        self.input_chunk_length = input_chunk_length
+        self.output_chunk_length = 1
+        self.scaled_value = scaled_value
+        self.delay = delay
+        self.error = error
+        self.calls = 0
+
+    def predict_chunk(self, scaled_windows: np.ndarray, covariates: np.ndarray, time_indexes: list) -> np.ndarray:
+        self.calls += 1
+        if self.delay:
+            time.sleep(self.delay)
+        if self.error is not None:
+            raise self.error
+        return np.full((len(scaled_windows), self.output_chunk_length), self.scaled_value)
+
+    def predict(self, scaled_windows: np.ndarray, covariates: np.ndarray, time_indexes: list) -> np.ndarray:
+        return self.predict_chunk(scaled_windows, covariates, time_indexes)[:, 0]
+
+
+@pytest.fixture
+def target_configurations() -> dict:
+    return {
+        constants.NAMESPACE: "default",
+        constants.DEPLOYMENT_NAME: "demo-application",
+        constants.PROJECT_ID: "test-project",
+        constants.INCOMING_REQUEST_THRESHOLD_VALUE: 100,
+        constants.RESOURCE_REMOVAL_STRATEGY: 1.0,
+        constants.MIN_POD_REPLICAS: 1,
+        constants.MAX_POD_REPLICAS: 20,
+        constants.PREDICTION_ERROR_MITIGATION_VALUE: 0.0,
+        constants.POD_STARTUP_LEAD_TIME: 1,
+        constants.FORECAST_HORIZON: 1,
+        constants.TICK_INTERVAL: 60,
+        constants.ENABLE_CLOUD_LOGGING: False,
+        constants.ENABLE_CLOUD_METRIC_PUBLISHING: False
+    }
+
+
+@pytest.fixture
+def make_series():
+    def _make_series(values, start: pd.Timestamp = pd.Timestamp(2022, 1, 1, 10, 0), freq: str = "min") -> TimeSeries:
+        values = np.asarray(values, dtype=float)
+        return TimeSeries.from_times_and_values(
+            pd.date_range(start=start, periods=len(values), freq=freq),
+            values[:, None],
+            columns=[constants.TIME_SERIES_VALUE_COLUMN]
+        )
+
+    return _make_series
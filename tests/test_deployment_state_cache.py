@@ -0,0 +1,97 @@
+import time
+import pytest
+from Modules.AdaptionManager import resource_adaptor
+from Modules.AdaptionManager.deployment_state_cache import DeploymentStateCache
+from Modules.AdaptionManager.fake_kubernetes_api import FakeAppsV1Api
+from Modules.Constants import constants
+
+
+def _wait_until(condition, timeout: float = 5.0) -> bool:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.01)
+    return condition()
+
+
+@pytest.fixture
+def api(target_configurations):
+    fake_api = FakeAppsV1Api()
+    fake_api.create_deployment(
+        target_configurations[constants.NAMESPACE], target_configurations[constants.DEPLOYMENT_NAME], 2
+    )
+    fake_api.create_deployment(target_configurations[constants.NAMESPACE], "unmanaged-application", 5)
+    return fake_api
+
+
+@pytest.fixture
+def cache(api, target_configurations):
+    deployment_state_cache = DeploymentStateCache(
+        api, [target_configurations], api.watch, watch_timeout=5, relist_backoff=0.01
+    )
+    deployment_state_cache.start()
+    assert deployment_state_cache.wait_for_sync(5)
+    yield deployment_state_cache
+    deployment_state_cache.stop()
+
+
+def test_cache_is_synced_from_the_list(cache):
+    state = cache.get("default", "demo-application")
+
+    assert (state.replicas, state.ready_replicas) == (2, 2)
+    assert cache.get("default", "unmanaged-application") is None
+
+
+def test_cache_follows_the_watch_events(api, cache):
+    api.patch_namespaced_deployment_scale(name="demo-application", namespace="default", body={"spec": {"replicas": 4}})
+    api.set_ready_replicas("default", "demo-application", 3)
+
+    assert _wait_until(lambda: cache.get("default", "demo-application").ready_replicas == 3)
+    assert cache.get("default", "demo-application").replicas == 4
+    assert api.calls["list_namespaced_deployment"] == 1
+
+
+def test_cache_lists_again_after_an_expired_watch(api, cache):
+    api.expire_watches()
+    assert _wait_until(lambda: cache.relists == 2)
+
+    # changes after the relist still reach the cache through the new watch
+    api.set_ready_replicas("default", "demo-application", 1)
+    assert _wait_until(lambda: cache.get("default", "demo-application").ready_replicas == 1)
+
+
+@pytest.fixture
+def adaptor_api(api):
+    previous_api = resource_adaptor.use_apps_api(api)
+    yield api
+    resource_adaptor.use_apps_api(previous_api)
+
+
+def test_scale_up_to_the_forecasted_workload(adaptor_api, target_configurations):
+    pod_count = resource_adaptor.scaling_decisions(450, target_configurations)
+
+    assert pod_count == 5
+    assert adaptor_api.read_namespaced_deployment_scale("demo-application", "default").spec.replicas == 5
+
+
+def test_scale_up_for_the_peak_within_the_lead_time(adaptor_api, target_configurations):
+    configurations = dict(target_configurations, **{constants.POD_STARTUP_LEAD_TIME: 2})
+
+    assert resource_adaptor.scaling_decisions([150, 650, 900], configurations) == 7
+
+
+def test_scale_down_by_the_removal_strategy(adaptor_api, target_configurations):
+    adaptor_api.patch_namespaced_deployment_scale(
+        name="demo-application", namespace="default", body={"spec": {"replicas": 10}}
+    )
+    configurations = dict(target_configurations, **{constants.RESOURCE_REMOVAL_STRATEGY: 0.5})
+
+    assert resource_adaptor.scaling_decisions(200, configurations) == 6
+
+
+def test_scale_down_never_below_the_minimum(adaptor_api, target_configurations):
+    configurations = dict(target_configurations, **{constants.MIN_POD_REPLICAS: 2})
+
+    assert resource_adaptor.scaling_decisions(0, configurations) == 2
+    assert "patch_namespaced_deployment_scale" not in adaptor_api.calls
@@ -0,0 +1,65 @@
+import numpy as np
+import pandas as pd
+from Modules.Forecasters.forecast_store import ForecastStore
+from Modules.Forecasters.workload_forecaster import predict_future_workloads
+from Modules.Constants import constants
+from conftest import StubInferenceEngine
+
+TARGET = "default/demo-application"
+
+
+def test_forecast_reused_while_the_workload_stays_within_tolerance(make_series):
+    store = ForecastStore(0.1)
+    store.store(TARGET, make_series([100] * 10), np.array([100, 110, 120, 130]))
+
+    # one tick later the observed 105 is within 10% of the forecasted 100
+    reused = store.reusable(TARGET, make_series([100] * 9 + [105], start=pd.Timestamp(2022, 1, 1, 10, 1)), 2)
+
+    assert reused.tolist() == [110, 120]
+    assert store.reuses == 1
+
+
+def test_forecast_dropped_when_the_workload_leaves_the_tolerance_band(make_series):
+    store = ForecastStore(0.1)
+    store.store(TARGET, make_series([100] * 10), np.array([100, 110, 120, 130]))
+
+    assert store.reusable(TARGET, make_series([100] * 9 + [150], start=pd.Timestamp(2022, 1, 1, 10, 1)), 2) is None
+    assert store.reuses == 0
+
+
+def test_forecast_dropped_when_it_no_longer_covers_the_lead_time(make_series):
+    store = ForecastStore(0.1)
+    store.store(TARGET, make_series([100] * 10), np.array([100, 100, 100]))
+
+    later = make_series([100] * 10, start=pd.Timestamp(2022, 1, 1, 10, 2))
+    assert store.reusable(TARGET, later, 1) is not None
+    assert store.reusable(TARGET, later, 2) is None
+
+
+def test_forecast_dropped_for_a_different_step_or_an_older_window(make_series):
+    store = ForecastStore(0.1)
+    store.store(TARGET, make_series([100] * 10), np.array([100, 100, 100]))
+
+    assert store.reusable(TARGET, make_series([100] * 10, freq="30s"), 1) is None
+    assert store.reusable(TARGET, make_series([100] * 10, start=pd.Timestamp(2022, 1, 1, 9, 59)), 1) is None
+    assert store.reusable("other/target", make_series([100] * 10), 1) is None
+
+
+def test_stored_forecasts_skip_the_inference(make_series, target_configurations):
+    configurations = dict(target_configurations, **{constants.FORECAST_HORIZON: 3})
+    engine = StubInferenceEngine()
+    store = ForecastStore(0.1)
+    window = make_series(np.linspace(100, 200, 10))
+
+    first = predict_future_workloads([window], engine, [configurations], None, None, store)
+    calls = engine.calls
+
+    # the next tick observes exactly the forecasted step
+    values = np.append(window.values()[1:, 0], first[0][0])
+    second = predict_future_workloads(
+        [make_series(values, start=pd.Timestamp(2022, 1, 1, 10, 1))], engine, [configurations], None, None, store
+    )
+
+    assert engine.calls == calls
+    assert store.reuses == 1
+    assert len(second[0]) == 1
@@ -0,0 +1,100 @@
+from datetime import datetime
+import numpy as np
+from Modules.Constants import constants
+from Modules.MetricsManagers.fake_prometheus_connection import FakePrometheusConnect
+from Modules.MetricsManagers.prometheus_monitor import fetch_time_series
+from Modules.MetricsManagers.request_count_buffer import RequestCountBuffer
+
+STEP = 60
+START = 1_650_000_000.0
+
+
+def _trace(steps: int):
+    timestamps = START + STEP * np.arange(1, steps + 1)
+    values = np.arange(steps, dtype=float) * 10
+    return timestamps, values
+
+
+def test_ring_buffer_keeps_the_newest_steps():
+    buffer = RequestCountBuffer(3, STEP)
+    for index in range(5):
+        buffer.append(START + index * STEP, index)
+
+    timestamps, values = buffer.window(3, START + 4 * STEP)
+
+    assert len(buffer) == 3
+    assert values.tolist() == [2, 3, 4]
+    assert timestamps.tolist() == [START + 2 * STEP, START + 3 * STEP, START + 4 * STEP]
+
+
+def test_ring_buffer_ignores_steps_which_are_not_newer():
+    buffer = RequestCountBuffer(5, STEP)
+    buffer.append(START, 1)
+    buffer.append(START, 2)
+    buffer.append(START - STEP, 3)
+
+    assert len(buffer) == 1
+    assert buffer.missing_steps(START + 2 * STEP) == 2
+    assert buffer.missing_steps(START - STEP) is None
+
+
+def test_backfill_then_incremental_queries(target_configurations):
+    timestamps, values = _trace(200)
+    prom = FakePrometheusConnect(timestamps, values)
+    buffer = RequestCountBuffer(60, STEP)
+    window_length = 10
+
+    series, last_count = fetch_time_series(
+        prom, buffer, datetime.fromtimestamp(timestamps[99]), target_configurations, window_length
+    )
+    assert prom.queries == 1
+    assert len(buffer) == 60
+    assert series.values()[:, 0].tolist() == values[90:100].tolist()
+    assert last_count == values[99]
+
+    # two ticks later only the two missing steps are queried
+    assert buffer.missing_steps(timestamps[101]) == 2
+    series, _ = fetch_time_series(
+        prom, buffer, datetime.fromtimestamp(timestamps[101]), target_configurations, window_length
+    )
+    assert prom.queries == 2
+    assert series.values()[:, 0].tolist() == values[92:102].tolist()
+
+    # an up to date buffer does not query again
+    fetch_time_series(prom, buffer, datetime.fromtimestamp(timestamps[101]), target_configurations, window_length)
+    assert prom.queries == 2
+
+
+def test_gap_larger_than_the_buffer_backfills_again(target_configurations):
+    timestamps, values = _trace(200)
+    prom = FakePrometheusConnect(timestamps, values)
+    buffer = RequestCountBuffer(20, STEP)
+
+    fetch_time_series(prom, buffer, datetime.fromtimestamp(timestamps[49]), target_configurations, 10)
+    series, _ = fetch_time_series(prom, buffer, datetime.fromtimestamp(timestamps[149]), target_configurations, 10)
+
+    assert len(buffer) == 20
+    assert series.values()[:, 0].tolist() == values[140:150].tolist()
+
+
+def test_missing_steps_are_interpolated(target_configurations):
+    timestamps, values = _trace(30)
+    keep = np.ones(len(timestamps), dtype=bool)
+    keep[25] = False
+    prom = FakePrometheusConnect(timestamps[keep], values[keep])
+    buffer = RequestCountBuffer(30, STEP)
+
+    series, _ = fetch_time_series(prom, buffer, datetime.fromtimestamp(timestamps[29]), target_configurations, 10)
+
+    assert series.n_timesteps == 10
+    assert series.values()[:, 0].tolist() == values[20:30].tolist()
+
+
+def test_response_without_the_backend_is_an_error(target_configurations):
+    timestamps, values = _trace(30)
+    prom = FakePrometheusConnect(timestamps, values, backend="other-backend")
+    configurations = dict(target_configurations, **{constants.PROMETHEUS_BACKEND: "demo-backend"})
+
+    assert fetch_time_series(
+        prom, RequestCountBuffer(30, STEP), datetime.fromtimestamp(timestamps[29]), configurations, 10
+    ) is None
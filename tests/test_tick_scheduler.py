@@ -0,0 +1,102 @@
+import threading
+import time
+import pytest
+from Modules.Constants import constants
+from Modules.Scheduler.tick_budget import TickBudget, get_stage_budgets
+from Modules.Scheduler.tick_scheduler import TickScheduler, is_valid_tick_interval
+
+
+def _run_for(scheduler: TickScheduler, seconds: float):
+    thread = threading.Thread(target=scheduler.run_forever, daemon=True)
+    thread.start()
+    time.sleep(seconds)
+    scheduler.stop()
+    thread.join(5)
+    assert not thread.is_alive()
+
+
+def test_ticks_fire_on_the_interval_boundaries():
+    scheduled_times = []
+    scheduler = TickScheduler(lambda: scheduled_times.append(scheduler.scheduled_time), 0.2)
+
+    _run_for(scheduler, 0.9)
+
+    assert scheduler.ticks == len(scheduled_times) >= 3
+    for scheduled_time in scheduled_times:
+        assert round(scheduled_time / 0.2, 6) == round(scheduled_time / 0.2)
+    assert scheduler.max_jitter < 0.2
+
+
+def test_next_boundary_is_strictly_after_now():
+    scheduler = TickScheduler(lambda: None, 60)
+
+    assert scheduler._next_boundary(125) == 180
+    assert scheduler._next_boundary(120) == 180
+
+
+def test_failing_tick_does_not_stop_the_loop():
+    calls = []
+
+    def job():
+        calls.append(time.time())
+        if len(calls) == 1:
+            raise RuntimeError("tick failed")
+
+    scheduler = TickScheduler(job, 0.2)
+    _run_for(scheduler, 0.9)
+
+    assert scheduler.failed_ticks == 1
+    assert len(calls) >= 3
+
+
+def test_overrunning_tick_counts_missed_ticks():
+    scheduler = TickScheduler(lambda: time.sleep(0.45), 0.2)
+
+    _run_for(scheduler, 0.7)
+
+    assert scheduler.missed_ticks >= 2
+
+
+@pytest.mark.parametrize("interval, valid", [(60, True), (15, True), (7, False), (0, False), (7200, False)])
+def test_tick_interval_has_to_divide_an_hour(interval, valid):
+    assert is_valid_tick_interval(interval) == valid
+
+
+def test_stage_deadlines_are_cumulative():
+    budget = TickBudget(1000.0, {constants.TICK_STAGE_INGESTION: 10, constants.TICK_STAGE_FORECASTING: 5})
+
+    assert budget.deadlines == {constants.TICK_STAGE_INGESTION: 1010.0, constants.TICK_STAGE_FORECASTING: 1015.0}
+
+
+def test_overrun_is_reported_once_the_deadline_passed():
+    budget = TickBudget(time.time(), {constants.TICK_STAGE_INGESTION: 0.05, constants.TICK_STAGE_SCALING: 5})
+
+    assert budget.check(constants.TICK_STAGE_INGESTION)
+    time.sleep(0.1)
+    assert not budget.check(constants.TICK_STAGE_INGESTION)
+    assert budget.remaining(constants.TICK_STAGE_INGESTION) == 0.0
+    assert 4 < budget.remaining(constants.TICK_STAGE_SCALING) <= 5
+
+
+def test_stage_budgets_never_exceed_the_tick_interval():
+    budgets = get_stage_budgets({
+        constants.TICK_INTERVAL: 30,
+        constants.INGESTION_BUDGET: 20,
+        constants.FORECASTING_BUDGET: 10,
+        constants.SCALING_BUDGET: 30
+    })
+
+    assert list(budgets) == [constants.TICK_STAGE_INGESTION, constants.TICK_STAGE_FORECASTING,
+                             constants.TICK_STAGE_SCALING]
+    assert sum(budgets.values()) == pytest.approx(30)
+    assert budgets[constants.TICK_STAGE_INGESTION] == pytest.approx(10)
+
+
+def test_stage_budgets_default_to_shares_of_the_tick_interval():
+    budgets = get_stage_budgets({constants.TICK_INTERVAL: 60})
+
+    assert budgets == {
+        constants.TICK_STAGE_INGESTION: 20,
+        constants.TICK_STAGE_FORECASTING: 10,
+        constants.TICK_STAGE_SCALING: 15
+    }
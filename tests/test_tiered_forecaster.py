@@ -0,0 +1,83 @@
+import time
+import numpy as np
+import pytest
+from Modules.Constants import constants
+from Modules.Forecasters.fallback_forecasters import create_fallback_forecasters, fallback_predict
+from Modules.Forecasters.tiered_forecaster import TieredForecaster
+from Modules.Forecasters.workload_forecaster import fallback_future_workloads, forecast_future_workloads
+from conftest import StubInferenceEngine
+
+
+@pytest.fixture
+def forecaster(target_configurations):
+    tiered_forecaster = TieredForecaster(create_fallback_forecasters(target_configurations))
+    yield tiered_forecaster
+    tiered_forecaster.shutdown()
+
+
+@pytest.fixture
+def windows(make_series):
+    return [make_series(np.linspace(100, 190, 10))]
+
+
+def test_model_forecast_within_the_deadline(forecaster, windows, target_configurations):
+    engine = StubInferenceEngine(scaled_value=0.5)
+
+    forecast = forecaster.forecast(windows, engine, [target_configurations], 5.0)
+
+    assert forecast == forecast_future_workloads(windows, engine, [target_configurations])
+    assert forecast == [[145]]
+
+
+def test_fallback_when_the_model_misses_its_deadline(forecaster, windows, target_configurations):
+    engine = StubInferenceEngine(delay=0.5)
+    expected = fallback_future_workloads(
+        windows, [target_configurations], create_fallback_forecasters(target_configurations)
+    )
+
+    start = time.perf_counter()
+    forecast = forecaster.forecast(windows, engine, [target_configurations], 0.05)
+
+    assert time.perf_counter() - start < 0.4
+    assert forecast == expected
+    assert forecast != [[145]]
+
+
+def test_fallback_while_the_model_is_still_busy(forecaster, windows, target_configurations):
+    engine = StubInferenceEngine(delay=0.5)
+    forecaster.forecast(windows, engine, [target_configurations], 0.0)
+    deadline = time.monotonic() + 1.0
+    while engine.calls == 0 and time.monotonic() < deadline:
+        time.sleep(0.005)
+
+    # the previous inference still runs, so the model is not even tried
+    forecaster.forecast(windows, engine, [target_configurations], 5.0)
+    assert engine.calls == 1
+
+    time.sleep(0.6)
+    assert forecaster.forecast(windows, engine, [target_configurations], 5.0) == [[145]]
+
+
+def test_fallback_when_the_model_fails(forecaster, windows, target_configurations):
+    engine = StubInferenceEngine(error=RuntimeError("inference failed"))
+    expected = fallback_future_workloads(
+        windows, [target_configurations], create_fallback_forecasters(target_configurations)
+    )
+
+    assert forecaster.forecast(windows, engine, [target_configurations], 5.0) == expected
+
+
+def test_fallback_chain_falls_through_to_the_last_value():
+    windows = np.array([[10.0, 20.0, 30.0], [10.0, np.nan, np.nan]])
+    forecasters = create_fallback_forecasters({constants.FALLBACK_FORECASTERS: [constants.FORECAST_TIER_HOLT]})
+
+    predictions, tiers = fallback_predict(windows, 2, forecasters)
+
+    assert tiers == [constants.FORECAST_TIER_HOLT, constants.FORECAST_TIER_LAST_VALUE]
+    assert np.all(np.isfinite(predictions)) and np.all(predictions >= 0)
+    assert predictions[1].tolist() == [0.0, 0.0]
+
+
+def test_unknown_fallback_forecaster_is_rejected():
+    with pytest.raises(ValueError):
+        create_fallback_forecasters({constants.FALLBACK_FORECASTERS: ["prophet"]})